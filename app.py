@@ -1,43 +1,170 @@
 import streamlit as st
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
+import numpy as np
 from dotenv import load_dotenv
+import json
 import os
-import openai
+import re
 
 # Custom utility imports
-from utils.data_validator import validate_csv, suggest_group_and_metric_columns, suggest_columns_with_llm
+# (scipy, matplotlib and openai are imported lazily, on first use)
+from utils.data_validator import validate_csv, suggest_group_and_metric_columns, segment_columns
+from utils.llm_suggest import schema_fingerprint
 from utils.method_recommender import suggest_methods
-from methods.t_test import run_t_test
-from methods.anova import run_anova
-from methods.tukey_hsd import run_tukey_hsd
-from methods.bootstrap_test import run_bootstrap_test
-from methods.bayesian_ab import run_bayesian_ab_test
+from utils.experiment_data import ExperimentData
+from utils.aggregates import SUMMARY_KINDS, detect_summary_columns, load_summary_table
+from utils.columnar import SUPPORTED_EXTENSIONS, load_table
+from utils.streaming import read_profile, stream_csv
+from utils.cache import LRUCache, content_hash, file_fingerprint, make_key
+from utils.result_store import ResultStore, store_key
+from utils.jobs import JobExecutor
+from utils.instrumentation import Recorder, profiled, set_active_recorder
+from methods.registry import METHODS, get_method
+from utils.simulator import DISTRIBUTIONS, SIM_METHODS
 from utils.export import convert_df_to_csv
-from utils.pdf_export import generate_pdf
 
 
 # ========================
 # Setup
 # ========================
 load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
 st.set_page_config(page_title="A/B Testing Web App", layout="wide")
 st.title("📊 A/B Testing Simulator")
 
+MONITOR_DIR = os.path.join('.cache', 'monitor')
+PROFILE_DIR = os.path.join('.cache', 'profiles')
+
 validated_df = None
+stream_source = None
+dataset_key = None
+summary_input = False
+
+
+# ========================
+# Result Cache
+# ========================
+# Shared across reruns and sessions; keys start with a hash of the file content,
+# so widget interactions reuse parsing, profiling and test results. It holds whole
+# validated frames, so it is bounded by their size (AB_RESULT_CACHE_MB) as well as by count.
+RESULT_CACHE_MAX_BYTES = int(float(os.getenv("AB_RESULT_CACHE_MB", "1024")) * 2 ** 20)
+
+@st.cache_resource
+def get_result_cache():
+    return LRUCache(maxsize=128, max_bytes=RESULT_CACHE_MAX_BYTES)
+
+result_cache = get_result_cache()
+
+# On-disk store for method outputs, checked before anything is computed; survives reloads
+# and is shared with other tabs, sessions and analysts on the same machine
+@st.cache_resource
+def get_result_store():
+    return ResultStore()
+
+result_store = get_result_store()
+
+def cached(*key, compute, **params):
+    return result_cache.get_or_compute(make_key(dataset_key, *key, **params), compute)
+
+def stored(*key, compute, **params):
+    # Memory first, then disk, then compute (written back to both)
+    full_key = make_key(dataset_key, *key, **params)
+    return result_cache.get_or_compute(full_key, lambda: result_store.get_or_compute(full_key, compute, label=' '.join(map(str, key))))
 
 
+# ========================
+# Background Jobs
+# ========================
+# Long computations (resampling, pairwise tests, LLM calls) run on worker threads that outlive
+# a script run, so changing a widget meanwhile does not cancel and restart them
+@st.cache_resource
+def get_job_executor():
+    return JobExecutor()
+
+job_executor = get_job_executor()
+
+@st.fragment(run_every=0.5)
+def show_job_progress(job_id):
+    # Polls one job's partial results; reruns the whole app once it has finished
+    job = job_executor.get(job_id)
+    if job is None or job.done():
+        st.rerun()
+    progress = job.progress
+    if 'total' in progress:
+        text = f"{job.label}: {progress['iterations']:,} / {progress['total']:,}"
+        if 'p_value' in progress:
+            text += f" (running p-value {progress['p_value']:.4f})"
+        st.progress(progress['iterations'] / progress['total'], text=text)
+    else:
+        st.info(f"⏳ {job.label} is running in the background...")
+
+def stored_in_background(*key, compute, label, **params):
+    # Like stored(), but a miss starts (or joins) a background job and returns None while it
+    # runs; compute receives the job's progress callback
+    full_key = make_key(dataset_key, *key, **params)
+    _missing = object()
+    result = result_cache.get(full_key, _missing)
+    if result is _missing:
+        result = result_store.get(full_key, _missing)
+    if result is _missing:
+        job = job_executor.submit(full_key, compute, label)
+        if not job.done():
+            show_job_progress(job.id)
+            return None
+        try:
+            result = job.result()
+        except Exception as e:
+            return f"{label} failed: {e}"
+        result_store.put(full_key, result, label=' '.join(map(str, key)))
+    result_cache.put(full_key, result)
+    return result
+
+
+# ========================
+# Diagnostics
+# ========================
+# Wall time, CPU time and (optionally) peak allocation of every stage run in this session:
+# loading, validation, profiling, tests, plots and PDF export. Nothing is recorded while it is off.
+upload_panel = st.sidebar.container()
+with st.sidebar.expander("🩺 Diagnostics"):
+    show_diagnostics = st.checkbox("Record stage timings")
+    trace_memory = st.checkbox("Trace peak memory (slower)", disabled=not show_diagnostics)
+    diagnostics_panel = st.container()
+
+# Tracing slows every allocation in the process, so it only runs while some session asks for it:
+# each recorder holds it, and it stops when the last one lets go
+diagnostics = None
+recorder = st.session_state.get('diagnostics')
+if show_diagnostics:
+    if recorder is None or recorder.trace_memory != trace_memory:
+        if recorder is not None:
+            recorder.stop_tracing()
+        recorder = st.session_state.diagnostics = Recorder(trace_memory=trace_memory)
+    diagnostics = recorder
+elif recorder is not None:
+    recorder.stop_tracing()
+set_active_recorder(diagnostics)
+
 # ========================
 # Sidebar: Upload & Sample Data
 # ========================
-with st.sidebar:
+with upload_panel:
     st.header("📂 Upload & Setup")
-    uploaded_file = st.file_uploader("Upload CSV file", type=["csv"])
+    uploaded_file = st.file_uploader("Upload CSV, Parquet or Arrow/Feather file",
+                                     type=[ext.lstrip('.') for ext in SUPPORTED_EXTENSIONS])
+    streaming_mode = st.checkbox("⚡ Streaming mode (large files)",
+                                 help="Read the file in chunks. Tests run on exact per-group summaries; "
+                                      "plots and resampling methods use a bounded random sample.")
+    server_path = st.text_input("...or path to a CSV/Parquet/Arrow file on the server") if streaming_mode else ""
+    columnar_cache = False if streaming_mode else st.checkbox(
+        "💾 Keep a columnar copy of CSV uploads",
+        help="Parse the CSV once and reuse a memory-mapped Arrow copy in later sessions.")
+    aggregate_mode = False if streaming_mode else st.checkbox(
+        "📑 File is a pre-aggregated summary table",
+        help="One row per group (or per group and partition) with n / mean / std columns, "
+             "or conversions / trials for binary metrics.")
     if st.button("Use Sample Data"):
-        raw_df = pd.read_csv("data/sample_anova.csv")
-        is_valid, result = validate_csv(raw_df)
+        dataset_key = file_fingerprint("data/sample_anova.csv")
+        is_valid, result = cached('validated', compute=lambda: validate_csv(load_table("data/sample_anova.csv")))
         if is_valid:
             validated_df = result
             st.success("✅ Sample data loaded successfully!")
@@ -47,10 +174,39 @@ with st.sidebar:
 # ========================
 # File Validation
 # ========================
-if uploaded_file:
+if streaming_mode and (uploaded_file or server_path):
     try:
-        raw_df = pd.read_csv(uploaded_file)
-        is_valid, result = validate_csv(raw_df)
+        stream_source = uploaded_file or server_path
+        dataset_key = ('stream', content_hash(uploaded_file.getvalue()) if uploaded_file else file_fingerprint(server_path))
+        profile_df = cached('profile', compute=lambda: read_profile(stream_source))
+        profile_groups, profile_metrics = cached('columns', compute=lambda: suggest_group_and_metric_columns(profile_df))
+        if not profile_groups or not profile_metrics:
+            st.error("❌ No suitable group/metric columns found in the first rows of the file.")
+            stream_source = None
+        else:
+            validated_df = profile_df
+            st.success("✅ File profiled from its first rows; it will be streamed after column selection.")
+            st.dataframe(validated_df.head())
+    except Exception as e:
+        stream_source = None
+        st.error(f"❌ Error reading file: {e}")
+
+elif aggregate_mode and uploaded_file:
+    try:
+        dataset_key = ('summary', content_hash(uploaded_file.getvalue()))
+        validated_df = cached('table', compute=lambda: load_table(uploaded_file).rename(columns=lambda col: col.lower().strip()))
+        summary_input = True
+        st.success("✅ Summary table loaded.")
+        st.dataframe(validated_df.head())
+    except Exception as e:
+        st.error(f"❌ Error reading file: {e}")
+
+elif uploaded_file:
+    try:
+        dataset_key = content_hash(uploaded_file.getvalue())
+        # Columnar files load only the columns a test can use, with groups as categoricals
+        is_valid, result = cached('validated', compute=lambda: validate_csv(
+            load_table(uploaded_file, cache_key=dataset_key if columnar_cache else None)))
         if not is_valid:
             st.error(result)
         else:
@@ -63,31 +219,97 @@ if uploaded_file:
 # ========================
 # LLM Column Suggestions
 # ========================
-if validated_df is not None:
+if validated_df is not None and not summary_input:
     st.markdown("### 🤖 Smart Column Suggestion (LLM-Powered)")
+    def llm_suggestion(report):
+        from utils.llm_suggest import openai_client, suggest_columns
+        return suggest_columns(validated_df, openai_client(), store=result_store)
+
+    # One request per schema (column names and types): datasets with the same layout share the
+    # answer, and the request keeps running if the page is used meanwhile
+    llm_key = make_key('llm', schema_fingerprint(validated_df))
     if st.button("🔍 Get LLM Suggestions"):
-        with st.spinner("Thinking..."):
-            suggestion = suggest_columns_with_llm(validated_df, openai)
-        st.info(suggestion)
+        previous = job_executor.get(store_key(llm_key))
+        # The local stand-in answered last time: ask the model again (a failed job is
+        # resubmitted by the executor anyway)
+        if previous is not None and previous.state == 'done' and previous.result()['source'] not in ('llm', 'cache'):
+            job_executor.discard(previous.id)
+        job_executor.submit(llm_key, llm_suggestion, "LLM suggestion")
+    llm_job = job_executor.get(store_key(llm_key))
+    if llm_job is not None:
+        if llm_job.done():
+            try:
+                suggestion = llm_job.result()
+            except Exception as e:
+                # Failed outside the model request (which falls back by itself)
+                from utils.llm_suggest import local_suggestion
+                suggestion = local_suggestion(validated_df, f"the suggestion job failed: {e}")
+            st.info(suggestion['text'])
+        else:
+            show_job_progress(llm_job.id)
 
 # ========================
 # Column Selection
 # ========================
 if validated_df is not None:
-    group_suggestions, metric_suggestions = suggest_group_and_metric_columns(validated_df)
-
-    st.markdown("### 🧠 Column Suggestions Based on Your Data")
-    col1, col2 = st.columns(2)
-
-    with col1:
-        group_col = st.selectbox("📌 Select Group Column", validated_df.columns,
-                                 index=validated_df.columns.get_loc(group_suggestions[0]) if group_suggestions else 0)
-    with col2:
-        value_col = st.selectbox("📊 Select Metric Column", validated_df.columns,
-                                 index=validated_df.columns.get_loc(metric_suggestions[0]) if metric_suggestions else 0)
+    if summary_input:
+        # Summary tables: choose which columns hold the per-group counts and moments
+        detected = detect_summary_columns(validated_df) or {'kind': 'moments'}
+        table_columns = list(validated_df.columns)
+
+        def pick_column(label, role, container):
+            default = detected.get(role)
+            return container.selectbox(label, table_columns,
+                                       index=table_columns.index(default) if default in table_columns else 0)
+
+        st.markdown("### 🧠 Summary Table Columns")
+        summary_kind = st.radio("Layout", SUMMARY_KINDS, index=SUMMARY_KINDS.index(detected['kind']), horizontal=True,
+                                format_func={'moments': 'n / mean / std', 'conversions': 'conversions / trials'}.get)
+        roles = ('n', 'mean', 'std') if summary_kind == 'moments' else ('conversions', 'trials')
+        role_cols = st.columns(len(roles) + 1)
+        group_col = pick_column("📌 Group Column", 'group', role_cols[0])
+        picked = {role: pick_column(f"📊 {role.capitalize()} Column", role, container)
+                  for role, container in zip(roles, role_cols[1:])}
+        value_col = (summary_kind,) + tuple(picked.values())
+        try:
+            summary = cached('summary', group_col, value_col, compute=lambda: load_summary_table(
+                validated_df, {'kind': summary_kind, 'group': group_col, **picked}))
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            st.stop()
+        # No row-level values: methods that resample or plot raw rows are not offered
+        experiment = None
+        st.caption(f"{summary.n_groups} groups, {int(summary.n.sum()):,} observations in total.")
+    else:
+        group_suggestions, metric_suggestions = cached('columns', compute=lambda: suggest_group_and_metric_columns(validated_df))
+
+        st.markdown("### 🧠 Column Suggestions Based on Your Data")
+        col1, col2 = st.columns(2)
+
+        with col1:
+            group_col = st.selectbox("📌 Select Group Column", validated_df.columns,
+                                     index=validated_df.columns.get_loc(group_suggestions[0]) if group_suggestions else 0)
+        with col2:
+            value_col = st.selectbox("📊 Select Metric Column", validated_df.columns,
+                                     index=validated_df.columns.get_loc(metric_suggestions[0]) if metric_suggestions else 0)
+
+        # Compact group-sorted arrays shared by every method below; parametric
+        # methods only need the per-group summary
+        if stream_source is not None:
+            with st.spinner("Streaming file..."):
+                streamed = cached('streamed', group_col, value_col,
+                                  compute=lambda: stream_csv(stream_source, group_col, value_col))
+            experiment = streamed.sample
+            summary = streamed.stats
+            st.caption(f"Streamed {streamed.n_rows:,} rows. Plots and resampling methods use a "
+                       f"{len(experiment):,}-row random sample.")
+        else:
+            experiment = cached('experiment', group_col, value_col,
+                                compute=lambda: ExperimentData.from_frame(validated_df, group_col, value_col))
+            summary = experiment.stats()
 
-    validated_df = validated_df[[group_col, value_col]].dropna()
-    validated_df.columns = ['group', 'value']
+    def cached_test(method, compute, **params):
+        return stored('result', group_col, value_col, method, compute=compute, **params)
     
     if "show_second_test" not in st.session_state:
         st.session_state.show_second_test = False
@@ -101,121 +323,156 @@ if validated_df is not None:
     # ========================
     st.markdown("### 💡 Method Selection")
     st.caption("Recommended: ANOVA, Tukey’s HSD, Bootstrap")
-    suggestions = suggest_methods(validated_df)
+    suggestions = suggest_methods(summary, input='summary' if experiment is None else 'rows')
     if suggestions:
         for method in suggestions:
             st.markdown(f"- ✅ **{method}**")
     else:
         st.warning("No suitable methods detected for your data.")
 
-    selected_method = st.selectbox("Choose Method", ['T-Test', 'ANOVA', 'Tukey’s HSD', 'Bootstrap', 'Bayesian A/B'])
+    selected_method = st.selectbox("Choose Method", list(METHODS))
+
+    # Opt-in settings, passed on top of each method's defaults (and part of its cache key)
+    early_stopping = st.checkbox(
+        "Bootstrap: stop early once the decision is settled",
+        help="Draws permutations in batches and stops when the p-value is clearly on one side of 0.05. "
+             "Faster, but the reported p-value rests on fewer permutations.")
+    METHOD_OPTIONS = {'Bootstrap': {'adaptive': early_stopping}}
+
+    def method_params(method):
+        return {**get_method(method).defaults, **METHOD_OPTIONS.get(method, {})}
 
     # Help Box
     with st.expander("ℹ️ What do these methods mean?"):
-        st.markdown("""
-        - **T-Test**: Compare means between two groups.
-        - **ANOVA**: Compare means across 3+ groups.
-        - **Tukey’s HSD**: Find which group pairs differ after ANOVA.
-        - **Bootstrap**: Resampling to estimate confidence intervals.
-        - **Bayesian A/B**: Probabilistic comparison of groups.
-        """)
+        st.markdown("\n".join(f"- **{spec.name}**: {spec.description}" for spec in METHODS.values()))
 
     # ========================
     # Visual Helpers
     # ========================
-    def plot_boxplot(df):
-        fig, ax = plt.subplots()
-        sns.boxplot(data=df, x='group', y='value', palette='Set2', ax=ax)
-        ax.set_title("Group-wise Value Comparison")
-        return fig
-
-    def plot_bootstrap_distribution(diffs, obs_diff):
-        fig, ax = plt.subplots()
-        sns.histplot(diffs, kde=True, color="skyblue", ax=ax)
-        ax.axvline(x=obs_diff, color='red', linestyle='--', label=f"Observed Diff: {obs_diff:.2f}")
-        ax.set_title("Bootstrap Mean Differences")
-        ax.legend()
-        return fig
-
-    def plot_bayesian_posteriors(samples, group1, group2):
-        g1_samples, g2_samples = samples
-        fig, ax = plt.subplots()
-        sns.kdeplot(g1_samples, label=group1, shade=True)
-        sns.kdeplot(g2_samples, label=group2, shade=True)
-        ax.set_title("Posterior Distributions")
-        ax.legend()
-        return fig
+    # Plots are drawn from compact summaries (quartiles, fixed bins, grid densities) and cached
+    # as PNG bytes per result, so a rerun never touches matplotlib
+    def plot_boxplot():
+        from utils.plots import boxplot_png
+
+        return stored('plot', 'box', group_col, value_col, compute=lambda: boxplot_png(experiment))
+
+    def bayesian_table(result):
+        return pd.DataFrame({'group': result['groups'],
+                             'P(best)': result['prob_best'],
+                             'Expected loss': result['expected_loss']})
+
+    def plot_bootstrap_distribution(method, result):
+        from utils.plots import distribution_png
+
+        obs_diff = result['observed_diff']
+        return stored('plot', group_col, value_col, method, **method_params(method),
+                      compute=lambda: distribution_png(result['distribution'], obs_diff,
+                                                       f"Observed Diff: {obs_diff:.2f}", "Bootstrap Mean Differences"))
+
+    def plot_bayesian_posteriors(result):
+        from methods.bayesian_ab import posterior_densities
+        from utils.plots import densities_png
+
+        # Keyed by the posterior parameters, so any dataset with the same posteriors reuses the image
+        plot_key = make_key('posterior_plot', result['model'], tuple(map(str, result['groups'])),
+                            tuple(result['posteriors']))
+        compute = lambda: densities_png([(group, x, pdf) for group, (x, pdf)
+                                         in zip(result['groups'], posterior_densities(result))],
+                                        "Posterior Distributions")
+        return result_cache.get_or_compute(plot_key, lambda: result_store.get_or_compute(
+            plot_key, compute, label='posterior_plot'))
 
     # ========================
-    # Run Selected Test
+    # Result Renderers
     # ========================
-    
-    test_result = None
-    if selected_method == 'T-Test':
-        if validated_df['group'].nunique() == 2:
-            test_result = run_t_test(validated_df)
+    def render_statistic(method, result, key):
+        label = {'T-Test': 'T-statistic', 'ANOVA': 'F-statistic'}.get(method, 'Statistic')
+        st.write(f"**{label}:** {result['statistic']:.4f}")
+        st.write(f"**P-value:** {result['p_value']:.4f}")
+        st.success(result['conclusion'])
+        if experiment is not None:
+            st.image(plot_boxplot())
         else:
-            st.warning("T-Test requires exactly 2 groups.")
+            st.dataframe(pd.DataFrame({'group': summary.labels, 'n': summary.n, 'mean': summary.mean, 'std': summary.std}))
+
+    def render_tukey(method, result, key):
+        from methods.tukey_hsd import plot_tukey
+        from utils.plots import figure_png
+
+        summary_df, _ = result
+        st.dataframe(summary_df)
+        # Intervals are drawn only on request
+        if st.checkbox("Show confidence-interval plot", key=f"tukey_plot_{key}"):
+            st.image(stored('plot', group_col, value_col, method, **method_params(method),
+                            compute=lambda: figure_png(plot_tukey(summary_df, f"{method} Confidence Intervals"))))
+
+    def render_bootstrap(method, result, key):
+        st.write(f"**Observed Difference:** {result['observed_diff']:.4f}")
+        st.write(f"**P-value:** {result['p_value']:.4f}")
+        if result.get('stopped_early'):
+            st.caption(f"Decision settled after {result['iterations_used']:,} permutations (adaptive early stopping).")
+        st.success(result['conclusion'])
+        st.image(plot_bootstrap_distribution(method, result))
+
+    def render_bayesian(method, result, key):
+        st.success(result['conclusion'])
+        st.dataframe(bayesian_table(result))
+        st.image(plot_bayesian_posteriors(result))
+
+    RENDERERS = {
+        'statistic': render_statistic,
+        'tukey': render_tukey,
+        'bootstrap': render_bootstrap,
+        'bayesian': render_bayesian,
+    }
+
+    def render_result(method, result, title):
+        # Methods report failures as strings (Tukey as a (message, None) pair)
+        message = result[0] if isinstance(result, tuple) else result
+        if isinstance(message, str):
+            st.warning(message)
+            return
+        st.markdown(title)
+        RENDERERS[get_method(method).renderer](method, result, key=title)
 
-    elif selected_method == 'ANOVA':
-        if validated_df['group'].nunique() >= 3:
-            test_result = run_anova(validated_df)
-        else:
-            st.warning("ANOVA requires 3 or more groups.")
-
-    elif selected_method == 'Tukey’s HSD':
-        if validated_df['group'].nunique() >= 3:
-            summary_df, tukey_fig = run_tukey_hsd(validated_df, 'group', 'value')
-            if isinstance(summary_df, str):
-                st.warning(summary_df)
-            else:
-                st.markdown("### 📋 Tukey's HSD Results")
-                st.dataframe(summary_df)
-                st.pyplot(tukey_fig)
-        else:
-            st.warning("Tukey’s HSD needs 3 or more groups.")
-
-    elif selected_method == 'Bootstrap':
-        if validated_df['group'].nunique() == 2:
-            test_result = run_bootstrap_test(validated_df)
-        else:
-            st.warning("Bootstrap currently supports only 2 groups.")
-
-    elif selected_method == 'Bayesian A/B':
-        if validated_df['group'].nunique() == 2:
-            test_result = run_bayesian_ab_test(validated_df)
-        else:
-            st.warning("Bayesian A/B Test supports exactly 2 groups.")
+    # ========================
+    # Method Dispatch
+    # ========================
+    # Single dispatch path for the first and the second test
+    def run_method(method):
+        spec = get_method(method)
+        if not spec.accepts(summary.n_groups):
+            st.warning(spec.requirement)
+            return None
+        if spec.input == 'rows' and experiment is None:
+            st.warning(f"{method} needs row-level data; it cannot run on a summary table.")
+            return None
+        data = summary if spec.input == 'summary' else experiment
+        params = method_params(method)
+        if st.session_state.pop('profile_next', False):
+            # Computed afresh under the profiler, bypassing the caches, then cached as usual
+            full_key = make_key(dataset_key, 'result', group_col, value_col, method, **params)
+            paths = st.session_state.setdefault('profile_paths', [])
+            with st.spinner(f"Profiling {method}..."):
+                with profiled(PROFILE_DIR, re.sub(r'[^A-Za-z0-9_.-]+', '_', method), paths):
+                    result = spec.run(data, **params)
+            result_cache.put(full_key, result)
+            result_store.put(full_key, result, label=f"result {group_col} {value_col} {method}")
+            return result
+        if spec.background:
+            # None while the job runs; its progress is shown in place of the result
+            return stored_in_background('result', group_col, value_col, method, label=method,
+                                        compute=lambda report: spec.run(data, progress=report, **params), **params)
+        return cached_test(method, lambda: spec.run(data, **params), **params)
 
     # ========================
-    # Results Display
+    # Run Selected Test
     # ========================
-    if isinstance(test_result, dict):
-        st.markdown(f"### ✅ {selected_method} Results")
-
-        if selected_method == 'T-Test':
-            st.write(f"**T-statistic:** {test_result['statistic']:.4f}")
-            st.write(f"**P-value:** {test_result['p_value']:.4f}")
-            st.success(test_result['conclusion'])
-            st.pyplot(plot_boxplot(validated_df))
-
-        elif selected_method == 'ANOVA':
-            st.write(f"**F-statistic:** {test_result['statistic']:.4f}")
-            st.write(f"**P-value:** {test_result['p_value']:.4f}")
-            st.success(test_result['conclusion'])
-            st.pyplot(plot_boxplot(validated_df))
-
-        elif selected_method == 'Bootstrap':
-            st.write(f"**Observed Difference:** {test_result['observed_diff']:.4f}")
-            st.write(f"**P-value:** {test_result['p_value']:.4f}")
-            st.success(test_result['conclusion'])
-            st.pyplot(plot_bootstrap_distribution(test_result['distribution'], test_result['observed_diff']))
-
-        elif selected_method == 'Bayesian A/B':
-            st.success(test_result['conclusion'])
-            st.pyplot(plot_bayesian_posteriors(test_result['samples'],
-                                               test_result['group1'], test_result['group2']))
+    test_result = run_method(selected_method)
+    if test_result is not None:
+        render_result(selected_method, test_result, f"### ✅ {selected_method} Results")
 
+    if isinstance(test_result, dict):
         # ========================
         # Export
         # ========================
@@ -243,71 +500,23 @@ if validated_df is not None:
             st.markdown("### 🧪 Second A/B Test")
             second_method = st.selectbox("Choose Second Method", options=suggestions, key="second_method")
 
-            second_test_result = None
-
-            if second_method == 'T-Test':
-                if validated_df['group'].nunique() == 2:
-                    second_test_result = run_t_test(validated_df)
-                else:
-                    st.warning("T-Test requires exactly 2 groups.")
-
-            elif second_method == 'ANOVA':
-                if validated_df['group'].nunique() >= 3:
-                    second_test_result = run_anova(validated_df)
-                else:
-                    st.warning("ANOVA requires 3 or more groups.")
-
-            elif second_method == 'Tukey’s HSD':
-                if validated_df['group'].nunique() >= 3:
-                    summary_df, tukey_fig = run_tukey_hsd(validated_df, 'group', 'value')
-                    if isinstance(summary_df, str):
-                        st.warning(summary_df)
-                    else:
-                        st.markdown("### 📋 Tukey's HSD Results (Second Test)")
-                        st.dataframe(summary_df)
-                        st.pyplot(tukey_fig)
-                else:
-                    st.warning("Tukey’s HSD needs 3 or more groups.")
-
-            elif second_method == 'Bootstrap':
-                if validated_df['group'].nunique() == 2:
-                    second_test_result = run_bootstrap_test(validated_df)
-                else:
-                    st.warning("Bootstrap currently supports only 2 groups.")
-
-            elif second_method == 'Bayesian A/B':
-                if validated_df['group'].nunique() == 2:
-                    second_test_result = run_bayesian_ab_test(validated_df)
-                else:
-                    st.warning("Bayesian A/B Test supports exactly 2 groups.")
+            second_test_result = run_method(second_method) if second_method else None
 
     # Save and show result
-            if second_test_result:
+            if isinstance(second_test_result, dict):
                 st.session_state.second_test_result = second_test_result
-                method_used = st.session_state.second_method
+            else:
+                # Pairwise tables are shown directly and are not part of the comparison summary
+                st.session_state.second_test_result = None
+                if second_test_result is not None:
+                    render_result(second_method, second_test_result, f"### ✅ Second Test Result: {second_method}")
 
 
 # DISPLAY SECOND TEST RESULTS
         if st.session_state.second_test_result:
             result = st.session_state.second_test_result
             method = st.session_state.second_method
-            st.markdown(f"### ✅ Second Test Result: {method}")
-
-            if method in ['T-Test', 'ANOVA']:
-                st.write(f"**Statistic:** {result['statistic']:.4f}")
-                st.write(f"**P-value:** {result['p_value']:.4f}")
-                st.success(result['conclusion'])
-                st.pyplot(plot_boxplot(validated_df))
-
-            elif method == 'Bootstrap':
-                st.write(f"**Observed Difference:** {result['observed_diff']:.4f}")
-                st.write(f"**P-value:** {result['p_value']:.4f}")
-                st.success(result['conclusion'])
-                st.pyplot(plot_bootstrap_distribution(result['distribution'], result['observed_diff']))
-
-            elif method == 'Bayesian A/B':
-                st.success(result['conclusion'])
-                st.pyplot(plot_bayesian_posteriors(result['samples'], result['group1'], result['group2']))
+            render_result(method, result, f"### ✅ Second Test Result: {method}")
                 
         # Export Combined Summary (PDF)
         if test_result and st.session_state.get("second_test_result"):
@@ -330,6 +539,7 @@ P-value: {st.session_state.second_test_result.get('p_value', 'N/A')}
             clean_summary = raw_summary.encode('ascii', 'ignore').decode()
 
     # Generate and download PDF
+            from utils.pdf_export import generate_pdf
             pdf = generate_pdf(clean_summary)
 
             if pdf:
@@ -342,7 +552,110 @@ P-value: {st.session_state.second_test_result.get('p_value', 'N/A')}
             else:
                 st.error("PDF generation failed.")
 
-                
-        
+
+# ========================
+# Segment Breakdown
+# ========================
+# Needs the full row-level frame, so it is not offered in streaming or summary mode
+if validated_df is not None and stream_source is None and not summary_input:
+    # Cardinality checks run once per dataset, not on every rerun
+    segment_options = cached('segment_columns', group_col, value_col,
+                             compute=lambda: segment_columns(validated_df, exclude=(group_col, value_col)))
+    if segment_options:
+        with st.expander("🧩 Segment Breakdown"):
+            segment_cols = st.multiselect("Break down by", segment_options)
+            correction = st.radio("Multiple-testing correction", ['holm', 'bh', 'none'], horizontal=True,
+                                  format_func={'holm': 'Holm (FWER)', 'bh': 'Benjamini-Hochberg (FDR)', 'none': 'None'}.get)
+            if segment_cols:
+                from methods.segmented import run_segmented_test
+                segment_method = 't-test' if summary.n_groups == 2 else 'anova'
+                segment_table = stored('segments', group_col, value_col, tuple(segment_cols), segment_method, correction,
+                                       compute=lambda: run_segmented_test(validated_df, segment_cols, group_col, value_col,
+                                                                          method=segment_method, correction=correction))
+                if isinstance(segment_table, str):
+                    st.warning(segment_table)
+                else:
+                    st.caption(f"{len(segment_table)} segments, {int(segment_table['significant'].sum())} significant after correction.")
+                    st.dataframe(segment_table)
+
+
+# ========================
+# Sequential Monitoring
+# ========================
+# Each upload is merged into a persisted running state as one more batch of rows, so
+# refreshes never rescan history and repeated looks do not inflate false positives
+if validated_df is not None:
+    with st.expander("📡 Sequential Monitoring"):
+        from methods.sequential import SequentialMonitor
+
+        monitor_name = st.text_input("Monitored test name", value="my-test")
+        monitor_path = os.path.join(MONITOR_DIR, re.sub(r'[^A-Za-z0-9_.-]+', '_', monitor_name) + ".json")
+        monitor = SequentialMonitor.load(monitor_path)
+        control = monitor.control
+        if control is None:
+            control = st.selectbox("Control group", list(summary.labels))
+        if st.button("➕ Add this data as a new batch"):
+            monitor = SequentialMonitor.load(monitor_path, control=control)
+            if monitor.update(summary, batch_id=str(make_key(dataset_key, group_col, value_col))):
+                monitor.save(monitor_path)
+            else:
+                st.info("This data was already added to the monitor.")
+        if monitor.looks:
+            st.caption(f"{monitor.looks} batch(es) merged; control `{monitor.control}`. Always-valid p-values "
+                       f"and intervals (mSPRT) can be checked after every batch.")
+            st.dataframe(monitor.results())
+
+
+# ========================
+# Power Simulator
+# ========================
+# Planning tool, independent of any uploaded data
+with st.expander("🎲 Power Simulator"):
+    sim_col1, sim_col2, sim_col3 = st.columns(3)
+    with sim_col1:
+        sim_method = st.selectbox("Method", SIM_METHODS)
+        sim_distribution = st.selectbox("Distribution", DISTRIBUTIONS)
+    with sim_col2:
+        sim_effect = st.number_input("Effect size (SDs, or absolute lift for binary)", value=0.2, step=0.05)
+        sim_groups = st.number_input("Groups", min_value=2, max_value=20, value=2 if sim_method != 'anova' else 3)
+    with sim_col3:
+        sim_max_n = st.number_input("Largest N per group", min_value=20, value=1000, step=100)
+        sim_runs = st.number_input("Simulated experiments per N", min_value=100, value=2000, step=500)
+
+    if st.button("Run Simulation"):
+        from utils.simulator import power_curve
+        sample_sizes = tuple(sorted({int(n) for n in np.geomspace(10, sim_max_n, 8)}))
+        with st.spinner("Simulating..."):
+            curve = result_cache.get_or_compute(
+                make_key('simulate', sim_method, sim_distribution, sim_effect, sim_groups, sample_sizes, sim_runs),
+                lambda: power_curve(sample_sizes, sim_effect, method=sim_method, n_sims=int(sim_runs),
+                                    n_groups=int(sim_groups), distribution=sim_distribution, seed=0))
+        st.line_chart(curve.set_index('n_per_group'))
+        st.dataframe(curve)
 
 
+# ========================
+# Diagnostics Panel
+# ========================
+# Filled last so it includes every stage of this run (background jobs appear once they finish)
+if diagnostics is not None:
+    with diagnostics_panel:
+        st.caption(f"Result cache: {result_cache.hits:,} hits / {result_cache.misses:,} misses, "
+                   f"{result_cache.total_bytes / 2 ** 20:,.1f} of {result_cache.max_bytes / 2 ** 20:,.0f} MB. "
+                   f"Disk store: {result_store.hits:,} hits / {result_store.misses:,} misses.")
+        records = list(diagnostics.records)[::-1]
+        if records:
+            timings = pd.DataFrame(records)
+            detail = timings.reindex(columns=['method', 'function', 'command']).bfill(axis=1).iloc[:, 0]
+            timings = timings.assign(detail=detail)[['stage', 'detail', 'wall_s', 'cpu_s', 'peak_mb', 'depth']]
+            st.dataframe(timings, hide_index=True)
+            st.download_button("📥 Timings (JSON lines)", file_name="ab_diagnostics.jsonl", mime="application/json",
+                               data="\n".join(json.dumps(record, default=str) for record in records[::-1]))
+        else:
+            st.caption("No stages recorded yet.")
+        if st.button("Clear timings"):
+            diagnostics.clear()
+        st.button("📸 Profile the next test run", on_click=lambda: st.session_state.update(profile_next=True),
+                  help=f"Runs the selected method once under cProfile and tracemalloc; files go to {PROFILE_DIR}")
+        for path in st.session_state.get('profile_paths', [])[-4:]:
+            st.caption(f"`{path}`")
@@ -0,0 +1,80 @@
+# benchmarks/generators.py
+# Seeded synthetic experiments for the benchmarks: 2-arm or many-arm, with normal, skewed
+# (log-normal, revenue-like) or heavy-tailed (Student t, 2 degrees of freedom) metrics.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+DISTRIBUTIONS = ('normal', 'skewed', 'heavy')
+SEGMENTS = ('desktop', 'mobile', 'tablet')
+CHUNK_ROWS = 1_000_000
+# Metrics are centred near BASE_MEAN; arm i is shifted by i * lift * BASE_MEAN
+BASE_MEAN = 10.0
+
+
+def arm_labels(n_groups):
+    return ['control'] + [f'variant_{i}' for i in range(1, n_groups)]
+
+
+def _values(rng, n, distribution):
+    if distribution == 'normal':
+        return rng.normal(BASE_MEAN, 2.0, n)
+    if distribution == 'skewed':
+        return rng.lognormal(np.log(BASE_MEAN) - 0.5, 1.0, n)
+    if distribution == 'heavy':
+        return BASE_MEAN + 2.0 * rng.standard_t(2, n)
+    raise ValueError(f"Unknown distribution '{distribution}'. Available: {', '.join(DISTRIBUTIONS)}")
+
+
+def generate_chunks(n_rows, n_groups=2, distribution='normal', lift=0.02, seed=0, chunk_rows=CHUNK_ROWS):
+    # (variant, segment, revenue) frames of at most chunk_rows rows, with uniform arm assignment.
+    # Every chunk draws from its own child seed, so the data for a (seed, chunk_rows) pair is
+    # reproducible and never needs to be held in memory at once.
+    labels = pd.CategoricalDtype(arm_labels(n_groups))
+    segments = pd.CategoricalDtype(SEGMENTS)
+    n_chunks = max(1, -(-n_rows // chunk_rows))
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        rng = np.random.default_rng(child)
+        n = min(chunk_rows, n_rows - i * chunk_rows)
+        codes = rng.integers(0, n_groups, n)
+        values = _values(rng, n, distribution) + codes * lift * BASE_MEAN
+        yield pd.DataFrame({
+            'variant': pd.Categorical.from_codes(codes, dtype=labels),
+            'segment': pd.Categorical.from_codes(rng.integers(0, len(SEGMENTS), n), dtype=segments),
+            'revenue': values,
+        })
+
+
+def generate(n_rows, n_groups=2, distribution='normal', lift=0.02, seed=0, chunk_rows=CHUNK_ROWS):
+    return pd.concat(generate_chunks(n_rows, n_groups, distribution, lift, seed, chunk_rows), ignore_index=True)
+
+
+def dataset_path(directory, n_rows, n_groups, distribution, seed, ext):
+    return os.path.join(directory, f"{distribution}-{n_groups}arm-{n_rows}-s{seed}{ext}")
+
+
+def write_dataset(path, n_rows, n_groups=2, distribution='normal', lift=0.02, seed=0, chunk_rows=CHUNK_ROWS):
+    # CSV or Parquet (by extension), written chunk by chunk; an existing file is reused
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    chunks = generate_chunks(n_rows, n_groups, distribution, lift, seed, chunk_rows)
+    if path.endswith('.parquet'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, table.schema)
+            writer.write_table(table)
+        writer.close()
+    else:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(tmp_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    os.replace(tmp_path, path)
+    return path
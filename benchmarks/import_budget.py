@@ -0,0 +1,65 @@
+# benchmarks/import_budget.py
+# Cold-start import time of the app and the CLI, checked against a budget.
+# Usage: python benchmarks/import_budget.py [--runs 5]   (exits 1 when over budget)
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds, median of fresh interpreters
+BUDGETS = {'app': 1.5, 'cli': 0.25}
+# Must not be imported until a method or plot actually needs them
+HEAVY_MODULES = ('scipy', 'statsmodels', 'seaborn', 'matplotlib', 'openai')
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'heavy': sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def app_imports():
+    # Top-level import statements of app.py; executing the script itself needs a Streamlit runtime
+    tree = ast.parse(open(os.path.join(ROOT, 'app.py'), encoding='utf-8').read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def measure(imports, runs):
+    code = _PROBE.format(imports=imports, heavy=HEAVY_MODULES)
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout))
+    return {'seconds': statistics.median(s['seconds'] for s in samples), 'heavy': samples[-1]['heavy']}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check app and CLI import time against the budget")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    targets = {
+        'app': app_imports(),
+        'cli': "import cli\ncli.build_parser()",
+    }
+    failed = False
+    for name, imports in targets.items():
+        result = measure(imports, args.runs)
+        over = result['seconds'] > BUDGETS[name] or result['heavy']
+        failed |= bool(over)
+        status = 'OVER BUDGET' if over else 'ok'
+        print(f"{name}: {result['seconds']:.3f}s (budget {BUDGETS[name]:.2f}s), "
+              f"heavy modules loaded: {', '.join(result['heavy']) or 'none'} -> {status}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+# benchmarks/run_benchmarks.py
+# Times and memory-profiles each pipeline stage (ingestion, validation, column profiling,
+# every method, plotting, streaming) on seeded synthetic data, writes the results as JSON
+# and flags regressions against a baseline run.
+# Usage: python benchmarks/run_benchmarks.py [--sizes 1e3 1e4 1e5 1e6] [--arms 2 5]
+#            [--distributions normal skewed heavy] [--output bench.json]
+#            [--baseline old.json] [--tolerance 0.25]   (exits 1 on regressions)
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generators import DISTRIBUTIONS, dataset_path, write_dataset
+
+DEFAULT_SIZES = (1e3, 1e4, 1e5, 1e6)
+DEFAULT_DATA_DIR = os.path.join(ROOT, '.cache', 'benchmarks')
+# Above this many rows only the streaming stages run; everything else needs the data in memory
+MAX_IN_MEMORY_ROWS = 10_000_000
+# Differences smaller than this are timer noise, whatever the relative change
+MIN_SECONDS_DELTA = 0.005
+MIN_MB_DELTA = 1.0
+
+
+def measure(fn, repeat=3, memory=True):
+    # Best wall and CPU time over `repeat` runs, then one run under tracemalloc for the peak
+    # allocation (allocations made by NumPy and pandas are traced; some Arrow buffers are not)
+    wall, cpu = [], []
+    for _ in range(repeat):
+        start, start_cpu = time.perf_counter(), time.process_time()
+        fn()
+        wall.append(time.perf_counter() - start)
+        cpu.append(time.process_time() - start_cpu)
+    result = {'seconds': min(wall), 'cpu_seconds': min(cpu), 'peak_mb': None}
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            result['peak_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def in_memory_stages(csv_path, parquet_path, n_groups):
+    # (stage, callable) pairs for a dataset small enough to load
+    from methods.registry import METHODS
+    from methods.segmented import run_segmented_test
+    from methods.sequential import SequentialMonitor
+    from utils.columnar import load_table
+    from utils.data_validator import profile_columns, validate_csv
+    from utils.experiment_data import ExperimentData
+    from utils.group_stats import GroupStats
+    from utils.plots import boxplot_png, distribution_png
+
+    df = load_table(parquet_path)
+    data = ExperimentData.from_frame(df, 'variant', 'revenue')
+    stats = data.stats()
+
+    # Summary-input methods are timed on precomputed GroupStats; building them is its own stage
+    # (from_sorted directly, since ExperimentData.stats() memoizes)
+    stages = [
+        ('ingest:csv', lambda: load_table(csv_path)),
+        ('ingest:parquet', lambda: load_table(parquet_path)),
+        ('validate', lambda: validate_csv(df.copy(deep=False))),
+        ('profile', lambda: profile_columns(df)),
+        ('experiment_data', lambda: ExperimentData.from_frame(df, 'variant', 'revenue')),
+        ('stats', lambda: GroupStats.from_sorted(data.labels, data.values, data.offsets)),
+    ]
+    for spec in METHODS.values():
+        if spec.accepts(n_groups):
+            kwargs = {'seed': 0} if spec.name == 'Bootstrap' else {}
+            target = data if spec.input == 'rows' else stats
+            stages.append((f'method:{spec.name}', lambda spec=spec, target=target, kwargs=kwargs: spec.run(target, **kwargs)))
+    method = 't-test' if n_groups == 2 else 'anova'
+    stages += [
+        ('method:Segmented', lambda: run_segmented_test(df, ['segment'], 'variant', 'revenue', method=method)),
+        ('method:Sequential', lambda: SequentialMonitor().update(data)),
+        ('plot:box', lambda: boxplot_png(data)),
+        ('plot:distribution', lambda: distribution_png(data.group(0))),
+    ]
+    return stages
+
+
+def run_case(n_rows, n_groups, distribution, args):
+    from utils.streaming import stream_csv
+
+    parquet_path = write_dataset(dataset_path(args.data_dir, n_rows, n_groups, distribution, args.seed, '.parquet'),
+                                 n_rows, n_groups, distribution, seed=args.seed)
+    stages = [('stream:parquet', lambda: stream_csv(parquet_path, 'variant', 'revenue', seed=0))]
+    if n_rows <= args.max_in_memory:
+        csv_path = write_dataset(dataset_path(args.data_dir, n_rows, n_groups, distribution, args.seed, '.csv'),
+                                 n_rows, n_groups, distribution, seed=args.seed)
+        stages = in_memory_stages(csv_path, parquet_path, n_groups) + stages
+
+    case = f"{distribution}-{n_groups}arm-{n_rows}"
+    rows = []
+    for stage, fn in stages:
+        result = measure(fn, args.repeat, not args.no_memory)
+        rows.append({'case': case, 'n_rows': n_rows, 'n_groups': n_groups, 'distribution': distribution,
+                     'stage': stage, **result})
+        peak = f"{result['peak_mb']:9.1f} MB" if result['peak_mb'] is not None else ''
+        print(f"{case:<28} {stage:<24} {result['seconds']:9.4f}s {result['cpu_seconds']:9.4f}s cpu {peak}", flush=True)
+    return rows
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'platform': platform.platform(),
+            'cpus': os.cpu_count(), 'numpy': np.__version__, 'pandas': pd.__version__,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def compare(results, baseline, tolerance):
+    # Stages slower (or with a larger peak) than the baseline by more than `tolerance`, relatively,
+    # and by more than the noise floor
+    previous = {(row['case'], row['stage']): row for row in baseline['results']}
+    regressions = []
+    for row in results:
+        old = previous.get((row['case'], row['stage']))
+        if old is None:
+            continue
+        for field, floor in (('seconds', MIN_SECONDS_DELTA), ('peak_mb', MIN_MB_DELTA)):
+            new_value, old_value = row.get(field), old.get(field)
+            if new_value is None or old_value is None:
+                continue
+            if new_value > old_value * (1 + tolerance) and new_value - old_value > floor:
+                regressions.append({'case': row['case'], 'stage': row['stage'], 'field': field,
+                                    'baseline': old_value, 'current': new_value})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ingestion, validation, methods and plotting on synthetic data")
+    parser.add_argument('--sizes', nargs='+', type=float, default=DEFAULT_SIZES, help="Row counts, e.g. 1e3 1e6 1e8")
+    parser.add_argument('--arms', nargs='+', type=int, default=(2, 5))
+    parser.add_argument('--distributions', nargs='+', choices=DISTRIBUTIONS, default=DISTRIBUTIONS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc run of each stage")
+    parser.add_argument('--max-in-memory', type=float, default=MAX_IN_MEMORY_ROWS,
+                        help="Larger datasets only run the streaming stages")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="Where generated datasets are kept for reuse")
+    parser.add_argument('--output', default='bench.json')
+    parser.add_argument('--baseline', help="Earlier --output file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed relative slowdown before flagging")
+    args = parser.parse_args(argv)
+
+    results = []
+    for distribution in args.distributions:
+        for n_groups in args.arms:
+            for size in args.sizes:
+                results += run_case(int(size), n_groups, distribution, args)
+
+    report = {'environment': environment(), 'results': results}
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    print(f"Wrote {len(results)} measurements to {args.output}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for r in regressions:
+        print(f"REGRESSION {r['case']} {r['stage']} {r['field']}: {r['baseline']:.4f} -> {r['current']:.4f}")
+    if not regressions:
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
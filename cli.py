@@ -0,0 +1,207 @@
+# cli.py
+# Headless entry point: python cli.py <command> [options]
+
+import argparse
+import contextlib
+import json
+import sys
+
+
+def _split(value):
+    return [v.strip() for v in value.split(',') if v.strip()] if value else []
+
+
+def cmd_batch(args):
+    from utils.batch_runner import iter_long_format, iter_manifest, run_batch
+
+    if args.manifest:
+        tasks = iter_manifest(args.manifest)
+    else:
+        tasks = iter_long_format(args.input, args.group_col, _split(args.metrics), args.experiment_col,
+                                 args.metric_col, args.value_col)
+
+    summary = run_batch(tasks, args.output, methods=_split(args.methods), n_jobs=args.jobs, seed=args.seed)
+    print(json.dumps(summary))
+
+
+def cmd_report(args):
+    from utils.batch_runner import iter_long_format, iter_manifest
+    from utils.reports import run_report
+
+    if args.manifest:
+        tasks = iter_manifest(args.manifest)
+    else:
+        tasks = iter_long_format(args.input, args.group_col, _split(args.metrics), args.experiment_col,
+                                 args.metric_col, args.value_col)
+
+    summary = run_report(tasks, args.output, methods=_split(args.methods), n_jobs=args.jobs, seed=args.seed,
+                         figures=not args.no_figures, title=args.title, alpha=args.alpha)
+    print(json.dumps(summary))
+
+
+def cmd_segments(args):
+    from methods.segmented import run_segmented_test
+    from utils.columnar import load_table
+
+    segments = _split(args.segments)
+    df = load_table(args.input, columns=segments + [args.group_col, args.value_col])
+
+    table = run_segmented_test(df, segments, args.group_col, args.value_col, method=args.method,
+                               equal_var=not args.welch, correction=args.correction, alpha=args.alpha)
+    if isinstance(table, str):
+        raise SystemExit(table)
+    if args.output:
+        table.to_csv(args.output, index=False)
+    else:
+        table.to_csv(sys.stdout, index=False)
+
+
+def cmd_simulate(args):
+    from utils.simulator import power_curve, required_sample_size, simulate_rejection_rate
+
+    options = dict(n_groups=args.groups, std=args.std, distribution=args.distribution, baseline=args.baseline,
+                   alpha=args.alpha, n_jobs=args.jobs)
+    if args.target_power:
+        n = required_sample_size(args.effect_size, args.target_power, method=args.method, n_sims=args.sims,
+                                 seed=args.seed, **options)
+        print(json.dumps({'required_n_per_group': n, 'target_power': args.target_power}))
+    elif len(args.n) > 1:
+        power_curve(args.n, args.effect_size, method=args.method, n_sims=args.sims, seed=args.seed,
+                    **options).to_csv(sys.stdout, index=False)
+    else:
+        print(json.dumps(simulate_rejection_rate(args.method, args.sims, args.n[0], effect_size=args.effect_size,
+                                                 seed=args.seed, **options)))
+
+
+def cmd_monitor(args):
+    import os
+    from methods.sequential import SequentialMonitor
+    from utils.cache import content_hash
+    from utils.streaming import normalize_column, read_appended_rows, read_columns
+
+    # Column names are matched case- and whitespace-insensitively in both modes
+    group_col, value_col = normalize_column(args.group_col), normalize_column(args.value_col)
+    monitor = SequentialMonitor.load(args.state, control=args.control, alpha=args.alpha, tau=args.tau)
+    if args.tail:
+        # Append-only CSV: only the bytes written since the last run are read
+        source = os.path.abspath(args.input)
+        rows, offset = read_appended_rows(source, monitor.offsets.get(source, 0))
+        if len(rows):
+            monitor.update(rows, group_col, value_col)
+        monitor.offsets[source] = offset
+        added = len(rows)
+    else:
+        # Each input file is one batch of new rows; a file that was already merged is skipped
+        with open(args.input, 'rb') as f:
+            batch_id = content_hash(f)
+        rows = read_columns(args.input, [group_col, value_col])
+        added = len(rows) if monitor.update(rows, group_col, value_col, batch_id=batch_id) else 0
+    monitor.save(args.state)
+
+    print(json.dumps({'rows_added': added, 'looks': monitor.looks, 'tau': monitor.tau}), file=sys.stderr)
+    monitor.results(args.correction).to_csv(sys.stdout, index=False)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description="A/B Testing Simulator (headless)")
+    parser.add_argument('--log-json', action='store_true',
+                        help="Write wall time, CPU time and peak allocation of each stage to stderr as JSON lines")
+    parser.add_argument('--trace-memory', action='store_true', help="Include tracemalloc peaks in --log-json records")
+    parser.add_argument('--profile', metavar='DIR', help="Dump a cProfile and a tracemalloc snapshot of the run to DIR")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch = commands.add_parser('batch', help="Run methods across many experiments and metrics")
+    source = batch.add_mutually_exclusive_group(required=True)
+    source.add_argument('--input', help="Long-format CSV, Parquet or Arrow/Feather file")
+    source.add_argument('--manifest', help="JSON list of {path, group_col, metrics, name}")
+    batch.add_argument('--group-col', default='group')
+    batch.add_argument('--experiment-col', help="Column identifying the experiment")
+    batch.add_argument('--metrics', help="Comma-separated metric columns (wide format)")
+    batch.add_argument('--metric-col', help="Metric name column (long format)")
+    batch.add_argument('--value-col', default='value', help="Metric value column (long format)")
+    batch.add_argument('--methods', default='t-test,anova,bayesian',
+                       help="Comma-separated: t-test, anova, tukey, games-howell, bootstrap, bayesian")
+    batch.add_argument('--output', required=True, help="Results file (.csv or .parquet)")
+    batch.add_argument('--jobs', type=int, default=1, help="Worker processes (-1 = all cores)")
+    batch.add_argument('--seed', type=int, help="Seed for resampling methods")
+    batch.set_defaults(func=cmd_batch)
+
+    report = commands.add_parser('report', help="Multi-page PDF/HTML report over many experiments")
+    source = report.add_mutually_exclusive_group(required=True)
+    source.add_argument('--input', help="Long-format CSV, Parquet or Arrow/Feather file")
+    source.add_argument('--manifest', help="JSON list of {path, group_col, metrics, name}")
+    report.add_argument('--group-col', default='group')
+    report.add_argument('--experiment-col', help="Column identifying the experiment")
+    report.add_argument('--metrics', help="Comma-separated metric columns (wide format)")
+    report.add_argument('--metric-col', help="Metric name column (long format)")
+    report.add_argument('--value-col', default='value', help="Metric value column (long format)")
+    report.add_argument('--methods', default='t-test,anova,bayesian',
+                        help="Comma-separated: t-test, anova, tukey, games-howell, bootstrap, bayesian")
+    report.add_argument('--output', required=True, nargs='+', help="Report file(s): .pdf and/or .html")
+    report.add_argument('--title', default="A/B Testing Report")
+    report.add_argument('--alpha', type=float, default=0.05, help="Significance level for the overview")
+    report.add_argument('--no-figures', action='store_true', help="Tables only")
+    report.add_argument('--jobs', type=int, default=1, help="Worker processes (-1 = all cores)")
+    report.add_argument('--seed', type=int, help="Seed for resampling methods")
+    report.set_defaults(func=cmd_report)
+
+    segments = commands.add_parser('segments', help="Same test per segment with multiple-testing correction")
+    segments.add_argument('--input', required=True, help="Row-level CSV, Parquet or Arrow/Feather file")
+    segments.add_argument('--segments', required=True, help="Comma-separated segment columns")
+    segments.add_argument('--group-col', default='group')
+    segments.add_argument('--value-col', default='value')
+    segments.add_argument('--method', choices=['t-test', 'anova'], default='t-test')
+    segments.add_argument('--welch', action='store_true', help="Welch instead of Student t-test")
+    segments.add_argument('--correction', choices=['holm', 'bh', 'none'], default='holm')
+    segments.add_argument('--alpha', type=float, default=0.05)
+    segments.add_argument('--output', help="Results CSV (default: stdout)")
+    segments.set_defaults(func=cmd_segments)
+
+    simulate = commands.add_parser('simulate', help="Monte Carlo power / type-I error / required N")
+    simulate.add_argument('--method', choices=['t-test', 'welch', 'anova', 'bootstrap'], default='t-test')
+    simulate.add_argument('--n', type=int, nargs='+', default=[1000], help="Per-group sample size(s)")
+    simulate.add_argument('--effect-size', type=float, default=0.0)
+    simulate.add_argument('--groups', type=int, default=2)
+    simulate.add_argument('--std', type=float, default=1.0)
+    simulate.add_argument('--distribution', choices=['normal', 'lognormal', 'heavy_tailed', 'binary'], default='normal')
+    simulate.add_argument('--baseline', type=float, default=0.1, help="Control conversion rate (binary)")
+    simulate.add_argument('--alpha', type=float, default=0.05)
+    simulate.add_argument('--sims', type=int, default=10000, help="Simulated experiments per point")
+    simulate.add_argument('--target-power', type=float, help="Search for the N reaching this power")
+    simulate.add_argument('--jobs', type=int, default=1)
+    simulate.add_argument('--seed', type=int)
+    simulate.set_defaults(func=cmd_simulate)
+
+    monitor = commands.add_parser('monitor', help="Sequential (always-valid) monitoring with persisted state")
+    monitor.add_argument('--input', required=True, help="New rows: a CSV, Parquet or Arrow/Feather batch, "
+                                                        "or an append-only CSV with --tail")
+    monitor.add_argument('--state', required=True, help="JSON state file (created on the first run)")
+    monitor.add_argument('--tail', action='store_true', help="Read only rows appended since the last run")
+    monitor.add_argument('--group-col', default='group')
+    monitor.add_argument('--value-col', default='value')
+    monitor.add_argument('--control', help="Control group label (default: first group seen)")
+    monitor.add_argument('--alpha', type=float, default=0.05)
+    monitor.add_argument('--tau', type=float,
+                         help="Mixing scale of the mSPRT in metric units (default: 0.1 pooled SD of the first batch)")
+    monitor.add_argument('--correction', choices=['holm', 'bh', 'none'], default='holm')
+    monitor.set_defaults(func=cmd_monitor)
+
+    return parser
+
+
+def main(argv=None):
+    from utils.instrumentation import Recorder, profiled, stage
+
+    args = build_parser().parse_args(argv)
+    with contextlib.ExitStack() as stack:
+        if args.log_json:
+            # Stages run in --jobs worker processes are not recorded, only their total in the parent
+            stack.enter_context(Recorder(trace_memory=args.trace_memory, stream=sys.stderr).activate())
+        if args.profile:
+            stack.enter_context(profiled(args.profile, args.command))
+        with stage('command', command=args.command):
+            args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
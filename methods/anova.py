@@ -1,12 +1,36 @@
 # methods/anova.py
 
-from scipy.stats import f_oneway
+import numpy as np
+from scipy.stats import f as f_dist
+
+from utils.group_stats import as_group_stats
+
+def anova_arrays(n, mean, m2):
+    # One-way ANOVA F from per-group moments: between- vs within-group mean squares.
+    # Groups run along the last axis, so a stack of experiments is tested at once.
+    n = np.asarray(n, dtype=np.float64)
+    k = n.shape[-1]
+    n_total = n.sum(axis=-1)
+    grand_mean = (n * mean).sum(axis=-1) / n_total
+
+    ss_between = np.sum(n * (mean - grand_mean[..., None]) ** 2, axis=-1)
+    ss_within = np.sum(m2, axis=-1)
+    df_between, df_within = k - 1, n_total - k
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stat = (ss_between / df_between) / (ss_within / df_within)
+
+    p_value = f_dist.sf(stat, df_between, df_within)
+    return stat, p_value
+
+def anova_from_stats(stats):
+    stat, p_value = anova_arrays(stats.n, stats.mean, stats.m2)
+    return float(stat), float(p_value)
 
 def run_anova(df):
-    groups = df['group'].unique()
-    group_data = [df[df['group'] == g]['value'] for g in groups]
+    stats = as_group_stats(df)
 
-    stat, p_value = f_oneway(*group_data)
+    stat, p_value = anova_from_stats(stats)
 
     conclusion = "✅ At least one group is significantly different." if p_value < 0.05 else "⚠️ No significant difference found."
 
@@ -1,35 +1,135 @@
 # methods/bayesian_ab.py
 
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
+from scipy import stats as sps
+from scipy.integrate import trapezoid
 
-def run_bayesian_ab_test(df, num_samples=10000):
-    groups = df['group'].unique()
-    if len(groups) != 2:
-        return "Bayesian A/B test currently supports only 2 groups."
+from utils.group_stats import as_group_stats
 
-    group1 = df[df['group'] == groups[0]]['value'].values
-    group2 = df[df['group'] == groups[1]]['value'].values
+# Density points per arm, and the plotted range in posterior standard deviations, for the posterior plot
+PLOT_POINTS = 256
+PLOT_WIDTH = 4.0
+# Quadrature points per arm; the integration grid is the union of the per-arm grids
+GRID_POINTS = 512
+GRID_WIDTH = 8.0
+# Smallest posterior scale of a Normal arm, relative to the widest arm: an arm whose values are
+# all identical has scale 0, which scipy rejects (every pdf/cdf is NaN); it becomes a near point mass
+SCALE_FLOOR = 1e-6
 
-    # Posterior distributions (Normal approximation)
-    g1_mean, g1_std = np.mean(group1), np.std(group1) / np.sqrt(len(group1))
-    g2_mean, g2_std = np.mean(group2), np.std(group2) / np.sqrt(len(group2))
 
-    # Sampling from posteriors
-    g1_samples = np.random.normal(g1_mean, g1_std, num_samples)
-    g2_samples = np.random.normal(g2_mean, g2_std, num_samples)
+def is_binary_metric(stats):
+    # For values in [0, 1], M2 == n * p * (1 - p) holds exactly only when every value is 0 or 1
+    mean = stats.mean
+    if np.any((mean < 0) | (mean > 1)):
+        return False
+    return bool(np.allclose(stats.m2, stats.n * mean * (1 - mean), rtol=1e-9, atol=1e-9))
 
-    prob_A_better = np.mean(g1_samples > g2_samples)
-    prob_B_better = 1 - prob_A_better
 
-    conclusion = f"✅ There is a **{prob_A_better*100:.1f}%** chance that `{groups[0]}` is better than `{groups[1]}`."
+def _posteriors(stats, model, prior):
+    if model == 'beta':
+        successes = np.round(stats.n * stats.mean)
+        return [sps.beta(prior[0] + s, prior[1] + n - s) for s, n in zip(successes, stats.n)]
+
+    # Normal approximation to the posterior of each mean under a flat prior
+    sd = np.sqrt(stats.m2 / stats.n) / np.sqrt(stats.n)
+    reference = sd.max() if sd.max() > 0 else max(1.0, float(np.abs(stats.mean).max()))
+    sd = np.maximum(sd, SCALE_FLOOR * reference)
+    return [sps.norm(m, s) for m, s in zip(stats.mean, sd)]
+
+
+def _grid(dists, model):
+    points = []
+    for dist in dists:
+        center, spread = dist.mean(), dist.std()
+        lo, hi = center - GRID_WIDTH * spread, center + GRID_WIDTH * spread
+        if model == 'beta':
+            lo, hi = max(lo, 0.0), min(hi, 1.0)
+        points.append(np.linspace(lo, hi, GRID_POINTS))
+    return np.unique(np.concatenate(points))
+
+
+def prob_best_and_loss(dists, model):
+    # P(arm i is best) = ∫ f_i(x) Π_{j≠i} F_j(x) dx, vectorised over arms on one grid.
+    # E[max] is the same integral weighted by x; expected loss_i = E[max] - E[θ_i].
+    x = _grid(dists, model)
+    pdf = np.array([d.pdf(x) for d in dists])
+    cdf = np.array([d.cdf(x) for d in dists])
+
+    # Product of the other arms' CDFs via prefix/suffix products (no division by zero)
+    ones = np.ones((1, len(x)))
+    prefix = np.cumprod(np.vstack([ones, cdf[:-1]]), axis=0)
+    suffix = np.cumprod(np.vstack([ones, cdf[:0:-1]]), axis=0)[::-1]
+    integrand = pdf * prefix * suffix
+
+    prob_best = trapezoid(integrand, x, axis=1)
+    prob_best = prob_best / prob_best.sum()
+    expected_max = trapezoid(integrand * x, x, axis=1).sum()
+    means = np.array([d.mean() for d in dists])
+    expected_loss = np.maximum(expected_max - means, 0.0)
+    return prob_best, expected_loss
+
+
+def _two_arm_normal(dists):
+    # Closed form for D = θ_B - θ_A ~ N(mu, sigma): P(A > B) and E[max(D, 0)]
+    (m_a, s_a), (m_b, s_b) = [(d.mean(), d.std()) for d in dists]
+    mu = m_b - m_a
+    sigma = np.hypot(s_a, s_b)
+    if sigma == 0:
+        prob_a = float(mu < 0) + 0.5 * float(mu == 0)
+        return np.array([prob_a, 1 - prob_a]), np.array([max(mu, 0.0), max(-mu, 0.0)])
+    z = mu / sigma
+    prob_a = sps.norm.cdf(-z)
+    loss_a = sigma * sps.norm.pdf(z) + mu * sps.norm.cdf(z)
+    loss_b = loss_a - mu
+    return np.array([prob_a, 1 - prob_a]), np.array([loss_a, loss_b])
+
+
+def posterior_densities(result, num_points=PLOT_POINTS):
+    # Exact posterior density of each arm on its own grid, for plotting (no sampling or KDE)
+    family = sps.beta if result['model'] == 'beta' else sps.norm
+    curves = []
+    for params in result['posteriors']:
+        dist = family(*params)
+        center, spread = dist.mean(), dist.std()
+        lo, hi = center - PLOT_WIDTH * spread, center + PLOT_WIDTH * spread
+        if result['model'] == 'beta':
+            lo, hi = max(lo, 0.0), min(hi, 1.0)
+        x = np.linspace(lo, hi, num_points)
+        curves.append((x, dist.pdf(x)))
+    return curves
+
+
+def run_bayesian_ab_test(df, model='auto', prior=(1.0, 1.0)):
+    stats = as_group_stats(df)
+    groups = list(stats.labels)
+    if len(groups) < 2:
+        return "Bayesian A/B test needs at least 2 groups."
+
+    if model == 'auto':
+        model = 'beta' if is_binary_metric(stats) else 'normal'
+    dists = _posteriors(stats, model, prior)
+
+    if model == 'normal' and len(groups) == 2:
+        prob_best, expected_loss = _two_arm_normal(dists)
+    else:
+        prob_best, expected_loss = prob_best_and_loss(dists, model)
+
+    prob_A_better = float(prob_best[0]) if len(groups) == 2 else None
+    if len(groups) == 2:
+        conclusion = f"✅ There is a **{prob_A_better*100:.1f}%** chance that `{groups[0]}` is better than `{groups[1]}`."
+    else:
+        best = int(np.argmax(prob_best))
+        conclusion = f"✅ `{groups[best]}` has a **{prob_best[best]*100:.1f}%** chance of being the best of {len(groups)} groups."
 
     return {
+        "groups": groups,
         "group1": groups[0],
         "group2": groups[1],
+        "model": model,
+        "posteriors": [tuple(float(a) for a in d.args) for d in dists],
+        "prob_best": prob_best,
+        "expected_loss": expected_loss,
         "prob_A_better": prob_A_better,
-        "prob_B_better": prob_B_better,
-        "samples": (g1_samples, g2_samples),
+        "prob_B_better": 1 - prob_A_better if prob_A_better is not None else None,
         "conclusion": conclusion
     }
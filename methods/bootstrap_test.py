@@ -1,38 +1,121 @@
 # methods/bootstrap_test.py
 
+from contextlib import ExitStack
+
 import numpy as np
-import pandas as pd
+from scipy.stats import beta
+
+from methods.resampling import Shared, run_sharded, shard_count, shared_pool
+from utils.experiment_data import as_experiment_data
+
+# Upper bound on the size of one block of permuted values held in memory at once
+DEFAULT_MAX_MEMORY_MB = 256
+# Relative slack when comparing permuted statistics with the observed one: relabellings that
+# reproduce the observed split sum the same values in another order, and must still count as ties
+TIE_TOLERANCE = 1e-12
+
+
+def _chunk_size(n_values, max_memory_mb):
+    # Each permutation row is one float64 copy of the combined sample
+    row_bytes = max(n_values, 1) * 8
+    return max(1, int(max_memory_mb * 1024 * 1024 // row_bytes))
+
+
+def _mean_diff(sum1, total, n1, n2):
+    # |mean(g1) - mean(g2)| from the first group's sum; used for the observed and the permuted labels alike
+    return np.abs(sum1 / n1 - (total - sum1) / n2)
+
+
+def permutation_diffs(combined, n1, num_iterations, max_memory_mb=DEFAULT_MAX_MEMORY_MB, rng=None):
+    # Null distribution of |mean(g1) - mean(g2)| under random relabelling,
+    # computed in blocks of permutations instead of one shuffle at a time.
+    rng = np.random.default_rng() if rng is None else rng
+    combined = np.ascontiguousarray(combined, dtype=np.float64)
+    n = len(combined)
+    n2 = n - n1
+    total = combined.sum()
 
-def run_bootstrap_test(df, num_iterations=10000):
-    groups = df['group'].unique()
-    if len(groups) != 2:
+    diffs = np.empty(num_iterations, dtype=np.float64)
+    chunk = min(_chunk_size(n, max_memory_mb), num_iterations)
+    buffer = np.empty((chunk, n), dtype=np.float64)
+
+    for start in range(0, num_iterations, chunk):
+        stop = min(start + chunk, num_iterations)
+        block = buffer[:stop - start]
+        block[:] = combined
+        rng.permuted(block, axis=1, out=block)
+        # Only the first group's sum is needed; the second follows from the total
+        sum1 = block[:, :n1].sum(axis=1)
+        diffs[start:stop] = _mean_diff(sum1, total, n1, n2)
+
+    return diffs
+
+
+def p_value_interval(count, iterations, error_rate):
+    # Clopper-Pearson interval for the permutation p-value after `iterations` draws
+    lower = beta.ppf(error_rate / 2, count, iterations - count + 1) if count > 0 else 0.0
+    upper = beta.ppf(1 - error_rate / 2, count + 1, iterations - count) if count < iterations else 1.0
+    return lower, upper
+
+
+def run_bootstrap_test(df, num_iterations=10000, max_memory_mb=DEFAULT_MAX_MEMORY_MB, n_jobs=1, seed=None,
+                       adaptive=False, alpha=0.05, error_rate=0.001, batch_size=500, progress=None):
+    # progress, when given, is called after every batch with the permutations drawn so far
+    # and the running p-value (once at the end in the fixed mode)
+    data = as_experiment_data(df)
+    if data.n_groups != 2:
         return "Bootstrap currently supports only 2 groups."
 
-    group1 = df[df['group'] == groups[0]]['value'].values
-    group2 = df[df['group'] == groups[1]]['value'].values
+    group1 = data.group(0)
+    group2 = data.group(1)
+
+    obs_diff = float(_mean_diff(group1.sum(), data.values.sum(), len(group1), len(group2)))
+    threshold = obs_diff * (1 - TIE_TOLERANCE)
+
+    # Adaptive mode draws permutations in batches and stops as soon as the interval on the
+    # running p-value lies entirely on one side of alpha. The error budget is split over
+    # all possible looks, so the chance of a different decision than the full run stays
+    # below error_rate. The fixed mode is a single batch of num_iterations.
+    batch = min(batch_size, num_iterations) if adaptive else num_iterations
+    n_looks = -(-num_iterations // batch)
+    round_seeds = np.random.SeedSequence(seed).spawn(n_looks)
+
+    parts = []
+    count = iterations = 0
+    with ExitStack() as stack:
+        # Groups are already contiguous, so the combined sample is the value array itself.
+        # With workers, one pool serves every round and receives the values once.
+        values, pool = data.values, None
+        if shard_count(batch, n_jobs) > 1:
+            pool = stack.enter_context(shared_pool(shard_count(batch, n_jobs), values=data.values))
+            values = Shared('values')
 
-    obs_diff = abs(np.mean(group1) - np.mean(group2))
+        for round_seed in round_seeds:
+            size = min(batch, num_iterations - iterations)
+            # The memory ceiling is shared between the shards of the round
+            shards = run_sharded(permutation_diffs, (values, len(group1)), size, n_jobs=n_jobs, seed=round_seed,
+                                 pool=pool, max_memory_mb=max_memory_mb / shard_count(size, n_jobs))
+            parts.extend(shards)
+            count += sum(int(np.count_nonzero(d >= threshold)) for d in shards)
+            iterations += size
+            if progress is not None:
+                progress(iterations=iterations, total=num_iterations, p_value=count / iterations)
 
-    combined = np.concatenate([group1, group2])
-    count = 0
-    diffs = []
+            if adaptive and iterations < num_iterations:
+                lower, upper = p_value_interval(count, iterations, error_rate / n_looks)
+                if upper < alpha or lower >= alpha:
+                    break
 
-    for _ in range(num_iterations):
-        np.random.shuffle(combined)
-        new_group1 = combined[:len(group1)]
-        new_group2 = combined[len(group1):]
-        diff = abs(np.mean(new_group1) - np.mean(new_group2))
-        diffs.append(diff)
-        if diff >= obs_diff:
-            count += 1
+    diffs = np.concatenate(parts)
+    p_value = count / iterations
 
-    p_value = count / num_iterations
+    conclusion = f"✅ Statistically significant difference (p < {alpha})" if p_value < alpha else f"⚠️ No statistically significant difference (p ≥ {alpha})"
 
-    conclusion = "✅ Statistically significant difference (p < 0.05)" if p_value < 0.05 else "⚠️ No statistically significant difference (p ≥ 0.05)"
-    
     return {
         "observed_diff": obs_diff,
         "p_value": p_value,
         "conclusion": conclusion,
-        "distribution": diffs
+        "distribution": diffs,
+        "iterations_used": iterations,
+        "stopped_early": iterations < num_iterations
     }
@@ -0,0 +1,42 @@
+# methods/multiple_testing.py
+
+import numpy as np
+
+def holm(p_values):
+    # Holm step-down adjusted p-values (family-wise error rate); NaNs are left out of the family
+    p = np.asarray(p_values, dtype=np.float64)
+    adjusted = np.full(p.shape, np.nan)
+    valid = np.flatnonzero(~np.isnan(p))
+    m = len(valid)
+    if m == 0:
+        return adjusted
+
+    order = valid[np.argsort(p[valid], kind='stable')]
+    steps = (m - np.arange(m)) * p[order]
+    adjusted[order] = np.minimum(np.maximum.accumulate(steps), 1.0)
+    return adjusted
+
+def benjamini_hochberg(p_values):
+    # Benjamini-Hochberg step-up adjusted p-values (false discovery rate); NaNs are left out
+    p = np.asarray(p_values, dtype=np.float64)
+    adjusted = np.full(p.shape, np.nan)
+    valid = np.flatnonzero(~np.isnan(p))
+    m = len(valid)
+    if m == 0:
+        return adjusted
+
+    order = valid[np.argsort(p[valid], kind='stable')]
+    steps = p[order] * m / np.arange(1, m + 1)
+    adjusted[order] = np.minimum(np.minimum.accumulate(steps[::-1])[::-1], 1.0)
+    return adjusted
+
+CORRECTIONS = {
+    'holm': holm,
+    'bh': benjamini_hochberg,
+    'none': lambda p: np.asarray(p, dtype=np.float64),
+}
+
+def adjust_p_values(p_values, method='holm'):
+    if method not in CORRECTIONS:
+        raise ValueError(f"Unknown correction '{method}'. Choose from: {', '.join(CORRECTIONS)}")
+    return CORRECTIONS[method](p_values)
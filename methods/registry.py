@@ -0,0 +1,84 @@
+# methods/registry.py
+
+import importlib
+
+from utils.instrumentation import stage
+
+
+class MethodSpec:
+    # One statistical method: where it lives, what data it needs and how the app renders it.
+    # The implementing module (and its scipy imports) loads on first use.
+    __slots__ = ('name', 'module', 'function', 'min_groups', 'max_groups', 'input', 'renderer',
+                 'requirement', 'description', 'defaults', 'background', '_func')
+
+    def __init__(self, name, module, function, min_groups=2, max_groups=None, input='summary',
+                 renderer='statistic', requirement='', description='', defaults=None, background=False):
+        self.name = name
+        self.module = module
+        self.function = function
+        self.min_groups = min_groups
+        self.max_groups = max_groups
+        # 'summary': per-group moments (GroupStats) are enough; 'rows': needs the raw values
+        self.input = input
+        self.renderer = renderer
+        self.requirement = requirement
+        self.description = description
+        # Keyword arguments the app and batch runner pass unless overridden
+        self.defaults = defaults or {}
+        # Slow enough to run as a background job in the app; such functions accept a
+        # `progress` callback for partial results
+        self.background = background
+        self._func = None
+
+    def accepts(self, n_groups):
+        return n_groups >= self.min_groups and (self.max_groups is None or n_groups <= self.max_groups)
+
+    def load(self):
+        if self._func is None:
+            self._func = getattr(importlib.import_module(self.module), self.function)
+        return self._func
+
+    def run(self, data, **kwargs):
+        func = self.load()
+        with stage('method', method=self.name):
+            return func(data, **{**self.defaults, **kwargs})
+
+
+METHODS = {}
+
+
+def register(spec):
+    METHODS[spec.name] = spec
+    return spec
+
+
+def get_method(name):
+    if name not in METHODS:
+        raise KeyError(f"Unknown method '{name}'. Available: {', '.join(METHODS)}")
+    return METHODS[name]
+
+
+def available_methods(n_groups, input='rows'):
+    # Methods that can run on n_groups groups given the kind of input at hand
+    return [spec.name for spec in METHODS.values()
+            if spec.accepts(n_groups) and (input == 'rows' or spec.input == 'summary')]
+
+
+register(MethodSpec('T-Test', 'methods.t_test', 'run_t_test', min_groups=2, max_groups=2,
+                    requirement="T-Test requires exactly 2 groups.",
+                    description="Compare means between two groups."))
+register(MethodSpec('ANOVA', 'methods.anova', 'run_anova', min_groups=3,
+                    requirement="ANOVA requires 3 or more groups.",
+                    description="Compare means across 3+ groups."))
+register(MethodSpec('Tukey’s HSD', 'methods.tukey_hsd', 'run_tukey_hsd', min_groups=3,
+                    renderer='tukey', background=True, requirement="Tukey’s HSD needs 3 or more groups.",
+                    description="Find which group pairs differ after ANOVA."))
+register(MethodSpec('Games-Howell', 'methods.tukey_hsd', 'run_games_howell', min_groups=3,
+                    renderer='tukey', background=True, requirement="Games-Howell needs 3 or more groups.",
+                    description="Pairwise comparisons without assuming equal variances."))
+register(MethodSpec('Bootstrap', 'methods.bootstrap_test', 'run_bootstrap_test', min_groups=2, max_groups=2,
+                    input='rows', renderer='bootstrap', requirement="Bootstrap currently supports only 2 groups.",
+                    description="Resampling to estimate confidence intervals.", background=True))
+register(MethodSpec('Bayesian A/B', 'methods.bayesian_ab', 'run_bayesian_ab_test', min_groups=2,
+                    renderer='bayesian', requirement="Bayesian A/B Test needs at least 2 groups.",
+                    description="Probabilistic comparison of groups."))
@@ -0,0 +1,77 @@
+# methods/resampling.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def resolve_jobs(n_jobs):
+    # n_jobs=-1 (or any value < 1) means one worker per core
+    if n_jobs is None:
+        return 1
+    if n_jobs < 1:
+        return os.cpu_count() or 1
+    return n_jobs
+
+
+def split_iterations(num_iterations, n_shards):
+    # Near-equal contiguous shard sizes; the first shards take the remainder
+    base, extra = divmod(num_iterations, n_shards)
+    return [base + (1 if i < extra else 0) for i in range(n_shards)]
+
+
+# Values installed in each worker of a shared_pool, by name
+_shared = {}
+
+
+class Shared:
+    # Stands in for a value installed in the workers of a shared_pool, so that repeated
+    # submissions do not pickle it again
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+
+def _install(values):
+    _shared.update(values)
+
+
+def shared_pool(n_jobs, **shared):
+    # Process pool whose workers receive `shared` once, at start-up. Pass it to run_sharded
+    # (with Shared(name) in place of those arguments) to run several rounds on the same workers.
+    return ProcessPoolExecutor(max_workers=resolve_jobs(n_jobs), initializer=_install, initargs=(shared,))
+
+
+def _run_shard(task, seed_seq, iterations, args, kwargs):
+    args = tuple(_shared[a.name] if isinstance(a, Shared) else a for a in args)
+    return task(*args, iterations, rng=np.random.default_rng(seed_seq), **kwargs)
+
+
+def shard_count(num_iterations, n_jobs=1):
+    # Number of shards run_sharded splits num_iterations into
+    return max(1, min(resolve_jobs(n_jobs), num_iterations))
+
+
+def run_sharded(task, args, num_iterations, n_jobs=1, seed=None, pool=None, **kwargs):
+    # Runs task(*args, iterations, rng=..., **kwargs) once per shard, each shard with
+    # its own generator spawned from SeedSequence(seed), and returns the partial
+    # results in shard order. For a fixed seed and n_jobs the output is identical
+    # whether the shards run in a pool or inline. With `pool` (a shared_pool) every
+    # shard runs there, and no pool is started or stopped here.
+    n_jobs = shard_count(num_iterations, n_jobs)
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    seeds = root.spawn(n_jobs)
+    sizes = split_iterations(num_iterations, n_jobs)
+
+    if pool is not None:
+        futures = [pool.submit(_run_shard, task, s, size, args, kwargs) for s, size in zip(seeds, sizes)]
+        return [f.result() for f in futures]
+
+    if n_jobs == 1:
+        return [_run_shard(task, seeds[0], sizes[0], args, kwargs)]
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        futures = [pool.submit(_run_shard, task, s, size, args, kwargs) for s, size in zip(seeds, sizes)]
+        return [f.result() for f in futures]
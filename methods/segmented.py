@@ -0,0 +1,89 @@
+# methods/segmented.py
+
+import numpy as np
+import pandas as pd
+from scipy.stats import f as f_dist
+
+from methods.multiple_testing import adjust_p_values
+from methods.t_test import t_test_arrays
+from utils.instrumentation import instrumented
+
+
+def segment_moments(df, segment_cols, group_col='group', value_col='value'):
+    # Count / mean / M2 for every (segment..., group) cell in a single groupby pass
+    values = pd.to_numeric(df[value_col], errors='coerce')
+    keys = [df[col] for col in segment_cols] + [df[group_col]]
+    moments = values.groupby(keys, sort=False, observed=True).agg(['count', 'mean', 'var'])
+    moments['m2'] = (moments['var'] * (moments['count'] - 1)).fillna(0.0)
+    return moments.drop(columns='var')
+
+
+def _segmented_t_test(moments, segment_cols, groups, equal_var):
+    a, b = groups
+    wide = moments.unstack(level=-1)
+    n_a, n_b = wide[('count', a)].to_numpy(np.float64), wide[('count', b)].to_numpy(np.float64)
+    mean_a, mean_b = wide[('mean', a)].to_numpy(), wide[('mean', b)].to_numpy()
+    stat, p_value, _ = t_test_arrays(n_a, mean_a, wide[('m2', a)].to_numpy(),
+                                     n_b, mean_b, wide[('m2', b)].to_numpy(), equal_var=equal_var)
+
+    table = wide.index.to_frame(index=False)
+    table.columns = segment_cols
+    table['group_a'], table['group_b'] = a, b
+    table['n_a'], table['n_b'] = n_a, n_b
+    table['mean_a'], table['mean_b'] = mean_a, mean_b
+    table['diff'] = mean_a - mean_b
+    table['statistic'] = stat
+    table['p_value'] = p_value
+    return table
+
+
+def _segmented_anova(moments, segment_cols):
+    levels = list(range(len(segment_cols)))
+    n = moments['count'].astype(np.float64)
+    by_segment = n.groupby(level=levels, sort=False, observed=True)
+
+    n_total = by_segment.sum()
+    k = by_segment.count()
+    grand_mean = (n * moments['mean']).groupby(level=levels, sort=False, observed=True).sum() / n_total
+    deviation = moments['mean'] - grand_mean.reindex(moments.index.droplevel(-1)).to_numpy()
+    ss_between = (n * deviation ** 2).groupby(level=levels, sort=False, observed=True).sum()
+    ss_within = moments['m2'].groupby(level=levels, sort=False, observed=True).sum()
+
+    df_between, df_within = k - 1, n_total - k
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stat = (ss_between / df_between) / (ss_within / df_within)
+    p_value = f_dist.sf(stat.to_numpy(), df_between.to_numpy(), df_within.to_numpy())
+
+    table = stat.index.to_frame(index=False)
+    table.columns = segment_cols
+    table['n_groups'] = k.to_numpy()
+    table['n'] = n_total.to_numpy()
+    table['statistic'] = stat.to_numpy()
+    table['p_value'] = p_value
+    return table
+
+
+@instrumented('method')
+def run_segmented_test(df, segment_cols, group_col='group', value_col='value', method='t-test',
+                       groups=None, equal_var=True, correction='holm', alpha=0.05):
+    # Same test in every segment cell, evaluated as array operations over per-cell moments,
+    # with Holm or Benjamini-Hochberg correction across segments. Returns one tidy table.
+    segment_cols = [segment_cols] if isinstance(segment_cols, str) else list(segment_cols)
+    if not segment_cols:
+        return "Choose at least one segment column."
+
+    moments = segment_moments(df, segment_cols, group_col, value_col)
+
+    if method == 't-test':
+        groups = list(groups) if groups is not None else list(pd.unique(df[group_col].dropna()))
+        if len(groups) != 2:
+            return "Segmented T-Test requires exactly 2 groups."
+        table = _segmented_t_test(moments, segment_cols, groups, equal_var)
+    elif method == 'anova':
+        table = _segmented_anova(moments, segment_cols)
+    else:
+        return f"Unknown segmented method '{method}'."
+
+    table['p_adjusted'] = adjust_p_values(table['p_value'].to_numpy(), correction)
+    table['significant'] = table['p_adjusted'] < alpha
+    return table
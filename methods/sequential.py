@@ -0,0 +1,169 @@
+# methods/sequential.py
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from methods.multiple_testing import adjust_p_values
+from utils.group_stats import GroupStats, as_group_stats
+
+DEFAULT_ALPHA = 0.05
+# Spread of the normal mixing distribution over effects, in pooled standard deviations of the metric
+DEFAULT_TAU_SDS = 0.1
+
+
+def msprt_arrays(n1, mean1, var1, n2, mean2, var2, tau2):
+    # Mixture SPRT for the difference of two means (Johari et al.): the likelihood ratio against
+    # "no difference", mixed over a N(0, tau2) effect, with plug-in variances. Returns the
+    # estimated difference, its variance and the log mixture likelihood ratio.
+    diff = mean2 - mean1
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        v = var1 / n1 + var2 / n2
+        log_lr = 0.5 * np.log(v / (v + tau2)) + tau2 * diff ** 2 / (2 * v * (v + tau2))
+    return diff, v, log_lr
+
+
+def msprt_halfwidth(v, tau2, alpha):
+    # Half-width of the always-valid interval: every effect whose mixture ratio stays below 1/alpha
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.sqrt(v * (v + tau2) / tau2 * (np.log((v + tau2) / v) - 2 * np.log(alpha)))
+
+
+def _plain(label):
+    return label.item() if isinstance(label, np.generic) else label
+
+
+class SequentialMonitor:
+    # Running state for always-valid monitoring of every treatment group against a control.
+    # An update merges a batch of new rows into the per-group moments (O(batch)), so a refresh never
+    # rescans history. p-values only decrease (running minimum of 1 / likelihood ratio) and
+    # intervals only shrink (running intersection), so they stay valid however often they are checked.
+    __slots__ = ('control', 'alpha', 'tau', 'stats', 'p_value', 'lower', 'upper', 'looks', 'batches', 'offsets')
+
+    def __init__(self, control=None, alpha=DEFAULT_ALPHA, tau=None):
+        self.control = control
+        self.alpha = alpha
+        # Fixed after the first batch: the mixing scale must not adapt to later data
+        self.tau = tau
+        self.stats = None
+        self.p_value = {}
+        self.lower = {}
+        self.upper = {}
+        self.looks = 0
+        # Identifiers of batches already merged, and byte offsets of tailed files
+        self.batches = []
+        self.offsets = {}
+
+    def update(self, data, group_col='group', value_col='value', batch_id=None):
+        # Merge one batch of new rows (DataFrame, ExperimentData or GroupStats).
+        # Returns False, without changing anything, for a batch_id that was already merged.
+        if batch_id is not None and batch_id in self.batches:
+            return False
+        batch = as_group_stats(data, group_col, value_col)
+        self.stats = batch if self.stats is None else self.stats.merge(batch)
+        if self.control is None:
+            self.control = _plain(self.stats.labels[0])
+        if self.tau is None:
+            pooled_var = self.stats.m2.sum() / max(self.stats.n.sum() - self.stats.n_groups, 1)
+            self.tau = DEFAULT_TAU_SDS * float(np.sqrt(pooled_var))
+        self._look()
+        self.looks += 1
+        if batch_id is not None:
+            self.batches.append(batch_id)
+        return True
+
+    def _look(self):
+        labels = [_plain(label) for label in self.stats.labels]
+        if self.control not in labels:
+            return
+        c = labels.index(self.control)
+        treatments = [i for i in range(len(labels)) if i != c]
+        if not treatments or not self.tau:
+            return
+
+        t = np.array(treatments)
+        var = self.stats.var
+        diff, v, log_lr = msprt_arrays(self.stats.n[c], self.stats.mean[c], var[c],
+                                       self.stats.n[t], self.stats.mean[t], var[t], self.tau ** 2)
+        # Intervals hold simultaneously across treatments (Bonferroni over the comparisons)
+        half = msprt_halfwidth(v, self.tau ** 2, self.alpha / len(treatments))
+        for i, d, h, llr in zip(t, diff, half, log_lr):
+            label = labels[i]
+            if np.isnan(llr):
+                # Fewer than two rows in a group so far: nothing to update yet
+                continue
+            p = float(np.exp(-llr)) if llr > 0 else 1.0
+            self.p_value[label] = min(self.p_value.get(label, 1.0), p)
+            self.lower[label] = max(self.lower.get(label, -np.inf), float(d - h))
+            self.upper[label] = min(self.upper.get(label, np.inf), float(d + h))
+
+    def results(self, correction='holm'):
+        # One row per treatment group, with always-valid p-values corrected across treatments
+        columns = ['control', 'treatment', 'n_control', 'n_treatment', 'mean_control', 'mean_treatment',
+                   'diff', 'p_value', 'p_adjusted', 'lower', 'upper', 'significant']
+        if self.stats is None:
+            return pd.DataFrame(columns=columns)
+        labels = [_plain(label) for label in self.stats.labels]
+        if self.control not in labels:
+            return pd.DataFrame(columns=columns)
+        c = labels.index(self.control)
+        rows = [{'control': self.control, 'treatment': label,
+                 'n_control': self.stats.n[c], 'n_treatment': self.stats.n[i],
+                 'mean_control': self.stats.mean[c], 'mean_treatment': self.stats.mean[i],
+                 'diff': self.stats.mean[i] - self.stats.mean[c],
+                 'p_value': self.p_value.get(label, 1.0),
+                 'lower': self.lower.get(label, -np.inf), 'upper': self.upper.get(label, np.inf)}
+                for i, label in enumerate(labels) if i != c]
+        table = pd.DataFrame(rows, columns=columns)
+        table['p_adjusted'] = adjust_p_values(table['p_value'].to_numpy(), correction) if rows else []
+        table['significant'] = table['p_adjusted'] < self.alpha
+        return table
+
+    def to_dict(self):
+        stats = self.stats
+        labels = [_plain(label) for label in stats.labels] if stats is not None else []
+        return {
+            'control': self.control, 'alpha': self.alpha, 'tau': self.tau, 'looks': self.looks,
+            'labels': labels,
+            'n': stats.n.tolist() if stats is not None else [],
+            'mean': stats.mean.tolist() if stats is not None else [],
+            'm2': stats.m2.tolist() if stats is not None else [],
+            # Pairs rather than objects so that non-string labels survive the round trip
+            'p_value': [[label, p] for label, p in self.p_value.items()],
+            'lower': [[label, x] for label, x in self.lower.items() if np.isfinite(x)],
+            'upper': [[label, x] for label, x in self.upper.items() if np.isfinite(x)],
+            'batches': self.batches,
+            'offsets': self.offsets,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        monitor = cls(state['control'], state['alpha'], state['tau'])
+        if state['labels']:
+            monitor.stats = GroupStats(state['labels'], state['n'], state['mean'], state['m2'])
+        monitor.p_value = {label: p for label, p in state['p_value']}
+        monitor.lower = {label: x for label, x in state['lower']}
+        monitor.upper = {label: x for label, x in state['upper']}
+        monitor.looks = state['looks']
+        monitor.batches = list(state['batches'])
+        monitor.offsets = dict(state['offsets'])
+        return monitor
+
+    def save(self, path):
+        # Written to a temporary file first so an interrupted save never corrupts the state
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        # Saved state when path exists, otherwise a new monitor built from kwargs
+        if not os.path.exists(path):
+            return cls(**kwargs)
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
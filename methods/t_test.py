@@ -1,14 +1,38 @@
 # methods/t_test.py
 
-from scipy.stats import ttest_ind
-import pandas as pd
+import numpy as np
+from scipy.stats import t as t_dist
 
-def run_t_test(df):
-    groups = df['group'].unique()
-    group1 = df[df['group'] == groups[0]]['value']
-    group2 = df[df['group'] == groups[1]]['value']
+from utils.group_stats import as_group_stats
 
-    stat, p_value = ttest_ind(group1, group2)
+def t_test_arrays(n1, mean1, m2_1, n2, mean2, m2_2, equal_var=True):
+    # Closed-form Student (pooled) or Welch t-test; works elementwise on arrays of groups
+    n1, n2 = np.asarray(n1, dtype=np.float64), np.asarray(n2, dtype=np.float64)
+    diff = np.asarray(mean1) - np.asarray(mean2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if equal_var:
+            dof = n1 + n2 - 2
+            pooled = (m2_1 + m2_2) / dof
+            se = np.sqrt(pooled * (1 / n1 + 1 / n2))
+        else:
+            a, b = m2_1 / (n1 - 1) / n1, m2_2 / (n2 - 1) / n2
+            dof = (a + b) ** 2 / (a ** 2 / (n1 - 1) + b ** 2 / (n2 - 1))
+            se = np.sqrt(a + b)
+        stat = diff / se
+
+    p_value = 2 * t_dist.sf(np.abs(stat), dof)
+    return stat, p_value, dof
+
+def t_test_from_stats(stats, i=0, j=1, equal_var=True):
+    stat, p_value, dof = t_test_arrays(stats.n[i], stats.mean[i], stats.m2[i],
+                                       stats.n[j], stats.mean[j], stats.m2[j], equal_var=equal_var)
+    return float(stat), float(p_value), float(dof)
+
+def run_t_test(df, equal_var=True):
+    stats = as_group_stats(df)
+
+    stat, p_value, _ = t_test_from_stats(stats, 0, 1, equal_var=equal_var)
 
     conclusion = "✅ The difference **is statistically significant**." if p_value < 0.05 else "⚠️ The difference is **not statistically significant**."
     
@@ -1,25 +1,188 @@
-from statsmodels.stats.multicomp import pairwise_tukeyhsd
+import functools
+import warnings
+
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from scipy.integrate import IntegrationWarning
+from scipy.stats import chi, studentized_range
 
-def run_tukey_hsd(df, group_col, value_col):
-    try:
-        # Run Tukey's HSD
-        tukey_result = pairwise_tukeyhsd(endog=df[value_col], groups=df[group_col], alpha=0.05)
+from utils.group_stats import as_group_stats
+
+# p-values are computed a block of pairs at a time, with progress reported in between: at
+# small error df each studentized-range evaluation is a numerical double integral
+_PAIRS_PER_BLOCK = 32
+# scipy evaluates that double integral at about 15 ms per value. From _AVERAGED_DF error df on,
+# the outer integral over s = sqrt(chi2_df / df) is done here instead, on a fixed grid between
+# the 1e-12 quantiles of s, over scipy's cheap infinite-df form; this agrees with scipy to
+# about 1e-11. From 100,000 df on scipy itself uses the infinite-df form.
+_AVERAGED_DF = 32
+_ASYMPTOTIC_DF = 100_000
+_S_NODES = 32
+
+
+def _quiet(func, *args):
+    # scipy's quadrature warns about slow convergence at large df, where its result is still
+    # accurate to well under the p-value precision reported
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', IntegrationWarning)
+        return func(*args)
+
+
+def _averaged(df):
+    return (df >= _AVERAGED_DF) & (df < _ASYMPTOTIC_DF)
+
+
+def _averaged_sf(q, k, df):
+    d = df[:, None]
+    lo = chi.ppf(1e-12, d) / np.sqrt(d)
+    hi = chi.ppf(1 - 1e-12, d) / np.sqrt(d)
+    s = lo + (hi - lo) * np.linspace(0.0, 1.0, _S_NODES)
+    density = np.exp(chi.logpdf(s * np.sqrt(d), d)) * np.sqrt(d)
+    inner = _quiet(studentized_range.sf, q[:, None] * s, k, np.inf)
+    return (inner * density).sum(axis=1) * (hi - lo)[:, 0] / (_S_NODES - 1)
+
+
+def _range_sf(q, k, df):
+    # studentized_range.sf, element-wise over q and df
+    out = np.full(len(q), np.nan)
+    valid = ~np.isnan(q) & (df > 0)
+    averaged = valid & _averaged(df)
+    exact = valid & ~averaged
+    if exact.any():
+        out[exact] = _quiet(studentized_range.sf, q[exact], k, df[exact])
+    if averaged.any():
+        out[averaged] = _averaged_sf(q[averaged], k, df[averaged])
+    return out
+
+
+@functools.lru_cache(maxsize=1024)
+def _exact_ppf(p, k, df):
+    return float(_quiet(studentized_range.ppf, p, k, df))
+
+
+def _range_ppf(p, k, df):
+    # Quantiles for an array of df. Where the sf is averaged here they come from Newton steps
+    # on it, starting at the infinite-df quantile with the infinite-df density as slope.
+    averaged = _averaged(df)
+    out = np.array([np.nan if a else _exact_ppf(p, k, float(value)) for value, a in zip(df, averaged)])
+    if averaged.any():
+        q = np.full(averaged.sum(), _exact_ppf(p, k, np.inf))
+        for _ in range(20):
+            step = (_averaged_sf(q, k, df[averaged]) - (1 - p)) / studentized_range.pdf(q, k, np.inf)
+            q += step
+            if np.abs(step).max() < 1e-10:
+                break
+        out[averaged] = q
+    return out
+
+
+def _critical_values(p, k, df, grid_points=16):
+    # Quantiles are a root search per df. With many distinct df (Games-Howell) they are
+    # solved on a geometric df grid and interpolated in 1/df, where the quantile is smooth
+    # and nearly linear; they only set the confidence intervals.
+    df = np.asarray(df, dtype=np.float64)
+    out = np.full(df.shape, np.nan)
+    valid = ~np.isnan(df) & (df > 0)
+    unique = np.unique(df[valid])
+    if len(unique) <= grid_points:
+        for value, quantile in zip(unique, _range_ppf(p, k, unique)):
+            out[df == value] = quantile
+        return out
+    finite = unique[np.isfinite(unique)]
+    grid = np.geomspace(finite[0], finite[-1], grid_points)
+    out[valid] = np.interp(1 / df[valid], 1 / grid[::-1], _range_ppf(p, k, grid)[::-1])
+    return out
 
-        # Convert the result summary to a DataFrame
-        summary_df = pd.DataFrame(
-            data=tukey_result.summary().data[1:],
-            columns=tukey_result.summary().data[0]
-        )
 
-        # Create the Tukey plot
-        fig = tukey_result.plot_simultaneous(figsize=(10, 6))
-        plt.title("Tukey HSD Confidence Intervals")
-        plt.xlabel("Mean Difference")
+def pairwise_arrays(n, mean, m2, alpha=0.05, equal_var=True, progress=None):
+    # All pairwise mean comparisons at once. equal_var=True is Tukey-Kramer with the pooled
+    # error variance; False is Games-Howell with per-pair Welch degrees of freedom.
+    # progress, when given, is called after each block of pairs with the pairs done so far.
+    n, mean, m2 = (np.asarray(a, dtype=np.float64) for a in (n, mean, m2))
+    k = len(n)
+    i, j = np.triu_indices(k, 1)
+    diff = mean[j] - mean[i]
 
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if equal_var:
+            df = np.full(len(i), n.sum() - k)
+            mse = m2.sum() / df[0]
+            se = np.sqrt(mse / 2 * (1 / n[i] + 1 / n[j]))
+            q_crit = np.full(len(i), _critical_values(1 - alpha, k, df[:1])[0])
+        else:
+            v = m2 / (n - 1) / n
+            se = np.sqrt((v[i] + v[j]) / 2)
+            df = (v[i] + v[j]) ** 2 / (v[i] ** 2 / (n[i] - 1) + v[j] ** 2 / (n[j] - 1))
+            q_crit = _critical_values(1 - alpha, k, df)
+        q = np.abs(diff) / se
+
+    p_value = np.empty(len(i))
+    for start in range(0, len(i), _PAIRS_PER_BLOCK):
+        stop = min(start + _PAIRS_PER_BLOCK, len(i))
+        p_value[start:stop] = _range_sf(q[start:stop], k, df[start:stop])
+        if progress is not None:
+            progress(iterations=stop, total=len(i))
+    p_value = np.clip(p_value, 0.0, 1.0)
+
+    return {
+        'i': i, 'j': j, 'meandiff': diff, 'q': q, 'df': df, 'p_value': p_value,
+        'lower': diff - q_crit * se, 'upper': diff + q_crit * se, 'reject': p_value < alpha,
+    }
+
+
+def pairwise_from_stats(stats, alpha=0.05, equal_var=True, progress=None):
+    result = pairwise_arrays(stats.n, stats.mean, stats.m2, alpha, equal_var, progress)
+    return pd.DataFrame({
+        'group1': stats.labels[result['i']],
+        'group2': stats.labels[result['j']],
+        'meandiff': result['meandiff'],
+        'p-adj': result['p_value'],
+        'lower': result['lower'],
+        'upper': result['upper'],
+        'reject': result['reject'],
+    })
+
+
+def plot_tukey(summary_df, title="Tukey HSD Confidence Intervals"):
+    # Simultaneous confidence intervals, one row per pair. Callers close the figure.
+    import matplotlib.pyplot as plt
+
+    pairs = summary_df['group2'].astype(str) + " - " + summary_df['group1'].astype(str)
+    diff = summary_df['meandiff'].to_numpy()
+    fig, ax = plt.subplots(figsize=(10, max(3, 0.3 * len(pairs) + 1)))
+    ax.errorbar(diff, np.arange(len(pairs)),
+                xerr=[diff - summary_df['lower'].to_numpy(), summary_df['upper'].to_numpy() - diff],
+                fmt='o', color='tab:blue', ecolor='tab:gray', capsize=3)
+    ax.axvline(0, color='tab:red', linestyle='--', linewidth=1)
+    ax.set_yticks(np.arange(len(pairs)))
+    ax.set_yticklabels(pairs)
+    ax.invert_yaxis()
+    ax.set_title(title)
+    ax.set_xlabel("Mean Difference")
+    fig.tight_layout()
+    return fig
+
+
+def run_tukey_hsd(df, group_col='group', value_col='value', alpha=0.05, plot=False, progress=None):
+    try:
+        stats = as_group_stats(df, group_col, value_col)
+        summary_df = pairwise_from_stats(stats, alpha, equal_var=True, progress=progress)
+        # The figure is only built on request
+        fig = plot_tukey(summary_df) if plot else None
         return summary_df, fig
 
     except Exception as e:
         # Return error as string and None for fig
         return f"Error running Tukey's HSD: {e}", None
+
+
+def run_games_howell(df, group_col='group', value_col='value', alpha=0.05, plot=False, progress=None):
+    # Tukey-style pairwise comparisons without assuming equal variances
+    try:
+        stats = as_group_stats(df, group_col, value_col)
+        summary_df = pairwise_from_stats(stats, alpha, equal_var=False, progress=progress)
+        fig = plot_tukey(summary_df, "Games-Howell Confidence Intervals") if plot else None
+        return summary_df, fig
+
+    except Exception as e:
+        return f"Error running Games-Howell: {e}", None
@@ -0,0 +1,18 @@
+# tests/conftest.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def experiment_frame(arms):
+    # Long-format group/value rows from {label: values}, or from a list of samples labelled g0, g1, ...
+    if not isinstance(arms, dict):
+        arms = {f"g{i}": values for i, values in enumerate(arms)}
+    return pd.DataFrame({'group': np.repeat(list(arms), [len(values) for values in arms.values()]),
+                         'value': np.concatenate([np.asarray(values, dtype=np.float64) for values in arms.values()])})
+
+
+@pytest.fixture
+def frame():
+    return experiment_frame
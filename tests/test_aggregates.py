@@ -0,0 +1,62 @@
+# tests/test_aggregates.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from methods.anova import run_anova
+from methods.bayesian_ab import run_bayesian_ab_test
+from methods.t_test import run_t_test
+from utils.aggregates import detect_summary_columns, load_summary_table
+
+
+def rows(seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'variant': np.repeat(['control', 'b', 'c'], [120, 90, 60]),
+                         'day': rng.integers(0, 4, 270),
+                         'revenue': rng.gamma(2.0, 10.0, 270)})
+
+
+def test_moments_table_matches_row_level_tests():
+    df = rows()
+    summary = (df.groupby('variant', sort=False)['revenue'].agg(['count', 'mean', 'std'])
+               .reset_index().rename(columns={'count': 'n'}))
+    table = load_summary_table(summary)
+    samples = [df.loc[df['variant'] == v, 'revenue'] for v in ('control', 'b', 'c')]
+    assert run_anova(table)['p_value'] == pytest.approx(stats.f_oneway(*samples).pvalue, rel=1e-9)
+    assert run_t_test(table.take([0, 1]))['p_value'] == pytest.approx(
+        stats.ttest_ind(samples[0], samples[1]).pvalue, rel=1e-9)
+
+
+def test_partial_rows_are_pooled_per_group():
+    df = rows(1)
+    daily = (df.groupby(['variant', 'day'], sort=False)['revenue'].agg(['count', 'mean', 'std'])
+             .reset_index().rename(columns={'count': 'n'}))
+    table = load_summary_table(daily)
+    whole = df.groupby('variant')['revenue']
+    for label, n, mean, var in zip(table.labels, table.n, table.mean, table.var):
+        assert n == whole.count()[label]
+        assert mean == pytest.approx(whole.mean()[label], rel=1e-12)
+        assert var == pytest.approx(whole.var()[label], rel=1e-9)
+
+
+def test_conversions_table_uses_beta_model():
+    summary = pd.DataFrame({'arm': ['a', 'b'], 'conversions': [120, 150], 'visitors': [1000, 1000]})
+    assert detect_summary_columns(summary)['kind'] == 'conversions'
+    result = run_bayesian_ab_test(load_summary_table(summary))
+    assert result['model'] == 'beta'
+    assert result['posteriors'] == [(121.0, 881.0), (151.0, 851.0)]
+    # Same test on the equivalent 0/1 rows
+    outcomes = pd.DataFrame({'group': np.repeat(['a', 'b'], 1000),
+                             'value': np.r_[np.ones(120), np.zeros(880), np.ones(150), np.zeros(850)]})
+    assert run_t_test(load_summary_table(summary))['p_value'] == pytest.approx(run_t_test(outcomes)['p_value'])
+
+
+def test_invalid_tables_are_rejected():
+    with pytest.raises(ValueError):
+        load_summary_table(pd.DataFrame({'group': ['a', 'b'], 'conversions': [5, 20], 'trials': [10, 10]}))
+    with pytest.raises(ValueError):
+        load_summary_table(pd.DataFrame({'group': ['a', 'a'], 'n': [5, 6], 'mean': [1.0, 2.0], 'std': [1.0, 1.0]}))
+    with pytest.raises(ValueError):
+        load_summary_table(pd.DataFrame({'group': ['a', 'b'], 'value': [1.0, 2.0]}))
@@ -0,0 +1,89 @@
+# tests/test_batch_runner.py
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from methods.registry import get_method
+from utils.batch_runner import BATCH_METHODS, iter_long_format, run_batch
+from utils.experiment_data import ExperimentData
+
+
+def write_experiments(path, seed=0):
+    # Two experiments with two metrics each, one of them with three arms
+    rng = np.random.default_rng(seed)
+    parts = []
+    for experiment, arms in (('checkout', ['control', 'b']), ('pricing', ['control', 'b', 'c'])):
+        n = 150 * len(arms)
+        parts.append(pd.DataFrame({'experiment': experiment, 'variant': rng.choice(arms, n),
+                                   'revenue': rng.gamma(2.0, 10.0, n), 'minutes': rng.normal(5.0, 1.0, n)}))
+    pd.concat(parts).to_csv(path, index=False)
+
+
+def direct_rows(path, methods, seed):
+    # The same comparisons, one method call at a time
+    df = pd.read_csv(path)
+    rows = []
+    index = 0
+    for experiment, frame in df.groupby('experiment', sort=False):
+        for metric in ('revenue', 'minutes'):
+            data = ExperimentData.from_frame(frame, 'variant', metric)
+            for key in methods:
+                spec = get_method(BATCH_METHODS[key])
+                if not spec.accepts(data.n_groups):
+                    continue
+                result = spec.run(data, **({'seed': [seed, index]} if key == 'bootstrap' else {}))
+                key = (experiment, metric, spec.name)
+                if isinstance(result, tuple):
+                    for _, row in result[0].iterrows():
+                        rows.append((*key, f"{row['group1']} vs {row['group2']}",
+                                     {'statistic': row['meandiff'], 'p_value': row['p-adj']}))
+                else:
+                    fields = {field: result[field] for field in ('statistic', 'p_value') if field in result}
+                    if 'prob_best' in result:
+                        fields['prob_best'] = [round(float(p), 6) for p in result['prob_best']]
+                    rows.append((*key, '', fields))
+            index += 1
+    return rows
+
+
+@pytest.mark.parametrize('output, n_jobs', [('results.csv', 1), ('results.parquet', 1), ('results.csv', 2)])
+def test_batch_rows_match_direct_method_calls(tmp_path, output, n_jobs):
+    path = tmp_path / 'experiments.csv'
+    write_experiments(path)
+    methods = ('t-test', 'anova', 'tukey', 'bootstrap', 'bayesian')
+    tasks = iter_long_format(str(path), 'variant', ['revenue', 'minutes'], experiment_col='experiment')
+    summary = run_batch(tasks, str(tmp_path / output), methods=methods, n_jobs=n_jobs, seed=7, progress=None)
+    assert summary['pairs'] == 4
+
+    table = pd.read_parquet(tmp_path / output) if output.endswith('.parquet') else pd.read_csv(tmp_path / output)
+    assert summary['result_rows'] == len(table)
+    not_applicable = table[table['error'].notna()]
+    assert set(zip(not_applicable['experiment'], not_applicable['method'])) == {
+        ('checkout', 'ANOVA'), ('checkout', 'Tukey’s HSD'), ('pricing', 'T-Test'), ('pricing', 'Bootstrap')}
+
+    computed = table[table['error'].isna()]
+    expected = direct_rows(path, methods, seed=7)
+    assert len(computed) == len(expected)
+    index = computed.set_index(['experiment', 'metric', 'method', computed['comparison'].fillna('')])
+    for *key, fields in expected:
+        row = index.loc[tuple(key)]
+        for field, value in fields.items():
+            stored = json.loads(row[field]) if field == 'prob_best' else row[field]
+            assert stored == pytest.approx(value, rel=1e-9, abs=1e-12), (key, field)
+
+
+def test_batch_rejects_unknown_methods(tmp_path):
+    with pytest.raises(ValueError, match='Unknown method'):
+        run_batch([], str(tmp_path / 'out.csv'), methods=('t-test', 'mann-whitney'), progress=None)
+
+
+def test_long_format_metrics_become_separate_tasks(tmp_path):
+    path = tmp_path / 'long.csv'
+    pd.DataFrame({'variant': ['a', 'b'] * 4, 'metric': ['clicks'] * 4 + ['spend'] * 4,
+                  'value': np.arange(8.0)}).to_csv(path, index=False)
+    tasks = list(iter_long_format(str(path), 'variant', metric_col='metric', value_col='value'))
+    assert [(experiment, metric) for experiment, metric, _ in tasks] == [('long.csv', 'clicks'), ('long.csv', 'spend')]
+    assert [list(data.counts) for _, _, data in tasks] == [[2, 2], [2, 2]]
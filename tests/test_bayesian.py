@@ -0,0 +1,38 @@
+# tests/test_bayesian.py
+
+import numpy as np
+import pytest
+from scipy.stats import norm
+
+from methods.bayesian_ab import run_bayesian_ab_test
+
+
+def posterior(values):
+    values = np.asarray(values)
+    return values.mean(), values.std() / np.sqrt(len(values))
+
+
+def test_constant_arm_among_several_is_a_point_mass(frame):
+    rng = np.random.default_rng(0)
+    arms = {'a': np.full(50, 3.0), 'b': rng.normal(2.9, 1, 50), 'c': rng.normal(3.2, 1, 50)}
+    result = run_bayesian_ab_test(frame(arms))
+    assert np.all(np.isfinite(result['prob_best'])) and np.all(np.isfinite(result['expected_loss']))
+    (mb, sb), (mc, sc) = posterior(arms['b']), posterior(arms['c'])
+    # The constant arm is best when both others fall below its value
+    assert result['prob_best'][0] == pytest.approx(norm.cdf((3.0 - mb) / sb) * norm.cdf((3.0 - mc) / sc), abs=1e-4)
+    assert result['prob_best'].sum() == pytest.approx(1.0)
+
+
+def test_constant_arm_against_one_other(frame):
+    rng = np.random.default_rng(1)
+    arms = {'a': np.full(40, 1.0), 'b': rng.normal(1.1, 0.5, 40)}
+    result = run_bayesian_ab_test(frame(arms))
+    mb, sb = posterior(arms['b'])
+    assert result['prob_A_better'] == pytest.approx(norm.cdf((1.0 - mb) / sb), abs=1e-6)
+
+
+def test_all_arms_constant(frame):
+    arms = {'a': np.full(10, 1.0), 'b': np.full(10, 2.0), 'c': np.full(10, 0.5)}
+    result = run_bayesian_ab_test(frame(arms))
+    assert result['prob_best'] == pytest.approx([0.0, 1.0, 0.0], abs=1e-6)
+    assert result['expected_loss'] == pytest.approx([1.0, 0.0, 1.5], abs=1e-4)
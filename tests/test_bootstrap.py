@@ -0,0 +1,61 @@
+# tests/test_bootstrap.py
+
+from itertools import combinations
+
+import numpy as np
+
+from methods.bootstrap_test import permutation_diffs, run_bootstrap_test
+from methods.resampling import Shared, run_sharded, shared_pool
+
+
+def exact_permutation_p(a, b):
+    # Every relabelling of the pooled sample, enumerated
+    pooled = np.concatenate([a, b])
+    observed = abs(np.mean(a) - np.mean(b))
+    diffs = []
+    for idx in combinations(range(len(pooled)), len(a)):
+        mask = np.zeros(len(pooled), dtype=bool)
+        mask[list(idx)] = True
+        diffs.append(abs(pooled[mask].mean() - pooled[~mask].mean()))
+    return np.mean(np.array(diffs) >= observed - 1e-9)
+
+
+def test_small_case_matches_exact_p_value(frame):
+    a, b = np.array([1.1, 2.2, 3.3]), np.array([4.4, 5.5, 6.6])
+    assert exact_permutation_p(a, b) == 0.1
+    result = run_bootstrap_test(frame({'a': a, 'b': b}), num_iterations=20000, seed=1)
+    # Monte Carlo standard error is about 0.002
+    assert abs(result['p_value'] - 0.1) < 0.01
+
+
+def test_tied_statistics_count_towards_p_value(frame):
+    a, b = np.array([0.1, 0.2, 0.7, 0.3]), np.array([0.6, 0.9, 0.4, 0.8])
+    exact = exact_permutation_p(a, b)
+    result = run_bootstrap_test(frame({'a': a, 'b': b}), num_iterations=20000, seed=2)
+    assert abs(result['p_value'] - exact) < 0.015
+
+
+def test_fixed_seed_is_reproducible(frame):
+    rng = np.random.default_rng(0)
+    df = frame({'a': rng.normal(size=200), 'b': rng.normal(0.3, size=200)})
+    one = run_bootstrap_test(df, num_iterations=2000, seed=5, n_jobs=1)
+    two = run_bootstrap_test(df, num_iterations=2000, seed=5, n_jobs=1)
+    assert one['p_value'] == two['p_value']
+    assert np.array_equal(one['distribution'], two['distribution'])
+
+
+def test_worker_pool_matches_inline_shards():
+    values = np.random.default_rng(1).normal(size=300)
+    inline = run_sharded(permutation_diffs, (values, 150), 1000, n_jobs=2, seed=3)
+    with shared_pool(2, values=values) as pool:
+        pooled = run_sharded(permutation_diffs, (Shared('values'), 150), 1000, n_jobs=2, seed=3, pool=pool)
+    assert all(np.array_equal(a, b) for a, b in zip(inline, pooled))
+
+
+def test_adaptive_run_with_workers_stops_early(frame):
+    rng = np.random.default_rng(0)
+    df = frame({'a': rng.normal(size=300), 'b': rng.normal(1.0, size=300)})
+    result = run_bootstrap_test(df, num_iterations=10000, seed=4, n_jobs=2, adaptive=True)
+    assert result['stopped_early']
+    assert result['p_value'] < 0.05
+    assert len(result['distribution']) == result['iterations_used']
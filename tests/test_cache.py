@@ -0,0 +1,45 @@
+# tests/test_cache.py
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import LRUCache, value_size
+from utils.experiment_data import ExperimentData
+
+
+def test_value_size_follows_buffers(frame):
+    df = frame({0: np.ones(1000)})
+    assert value_size(df) == df.memory_usage(deep=False).sum()
+    assert value_size((True, df)) >= value_size(df)
+    assert value_size(np.zeros(100)) == 800
+    assert value_size(b'abc') == 3
+    data = ExperimentData.from_frame(pd.DataFrame({'group': ['a', 'b'] * 50, 'value': np.arange(100.0)}))
+    assert value_size(data) >= 800
+
+
+def test_evicts_least_recently_used_by_bytes(frame):
+    one = value_size(frame({0: np.ones(1000)}))
+    cache = LRUCache(maxsize=100, max_bytes=int(2.5 * one))
+    for key in 'abc':
+        cache.put(key, frame({0: np.ones(1000)}))
+    assert 'a' not in cache and 'b' in cache and 'c' in cache
+    cache.get('b')
+    cache.put('d', frame({0: np.ones(1000)}))
+    assert 'c' not in cache and 'b' in cache
+    assert cache.total_bytes == 2 * one
+
+
+def test_oversized_value_is_not_kept(frame):
+    cache = LRUCache(max_bytes=1000)
+    cache.put('small', b'x' * 10)
+    cache.put('big', frame({0: np.ones(1000)}))
+    assert 'big' not in cache and 'small' in cache
+    cache.put('small', b'x' * 2000)
+    assert 'small' not in cache and cache.total_bytes == 0
+
+
+def test_entry_count_bound_still_applies():
+    cache = LRUCache(maxsize=2)
+    for key in range(5):
+        cache.put(key, key)
+    assert len(cache) == 2 and 4 in cache and 3 in cache
@@ -0,0 +1,98 @@
+# tests/test_columnar.py
+
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.columnar import cache_as_columnar, encode_groups, load_table, read_arrow
+from utils.experiment_data import ExperimentData
+
+pa = pytest.importorskip('pyarrow')
+
+
+def table_frame(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'variant': rng.choice(['b', 'control', 'a'], n),
+        'revenue': rng.normal(10.0, 2.0, n).astype('float32'),
+        'clicks': rng.integers(0, 5, n),
+        'converted': rng.random(n) < 0.3,
+        'tier': pd.Categorical(rng.choice(['low', 'mid', 'high'], n), categories=['low', 'mid', 'high'], ordered=True),
+        'seen_at': pd.date_range('2024-01-01', periods=n, freq='h'),
+    })
+
+
+@pytest.fixture
+def files(tmp_path):
+    df = table_frame()
+    paths = {'csv': tmp_path / 'rows.csv', 'parquet': tmp_path / 'rows.parquet', 'feather': tmp_path / 'rows.feather'}
+    df.to_csv(paths['csv'], index=False)
+    df.to_parquet(paths['parquet'], index=False)
+    df.to_feather(paths['feather'])
+    return df, {fmt: str(path) for fmt, path in paths.items()}
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'feather'])
+def test_columnar_round_trip_keeps_values_and_dtypes(files, fmt):
+    df, paths = files
+    loaded = load_table(paths[fmt])
+    # Temporal columns cannot be a group or a metric and are not read
+    assert list(loaded.columns) == ['variant', 'revenue', 'clicks', 'converted', 'tier']
+    assert loaded['revenue'].dtype == np.float32
+    assert loaded['clicks'].dtype == np.int64
+    assert loaded['converted'].dtype == bool
+    assert isinstance(loaded['variant'].dtype, pd.CategoricalDtype)
+    assert list(loaded['tier'].cat.categories) == ['low', 'mid', 'high'] and loaded['tier'].cat.ordered
+    for col in loaded.columns:
+        np.testing.assert_array_equal(loaded[col].to_numpy(), df[col].to_numpy())
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'feather'])
+def test_projection_reads_only_requested_columns(files, fmt):
+    df, paths = files
+    loaded = load_table(paths[fmt], columns=['revenue', 'variant'])
+    assert sorted(loaded.columns) == ['revenue', 'variant']
+    assert read_arrow(paths[fmt], ['clicks']).column_names == ['clicks']
+
+    with open(paths[fmt], 'rb') as f:
+        upload = io.BytesIO(f.read())
+    upload.name = os.path.basename(paths[fmt])
+    np.testing.assert_array_equal(load_table(upload, columns=['revenue'])['revenue'].to_numpy(), df['revenue'].to_numpy())
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'feather'])
+def test_columnar_results_match_csv(files, fmt):
+    _, paths = files
+    from_csv = ExperimentData.from_frame(load_table(paths['csv']), 'variant', 'revenue')
+    columnar = ExperimentData.from_frame(load_table(paths[fmt]), 'variant', 'revenue')
+    assert list(columnar.labels) == list(from_csv.labels)
+    np.testing.assert_array_equal(columnar.counts, from_csv.counts)
+    # The CSV holds float32 values printed in decimal, read back as float64
+    np.testing.assert_allclose(columnar.values, from_csv.values, rtol=1e-6)
+    np.testing.assert_allclose(columnar.stats().mean, from_csv.stats().mean, rtol=1e-6)
+
+
+def test_encode_groups_dictionary_encodes_strings_only():
+    table = encode_groups(pa.table({'g': ['x', 'y', 'x'], 'v': [1.0, 2.0, 3.0]}))
+    assert pa.types.is_dictionary(table.schema.field('g').type)
+    assert pa.types.is_floating(table.schema.field('v').type)
+    assert table.column('g').to_pylist() == ['x', 'y', 'x']
+
+
+def test_cached_csv_is_converted_once(files, tmp_path):
+    df, paths = files
+    cache_dir = str(tmp_path / 'cache')
+    path = cache_as_columnar(paths['csv'], 'rows-v1', cache_dir)
+    assert path.endswith('.arrow') and os.path.exists(path)
+    modified = os.path.getmtime(path)
+    assert cache_as_columnar(paths['csv'], 'rows-v1', cache_dir) == path
+    assert os.path.getmtime(path) == modified
+
+    cached = load_table(paths['csv'], cache_key='rows-v1', cache_dir=cache_dir)
+    direct = load_table(paths['csv'])
+    assert isinstance(cached['variant'].dtype, pd.CategoricalDtype)
+    for col in ('variant', 'revenue', 'clicks', 'converted'):
+        np.testing.assert_array_equal(cached[col].to_numpy(), direct[col].to_numpy())
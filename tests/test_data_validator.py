@@ -0,0 +1,82 @@
+# tests/test_data_validator.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import data_validator
+from utils.data_validator import (PROFILE_SAMPLE_ROWS, _count_distinct, profile_columns, segment_columns,
+                                  validate_csv)
+
+
+def mixed_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    rare = rng.choice(['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i'], n).astype(object)
+    rare[rng.integers(0, n)] = 'only-once'
+    with_missing = rng.choice(['x', 'y'], n).astype(object)
+    with_missing[rng.random(n) < 0.1] = None
+    return pd.DataFrame({
+        'variant': rng.choice(['control', 'b', 'c'], n),
+        'ten_levels_one_rare': rare,
+        'eleven_levels': rng.choice([f"l{i}" for i in range(11)], n),
+        'with_missing': with_missing,
+        'mostly_unused_categories': pd.Categorical(rng.choice(['p', 'q', 'r'], n), categories=list('pqrstuvwxyzab')),
+        'four_values': rng.integers(0, 4, n),
+        'six_values': rng.integers(0, 6, n).astype(float),
+        'revenue': rng.gamma(2.0, 10.0, n),
+        'user_id': np.arange(n).astype(str),
+        'converted': rng.random(n) < 0.3,
+    })
+
+
+def exact_profile(df):
+    # Reference classification from full nunique counts
+    groups, metrics = [], []
+    for col in df.columns:
+        dtype = df[col].dtype
+        unique = df[col].nunique(dropna=True)
+        if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype) or \
+                isinstance(dtype, pd.CategoricalDtype):
+            if 2 <= unique <= 10:
+                groups.append(col)
+        elif pd.api.types.is_numeric_dtype(dtype) and unique > 5:
+            metrics.append(col)
+    return groups, metrics
+
+
+@pytest.mark.parametrize('n', [500, 3 * PROFILE_SAMPLE_ROWS])
+def test_sampled_profile_matches_exact_counts(n):
+    df = mixed_frame(n)
+    profile = profile_columns(df)
+    groups, metrics = exact_profile(df)
+    assert profile['groups'] == groups == ['variant', 'ten_levels_one_rare', 'with_missing',
+                                           'mostly_unused_categories']
+    assert profile['metrics'] == metrics == ['six_values', 'revenue']
+    assert profile['n_rows'] == n
+
+
+def test_count_distinct_stops_at_the_cap(monkeypatch):
+    values = np.arange(10 * data_validator._SCAN_BLOCK).astype(str).astype(object)
+    blocks = []
+    unique = pd.unique
+    monkeypatch.setattr(pd, 'unique', lambda block: blocks.append(len(block)) or unique(block))
+    assert _count_distinct(values, 50) == 51
+    assert len(blocks) == 1
+
+    blocks.clear()
+    assert _count_distinct(values[:1000], 5000) == 1000
+    assert _count_distinct(np.array([1.0, np.nan, 1.0, 2.0]), 10) == 2
+
+
+def test_segment_columns_exclude_group_and_metric():
+    df = mixed_frame(2000)
+    assert segment_columns(df) == ['variant', 'ten_levels_one_rare', 'eleven_levels', 'with_missing',
+                                   'mostly_unused_categories', 'four_values', 'six_values', 'converted']
+    ok, validated = validate_csv(df.copy())
+    assert ok
+    options = segment_columns(validated, exclude=('group', 'value'))
+    assert 'group' not in options and 'value' not in options
+    # six_values is the first metric candidate, so it became 'value'
+    assert options == ['ten_levels_one_rare', 'eleven_levels', 'with_missing', 'mostly_unused_categories',
+                       'four_values', 'converted']
+    assert segment_columns(df, max_unique=3) == ['variant', 'with_missing', 'mostly_unused_categories', 'converted']
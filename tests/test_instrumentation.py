@@ -0,0 +1,44 @@
+# tests/test_instrumentation.py
+
+import tracemalloc
+
+from utils.instrumentation import Recorder, set_active_recorder
+
+
+def test_memory_tracing_runs_while_any_recorder_holds_it():
+    first, second = Recorder(trace_memory=True), Recorder(trace_memory=True)
+    first.start_tracing()
+    second.start_tracing()
+    first.stop_tracing()
+    assert tracemalloc.is_tracing()
+    second.stop_tracing()
+    assert not tracemalloc.is_tracing()
+
+
+def test_recorder_without_memory_tracing_leaves_it_alone():
+    tracer = Recorder(trace_memory=True)
+    with tracer.activate():
+        with Recorder().activate():
+            pass
+        assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()
+
+
+def test_collected_recorder_releases_tracing():
+    recorder = Recorder(trace_memory=True)
+    set_active_recorder(recorder)
+    set_active_recorder(None)
+    assert tracemalloc.is_tracing()
+    del recorder
+    assert not tracemalloc.is_tracing()
+
+
+def test_stage_records_peak_allocation():
+    recorder = Recorder(trace_memory=True)
+    with recorder.activate():
+        with recorder.stage('alloc'):
+            block = bytearray(8 * 2 ** 20)
+        del block
+    record = recorder.records[-1]
+    assert record['stage'] == 'alloc'
+    assert record['peak_mb'] >= 8
@@ -0,0 +1,105 @@
+# tests/test_jobs.py
+
+import contextvars
+import threading
+
+import pytest
+
+from utils.jobs import JobExecutor
+from utils.result_store import store_key
+
+
+@pytest.fixture
+def executor():
+    executor = JobExecutor(max_workers=2)
+    yield executor
+    executor.shutdown()
+
+
+def test_identical_submissions_share_one_job(executor):
+    release, calls = threading.Event(), []
+
+    def compute(report):
+        calls.append(1)
+        release.wait(5)
+        return 42
+
+    first = executor.submit(('bootstrap', 'revenue'), compute)
+    second = executor.submit(('bootstrap', 'revenue'), compute)
+    assert second is first and first.id == store_key(('bootstrap', 'revenue'))
+    assert executor.get(first.id) is first
+    release.set()
+    assert first.result(5) == 42
+    assert executor.submit(('bootstrap', 'revenue'), compute) is first
+    assert len(calls) == 1
+
+
+def test_failed_jobs_are_retried_on_the_next_submission(executor):
+    attempts = []
+
+    def flaky(report):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError('transient')
+        return 'ok'
+
+    failed = executor.submit('flaky', flaky)
+    with pytest.raises(RuntimeError):
+        failed.result(5)
+    assert failed.state == 'failed'
+
+    retried = executor.submit('flaky', flaky)
+    assert retried is not failed
+    assert retried.result(5) == 'ok' and retried.state == 'done'
+    assert executor.submit('flaky', flaky) is retried
+    assert len(attempts) == 2
+
+
+def test_progress_is_visible_while_running(executor):
+    reported, release = threading.Event(), threading.Event()
+
+    def compute(report):
+        report(iterations=500, total=1000, p_value=0.04)
+        reported.set()
+        release.wait(5)
+        report(iterations=1000)
+        return 'done'
+
+    job = executor.submit('progress', compute, label='Bootstrap')
+    assert reported.wait(5)
+    assert job.state == 'running' and job.label == 'Bootstrap'
+    assert job.progress == {'iterations': 500, 'total': 1000, 'p_value': 0.04}
+    release.set()
+    job.result(5)
+    assert job.progress == {'iterations': 1000, 'total': 1000, 'p_value': 0.04}
+
+
+def test_jobs_run_in_the_submitters_context(executor):
+    var = contextvars.ContextVar('run', default=None)
+    var.set('session-1')
+    assert executor.submit('context', lambda report: var.get()).result(5) == 'session-1'
+
+
+def test_discard_forgets_only_finished_jobs(executor):
+    release = threading.Event()
+    running = executor.submit('slow', lambda report: release.wait(5))
+    executor.discard(running.id)
+    assert executor.get(running.id) is running
+    release.set()
+    running.result(5)
+    executor.discard(running.id)
+    assert executor.get(running.id) is None
+    assert executor.submit('slow', lambda report: 'again') is not running
+
+
+def test_oldest_finished_jobs_are_pruned():
+    executor = JobExecutor(max_workers=1, max_finished=2)
+    try:
+        jobs = []
+        for i in range(4):
+            jobs.append(executor.submit(('quick', i), lambda report, i=i: i))
+            jobs[-1].result(5)
+        # Pruning runs on submission, when the newest job may not have finished yet
+        assert executor.jobs() in (jobs[1:], jobs[2:])
+    finally:
+        executor.shutdown()
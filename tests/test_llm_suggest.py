@@ -0,0 +1,94 @@
+# tests/test_llm_suggest.py
+
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import llm_suggest
+from utils.cache import LRUCache
+from utils.llm_suggest import MAX_PROFILE_COLUMNS, schema_fingerprint, schema_profile, suggest_columns
+from utils.result_store import ResultStore
+
+
+class FakeClient:
+    # Stands in for openai.OpenAI: answers, raises or hangs, and counts requests
+    def __init__(self, answer='Group column: variant. Metric column: revenue.', error=None, delay=None):
+        self.answer, self.error, self.delay = answer, error, delay
+        self.prompts = []
+        self.released = threading.Event()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        self.prompts.append(messages[-1]['content'])
+        if self.delay is not None:
+            self.released.wait(self.delay)
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.answer))])
+
+
+@pytest.fixture(autouse=True)
+def fresh_answers(monkeypatch):
+    monkeypatch.setattr(llm_suggest, '_answers', LRUCache(maxsize=256))
+
+
+def experiment_frame(seed=0, n=500):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'variant': rng.choice(['control', 'b'], n), 'revenue': rng.gamma(2.0, 10.0, n),
+                         'country': rng.choice(['de', 'fr', 'us'], n)})
+
+
+def test_model_answer_is_cached_per_schema(tmp_path):
+    client = FakeClient()
+    store = ResultStore(str(tmp_path / 'results.sqlite'))
+    first = suggest_columns(experiment_frame(0), client, store=store)
+    assert first['source'] == 'llm' and first['text'] == client.answer
+    assert first['fingerprint'] == schema_fingerprint(experiment_frame(1))
+
+    # Same columns and dtypes, different values: no second request
+    second = suggest_columns(experiment_frame(1), client, store=store)
+    assert second == dict(first, source='cache')
+    assert len(client.prompts) == 1
+
+    # A new process starts with an empty memory cache but finds the stored answer
+    llm_suggest._answers.clear()
+    assert suggest_columns(experiment_frame(2), client, store=store)['source'] == 'cache'
+    assert len(client.prompts) == 1
+
+    renamed = experiment_frame(0).rename(columns={'revenue': 'spend'})
+    assert suggest_columns(renamed, client, store=store)['source'] == 'llm'
+    assert len(client.prompts) == 2
+
+
+def test_timeout_falls_back_to_the_heuristic():
+    client = FakeClient(delay=5.0)
+    try:
+        result = suggest_columns(experiment_frame(), client, timeout=0.2)
+    finally:
+        client.released.set()
+    assert result['source'] == 'heuristic'
+    assert 'Group column: **variant**' in result['text'] and 'did not answer within 0.2s' in result['text']
+    # Fallback answers are not cached: the next call asks the model again
+    assert suggest_columns(experiment_frame(), FakeClient())['source'] == 'llm'
+
+
+def test_failed_request_falls_back_to_the_heuristic():
+    result = suggest_columns(experiment_frame(), FakeClient(error=RuntimeError('rate limited')))
+    assert result['source'] == 'heuristic'
+    assert 'the request failed: rate limited' in result['text']
+    assert 'no OpenAI API key' in suggest_columns(experiment_frame(), None)['text']
+
+
+def test_custom_fallback_and_bounded_prompt():
+    wide = pd.DataFrame({f"col_{i}": np.arange(3000) % (i + 2) for i in range(60)})
+    result = suggest_columns(wide, None, fallback=lambda df, profile: f"{len(profile['columns'])} columns profiled")
+    assert result['source'] == '<lambda>' and result['text'].startswith(f"{MAX_PROFILE_COLUMNS} columns profiled")
+
+    profile = schema_profile(wide)
+    assert profile['sample_rows'] == llm_suggest.PROFILE_SAMPLE_ROWS and profile['omitted_columns'] == 20
+    client = FakeClient()
+    suggest_columns(wide, client)
+    assert '... and 20 more columns' in client.prompts[0]
@@ -0,0 +1,30 @@
+# tests/test_multiple_testing.py
+
+import numpy as np
+import pytest
+
+from methods.multiple_testing import adjust_p_values
+
+multitest = pytest.importorskip('statsmodels.stats.multitest')
+
+
+@pytest.mark.parametrize('method, reference', [('holm', 'holm'), ('bh', 'fdr_bh')])
+def test_matches_statsmodels(method, reference):
+    rng = np.random.default_rng(0)
+    p_values = np.concatenate([rng.uniform(size=40), rng.uniform(0, 0.01, size=10), [0.02, 0.02, 0.02]])
+    expected = multitest.multipletests(p_values, method=reference)[1]
+    assert np.allclose(adjust_p_values(p_values, method), expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize('method, reference', [('holm', 'holm'), ('bh', 'fdr_bh')])
+def test_missing_p_values_are_left_out(method, reference):
+    p_values = np.array([0.01, np.nan, 0.04, 0.03, np.nan])
+    adjusted = adjust_p_values(p_values, method)
+    assert np.isnan(adjusted[[1, 4]]).all()
+    valid = ~np.isnan(p_values)
+    assert np.allclose(adjusted[valid], multitest.multipletests(p_values[valid], method=reference)[1])
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        adjust_p_values([0.1], 'bonferroni-ish')
@@ -0,0 +1,69 @@
+# tests/test_parametric.py
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from methods.anova import anova_arrays, run_anova
+from methods.t_test import run_t_test, t_test_arrays
+from utils.group_stats import GroupStats, as_group_stats
+
+
+def groups(sizes, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.normal(1000 + i, 1 + i, size) for i, size in enumerate(sizes)]
+
+
+@pytest.mark.parametrize('equal_var', [True, False])
+def test_t_test_matches_scipy(equal_var, frame):
+    a, b = groups([40, 75])
+    result = run_t_test(frame([a, b]), equal_var=equal_var)
+    reference = stats.ttest_ind(a, b, equal_var=equal_var)
+    assert result['statistic'] == pytest.approx(reference.statistic, rel=1e-9)
+    assert result['p_value'] == pytest.approx(reference.pvalue, rel=1e-9)
+
+
+def test_anova_matches_scipy(frame):
+    samples = groups([20, 35, 50, 15], seed=1)
+    result = run_anova(frame(samples))
+    reference = stats.f_oneway(*samples)
+    assert result['statistic'] == pytest.approx(reference.statistic, rel=1e-9)
+    assert result['p_value'] == pytest.approx(reference.pvalue, rel=1e-9)
+
+
+def test_vectorised_over_experiments(frame):
+    experiments = [groups([30, 30, 30], seed=s) for s in range(5)]
+    summaries = [as_group_stats(frame(samples)) for samples in experiments]
+    f, p = anova_arrays(np.array([s.n for s in summaries]), np.array([s.mean for s in summaries]),
+                        np.array([s.m2 for s in summaries]))
+    for samples, f_i, p_i in zip(experiments, f, p):
+        reference = stats.f_oneway(*samples)
+        assert f_i == pytest.approx(reference.statistic, rel=1e-9)
+        assert p_i == pytest.approx(reference.pvalue, rel=1e-9)
+
+    first, second = ([[getattr(s, attr)[i] for s in summaries] for attr in ('n', 'mean', 'm2')] for i in (0, 1))
+    t, p_t, _ = t_test_arrays(*map(np.array, first), *map(np.array, second))
+    for samples, t_i, p_i in zip(experiments, t, p_t):
+        reference = stats.ttest_ind(samples[0], samples[1])
+        assert t_i == pytest.approx(reference.statistic, rel=1e-9)
+        assert p_i == pytest.approx(reference.pvalue, rel=1e-9)
+
+
+def test_merged_partials_equal_one_pass(frame):
+    samples = groups([100, 80], seed=2)
+    df = frame(samples)
+    whole = as_group_stats(df)
+    merged = as_group_stats(df.iloc[:70]).merge(as_group_stats(df.iloc[70:]))
+    order = [list(merged.labels).index(label) for label in whole.labels]
+    assert np.allclose(merged.n[order], whole.n)
+    assert np.allclose(merged.mean[order], whole.mean, rtol=1e-12)
+    assert np.allclose(merged.m2[order], whole.m2, rtol=1e-9)
+    assert np.allclose(whole.var, [np.var(s, ddof=1) for s in samples], rtol=1e-9)
+
+
+def test_from_moments_round_trip():
+    samples = groups([25, 60], seed=3)
+    stats_ = GroupStats.from_moments(['a', 'b'], [len(s) for s in samples], [s.mean() for s in samples],
+                                     [s.std(ddof=1) for s in samples])
+    reference = stats.ttest_ind(*samples)
+    assert run_t_test(stats_)['p_value'] == pytest.approx(reference.pvalue, rel=1e-9)
@@ -0,0 +1,75 @@
+# tests/test_pdf_export.py
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.experiment_data import ExperimentData
+from utils.pdf_export import PdfStreamWriter, fit_text, generate_pdf, text_width
+
+pypdf = pytest.importorskip('pypdf')
+
+
+def png(width=40, height=20):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.fromarray(np.full((height, width, 3), 200, dtype=np.uint8)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def test_stream_writer_output_is_readable(tmp_path):
+    path = tmp_path / 'out.pdf'
+    with PdfStreamWriter(str(path)) as pdf:
+        pdf.text(40, 700, "First page (with parentheses) and a backslash \\", size=12, style='bold')
+        pdf.image(png(), 40, 500, 200, 100)
+        pdf.new_page()
+        pdf.rect(40, 680, 200, 20)
+        pdf.line(40, 680, 240, 680)
+        pdf.text(40, 700, "Second page: café")
+        assert pdf.page_count == 2
+
+    reader = pypdf.PdfReader(str(path), strict=True)
+    assert len(reader.pages) == 2
+    assert "First page (with parentheses) and a backslash \\" in reader.pages[0].extract_text()
+    assert "Second page: café" in reader.pages[1].extract_text()
+    images = reader.pages[0].images
+    assert len(images) == 1 and images[0].image.size == (40, 20)
+
+
+def test_empty_document_has_one_page(tmp_path):
+    path = tmp_path / 'empty.pdf'
+    PdfStreamWriter(str(path)).close()
+    assert len(pypdf.PdfReader(str(path), strict=True).pages) == 1
+
+
+def test_generate_pdf_wraps_and_paginates():
+    summary = "\n".join([f"Line {i}: " + "word " * 40 for i in range(60)])
+    reader = pypdf.PdfReader(generate_pdf(summary))
+    assert len(reader.pages) > 1
+    text = "".join(page.extract_text() for page in reader.pages)
+    assert "Line 0:" in text and "Line 59:" in text
+
+
+def test_fit_text_truncates_to_width():
+    text = fit_text("a rather long experiment name", 60, 10)
+    assert text.endswith('...') and text_width(text, 10) <= 60
+    assert fit_text("short", 60, 10) == "short"
+
+
+def test_report_pdf_sections(tmp_path):
+    from utils.reports import run_report
+
+    rng = np.random.default_rng(0)
+    tasks = []
+    for name in ('exp-1', 'exp-2'):
+        df = pd.DataFrame({'group': np.repeat(['a', 'b'], 50), 'value': rng.normal(size=100)})
+        tasks.append((name, 'revenue', ExperimentData.from_frame(df)))
+    path = tmp_path / 'report.pdf'
+    summary = run_report(tasks, [str(path)], methods=['t-test'], figures=False, store_path=None, progress=None)
+    reader = pypdf.PdfReader(str(path), strict=True)
+    assert summary['sections'] == 2 and len(reader.pages) == summary['pdf_pages']
+    text = "".join(page.extract_text() for page in reader.pages)
+    assert "exp-1: revenue" in text and "exp-2: revenue" in text and "Overview" in text
@@ -0,0 +1,76 @@
+# tests/test_plots.py
+
+import numpy as np
+import pytest
+
+from utils.experiment_data import ExperimentData
+from utils.plots import MAX_FLIERS, box_stats, boxplot_png, grid_kde, histogram
+
+
+def skewed_groups(seed=0):
+    rng = np.random.default_rng(seed)
+    control = rng.lognormal(2.0, 0.8, 4000)
+    control[::500] = np.nan
+    return ExperimentData.from_groups({'control': control, 'treatment': rng.normal(10.0, 3.0, 300),
+                                       'tiny': [1.0, 2.0, 2.5]})
+
+
+def numpy_box(values, whis=1.5):
+    # Reference: numpy percentiles (linear interpolation) and the 1.5 IQR fences
+    values = values[~np.isnan(values)]
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - whis * iqr) & (values <= q3 + whis * iqr)]
+    below, above = np.sort(values[values < inside.min()]), np.sort(values[values > inside.max()])
+    # Only the most extreme outliers on each side are kept
+    return q1, med, q3, inside.min(), inside.max(), np.concatenate([below[:MAX_FLIERS], above[-MAX_FLIERS:]])
+
+
+def test_box_stats_match_numpy():
+    data = skewed_groups()
+    stats = box_stats(data)
+    assert [s['label'] for s in stats] == ['control', 'treatment', 'tiny']
+    assert len(stats[0]['fliers']) == MAX_FLIERS
+    for entry, values in zip(stats, data.groups()):
+        q1, med, q3, low, high, outliers = numpy_box(values)
+        assert (entry['q1'], entry['med'], entry['q3']) == pytest.approx((q1, med, q3))
+        assert (entry['whislo'], entry['whishi']) == (low, high)
+        np.testing.assert_array_equal(np.sort(entry['fliers']), outliers)
+
+
+def test_box_stats_match_matplotlib():
+    cbook = pytest.importorskip('matplotlib.cbook')
+    data = skewed_groups()
+    for entry, values in zip(box_stats(data), data.groups()):
+        reference = cbook.boxplot_stats(values[~np.isnan(values)])[0]
+        for field in ('q1', 'med', 'q3', 'whislo', 'whishi'):
+            assert entry[field] == pytest.approx(reference[field])
+        assert set(entry['fliers']) <= set(reference['fliers'])
+
+
+def test_histogram_matches_numpy_on_finite_values():
+    values = np.random.default_rng(1).normal(0.0, 1.0, 5000)
+    values[:10] = np.nan
+    values[10:12] = np.inf
+    counts, edges = histogram(values, bins=40)
+    expected_counts, expected_edges = np.histogram(values[12:], bins=40)
+    np.testing.assert_array_equal(counts, expected_counts)
+    np.testing.assert_array_equal(edges, expected_edges)
+    assert counts.sum() == len(values) - 12
+
+
+def test_grid_kde_matches_scipy():
+    stats = pytest.importorskip('scipy.stats')
+    values = np.random.default_rng(2).gamma(3.0, 2.0, 20_000)
+    grid, density = grid_kde(values)
+    exact = stats.gaussian_kde(values)(grid)
+    assert np.abs(density - exact).max() < 0.01 * exact.max()
+    assert grid_kde(np.array([3.0, 3.0, 3.0])) is None
+
+
+def test_boxplot_png_leaves_no_pyplot_figure():
+    plt = pytest.importorskip('matplotlib.pyplot')
+    before = plt.get_fignums()
+    png = boxplot_png(skewed_groups())
+    assert png.startswith(b'\x89PNG')
+    assert plt.get_fignums() == before
@@ -0,0 +1,51 @@
+# tests/test_registry.py
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from methods.registry import METHODS, MethodSpec, available_methods, get_method
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_registry_import_loads_no_method_module():
+    # A fresh interpreter, since other tests have already imported the methods
+    script = (
+        "import json, sys\n"
+        "from methods.registry import get_method\n"
+        "before = sorted(m for m in sys.modules if m.startswith('methods.') or m.split('.')[0] == 'scipy')\n"
+        "get_method('T-Test').load()\n"
+        "after = sorted(m for m in sys.modules if m.startswith('methods.'))\n"
+        "print(json.dumps([before, after]))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    before, after = json.loads(output)
+    assert before == ['methods.registry']
+    assert 'methods.t_test' in after and 'methods.tukey_hsd' not in after
+
+
+def test_available_methods_filter_by_group_count_and_input():
+    assert available_methods(2) == ['T-Test', 'Bootstrap', 'Bayesian A/B']
+    assert available_methods(2, input='summary') == ['T-Test', 'Bayesian A/B']
+    assert available_methods(3) == ['ANOVA', 'Tukey’s HSD', 'Games-Howell', 'Bayesian A/B']
+    assert available_methods(12, input='summary') == ['ANOVA', 'Tukey’s HSD', 'Games-Howell', 'Bayesian A/B']
+    assert available_methods(1) == []
+
+
+def test_specs_accept_their_group_range():
+    spec = MethodSpec('Pairs', 'json', 'dumps', min_groups=2, max_groups=3)
+    assert [spec.accepts(k) for k in (1, 2, 3, 4)] == [False, True, True, False]
+    assert all(get_method(name) is METHODS[name] for name in METHODS)
+    with pytest.raises(KeyError, match='Unknown method'):
+        get_method('Mann-Whitney')
+
+
+def test_run_merges_defaults_with_overrides():
+    spec = MethodSpec('Dump', 'json', 'dumps', defaults={'sort_keys': True, 'indent': 2})
+    assert spec._func is None
+    assert spec.run({'b': 1, 'a': 2}, indent=None) == '{"a": 2, "b": 1}'
+    assert spec._func is json.dumps
@@ -0,0 +1,71 @@
+# tests/test_result_store.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.cache import make_key
+from utils.result_store import ResultStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(str(tmp_path / 'results.sqlite'))
+
+
+def test_round_trip_of_method_outputs(store):
+    value = {
+        'p_value': 0.012,
+        'distribution': np.linspace(0, 1, 1000),
+        'groups': ['a', 'b'],
+        'posteriors': [(1.0, 2.0), (3.0, 4.0)],
+        'labels': np.array(['x', 7], dtype=object),
+        'png': b'\x89PNG\r\n\x1a\n',
+        'none': None,
+    }
+    frame = pd.DataFrame({'group1': ['a', 'a'], 'group2': ['b', 'c'], 'p-adj': [0.1, 0.2], 'reject': [False, True]})
+    key = make_key('dataset', 'result', 'group', 'value', 'Bootstrap', adaptive=False)
+    assert store.put(key, value) and store.put(('tukey',), (frame, None))
+
+    restored = store.get(key)
+    assert restored.keys() == value.keys()
+    assert np.array_equal(restored['distribution'], value['distribution'])
+    assert restored['posteriors'] == value['posteriors'] and restored['png'] == value['png']
+    assert list(restored['labels']) == ['x', 7] and restored['none'] is None
+    restored_frame, fig = store.get(('tukey',))
+    pd.testing.assert_frame_equal(restored_frame, frame)
+    assert fig is None
+
+
+def test_missing_keys_and_unencodable_values(store):
+    assert store.get(('absent',)) is None
+    assert store.get(('absent',), 'default') == 'default'
+    assert not store.put(('figure',), object())
+    assert len(store) == 0
+
+
+def test_shared_between_instances(store):
+    store.put(('shared',), np.arange(5))
+    other = ResultStore(store.path)
+    assert np.array_equal(other.get(('shared',)), np.arange(5))
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    store = ResultStore(str(tmp_path / 'small.sqlite'), max_bytes=50_000)
+    payload = lambda: np.zeros(2_000)  # about 16 KB each
+    for name in ('a', 'b', 'c'):
+        store.put((name,), payload())
+    store.get(('a',))
+    store.put(('d',), payload())
+    assert store.get(('b',)) is None
+    assert all(store.get((name,)) is not None for name in ('a', 'c', 'd'))
+    assert store.total_bytes <= store.max_bytes
+    assert not store.put(('huge',), np.zeros(10_000))
+
+
+def test_get_or_compute_runs_once(store):
+    calls = []
+    compute = lambda: calls.append(1) or {'statistic': 1.5}
+    assert store.get_or_compute(('t',), compute) == {'statistic': 1.5}
+    assert store.get_or_compute(('t',), compute) == {'statistic': 1.5}
+    assert len(calls) == 1
@@ -0,0 +1,61 @@
+# tests/test_sequential.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import integrate, stats
+
+from methods.sequential import SequentialMonitor, msprt_arrays
+from utils.group_stats import GroupStats
+
+
+def batch(rng, n, shift=0.0):
+    values = [rng.normal(10.0, 2.0, n), rng.normal(10.0 + shift, 2.0, n)]
+    return GroupStats(['control', 'treatment'], [n, n], [v.mean() for v in values],
+                      [((v - v.mean()) ** 2).sum() for v in values])
+
+
+def test_mixture_likelihood_ratio_matches_integral():
+    n1, mean1, var1, n2, mean2, var2, tau2 = 200, 1.0, 4.0, 250, 1.3, 5.0, 0.09
+    diff, v, log_lr = msprt_arrays(n1, mean1, var1, n2, mean2, var2, tau2)
+    # ∫ N(diff; θ, v) N(θ; 0, τ²) dθ / N(diff; 0, v)
+    mixture, _ = integrate.quad(lambda theta: stats.norm.pdf(diff, theta, np.sqrt(v)) *
+                                stats.norm.pdf(theta, 0, np.sqrt(tau2)), -10, 10, points=[0, diff])
+    assert log_lr == pytest.approx(np.log(mixture / stats.norm.pdf(diff, 0, np.sqrt(v))), rel=1e-8)
+
+
+def test_p_values_decrease_and_intervals_shrink():
+    rng = np.random.default_rng(0)
+    monitor = SequentialMonitor(control='control')
+    history = []
+    for _ in range(30):
+        monitor.update(batch(rng, 50, shift=0.3))
+        history.append((monitor.p_value['treatment'], monitor.lower['treatment'], monitor.upper['treatment']))
+    p, lower, upper = map(np.array, zip(*history))
+    assert np.all(np.diff(p) <= 0) and np.all(np.diff(lower) >= 0) and np.all(np.diff(upper) <= 0)
+    assert p[-1] < 0.05 and lower[-1] > 0
+
+
+def test_type_one_error_holds_under_continuous_monitoring():
+    # A/A experiments checked after every batch: an always-valid p-value crosses alpha at
+    # most alpha of the time, where repeated fixed-horizon t-tests would reject far more often
+    rng = np.random.default_rng(1)
+    runs, looks, alpha = 300, 40, 0.05
+    rejected = 0
+    for _ in range(runs):
+        monitor = SequentialMonitor(control='control', alpha=alpha)
+        for _ in range(looks):
+            monitor.update(batch(rng, 25))
+        rejected += monitor.p_value['treatment'] < alpha
+    assert rejected / runs <= alpha + 3 * np.sqrt(alpha * (1 - alpha) / runs)
+
+
+def test_state_round_trip_and_duplicate_batches():
+    rng = np.random.default_rng(2)
+    monitor = SequentialMonitor(control='control')
+    assert monitor.update(batch(rng, 40, shift=0.5), batch_id='day-1')
+    assert not monitor.update(batch(rng, 40, shift=0.5), batch_id='day-1')
+    monitor.update(batch(rng, 40, shift=0.5), batch_id='day-2')
+    restored = SequentialMonitor.from_dict(monitor.to_dict())
+    pd.testing.assert_frame_equal(restored.results(), monitor.results())
+    assert restored.batches == ['day-1', 'day-2'] and restored.looks == 2
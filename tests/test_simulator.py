@@ -0,0 +1,62 @@
+# tests/test_simulator.py
+
+from itertools import combinations
+
+import numpy as np
+import pytest
+from scipy.stats import binom, hypergeom
+
+from utils.simulator import _batch_permutation, simulate_rejection_rate
+
+
+def exact_permutation_p(a, b):
+    pooled = np.concatenate([a, b])
+    observed = abs(np.mean(a) - np.mean(b))
+    diffs = []
+    for idx in combinations(range(len(pooled)), len(a)):
+        mask = np.zeros(len(pooled), dtype=bool)
+        mask[list(idx)] = True
+        diffs.append(abs(pooled[mask].mean() - pooled[~mask].mean()))
+    return np.mean(np.array(diffs) >= observed - 1e-9)
+
+
+@pytest.mark.parametrize('a, b', [([1.1, 2.2, 3.3], [4.4, 5.5, 6.6]),
+                                  ([0.0, 0.0, 1.0, 1.0], [1.0, 1.0, 1.0, 0.0]),
+                                  ([0.1, 0.2, 0.7, 0.3], [0.6, 0.9, 0.4, 0.8])])
+def test_permutation_p_value_matches_exact_enumeration(a, b):
+    a, b = np.array(a), np.array(b)
+    x = np.stack([a, b])[None]
+    p = _batch_permutation(x, 20000, np.random.default_rng(0))[0]
+    assert p == pytest.approx(exact_permutation_p(a, b), abs=0.01)
+
+
+def exact_binary_level(n, rate, alpha):
+    # Type-I error of the exact permutation test on two groups of n 0/1 outcomes: conditional on
+    # the total number of successes, group 1's count is hypergeometric
+    level = 0.0
+    for total in range(2 * n + 1):
+        k = np.arange(max(0, total - n), min(n, total) + 1)
+        pk = hypergeom.pmf(k, 2 * n, total, n)
+        distance = np.abs(2 * k - total)
+        p_values = np.array([pk[distance >= d].sum() for d in distance])
+        level += binom.pmf(total, 2 * n, rate) * pk[p_values < alpha].sum()
+    return level
+
+
+def test_bootstrap_type_one_error_near_alpha():
+    runs = 3000
+    margin = 3 * np.sqrt(0.05 * 0.95 / runs)
+    continuous = simulate_rejection_rate('bootstrap', runs, 30, seed=1)['rejection_rate']
+    assert continuous == pytest.approx(0.05, abs=margin)
+    # On 0/1 data the exact test is conservative; the simulation must match its exact level
+    binary = simulate_rejection_rate('bootstrap', runs, 50, distribution='binary', baseline=0.3,
+                                     seed=2)['rejection_rate']
+    assert binary == pytest.approx(exact_binary_level(50, 0.3, 0.05), abs=margin)
+
+
+def test_t_test_type_one_error_and_power():
+    null = simulate_rejection_rate('t-test', 4000, 50, seed=3)['rejection_rate']
+    assert null == pytest.approx(0.05, abs=0.015)
+    # Power of a two-sided t-test for d = 0.5 with 64 per group is about 0.80
+    power = simulate_rejection_rate('t-test', 4000, 64, effect_size=0.5, seed=4)['rejection_rate']
+    assert power == pytest.approx(0.80, abs=0.03)
@@ -0,0 +1,132 @@
+# tests/test_streaming.py
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.experiment_data import ExperimentData
+from utils.streaming import _Reservoir, read_appended_rows, read_columns, read_profile, stream_csv
+
+
+def write_rows(path, n=5000, seed=0):
+    # Group 'late' only appears after the first chunks, and some values are missing
+    rng = np.random.default_rng(seed)
+    groups = rng.choice(['control', 'treatment'], n)
+    groups[n // 2:][rng.random(n - n // 2) < 0.3] = 'late'
+    values = rng.lognormal(3.0, 1.0, n) + 1e6
+    values[rng.random(n) < 0.02] = np.nan
+    df = pd.DataFrame({' Variant ': groups, 'Revenue': values, 'day': rng.integers(0, 7, n)})
+    df.to_csv(path, index=False)
+    return df
+
+
+@pytest.mark.parametrize('chunksize', [700, 10_000])
+def test_streamed_moments_match_a_full_read(tmp_path, chunksize):
+    path = tmp_path / 'rows.csv'
+    write_rows(path)
+    result = stream_csv(str(path), 'variant', 'revenue', chunksize=chunksize, seed=0)
+    full = ExperimentData.from_frame(pd.read_csv(path), ' Variant ', 'Revenue')
+    expected = full.stats()
+
+    assert list(result.stats.labels) == list(full.labels)
+    assert result.stats.labels[-1] == 'late'
+    assert result.n_rows == len(full)
+    np.testing.assert_array_equal(result.stats.n, expected.n)
+    np.testing.assert_allclose(result.stats.mean, expected.mean, rtol=1e-12)
+    np.testing.assert_allclose(result.stats.var, expected.var, rtol=1e-9)
+    groups = pd.read_csv(path).dropna().groupby(' Variant ', sort=False)['Revenue']
+    np.testing.assert_allclose(result.stats.var, groups.var().to_numpy(), rtol=1e-9)
+
+
+def test_reservoir_keeps_exactly_k_rows(tmp_path):
+    path = tmp_path / 'rows.csv'
+    write_rows(path)
+    result = stream_csv(str(path), 'variant', 'revenue', chunksize=700, reservoir_size=300, seed=1)
+    assert len(result.sample) == 300
+    assert set(result.sample.labels) <= set(result.stats.labels)
+
+    everything = stream_csv(str(path), 'variant', 'revenue', chunksize=700, reservoir_size=10_000, seed=1)
+    assert len(everything.sample) == everything.n_rows
+
+
+def test_reservoir_sample_is_uniform():
+    # Every row should be kept with probability size / rows, whatever chunk it arrived in
+    rows, size, runs = 40, 8, 4000
+    labels = np.array([f"r{i}" for i in range(rows)], dtype=object)
+    values = np.arange(rows, dtype=np.float64)
+    kept = np.zeros(rows)
+    for seed in range(runs):
+        reservoir = _Reservoir(size, np.random.default_rng(seed))
+        for start, stop in ((0, 5), (5, 6), (6, 23), (23, 40)):
+            reservoir.add(labels[start:stop], values[start:stop])
+        assert reservoir.filled == size
+        assert len(set(reservoir.values)) == size
+        kept[reservoir.values.astype(int)] += 1
+    share = kept / runs
+    se = np.sqrt(size / rows * (1 - size / rows) / runs)
+    assert np.abs(share - size / rows).max() < 4.5 * se
+
+
+def test_profile_and_labels_match_the_in_memory_path(tmp_path):
+    path = tmp_path / 'rows.csv'
+    write_rows(path)
+    profile = read_profile(str(path), nrows=100)
+    assert list(profile.columns) == ['variant', 'revenue', 'day']
+    assert len(profile) == 100
+
+    result = stream_csv(str(path), chunksize=700, seed=0)
+    assert (result.group_col, result.value_col) == ('variant', 'revenue')
+    full = ExperimentData.from_frame(pd.read_csv(path), ' Variant ', 'Revenue')
+    assert list(result.stats.labels) == list(full.labels)
+    assert set(result.sample.labels) == set(full.labels)
+
+
+def test_parquet_streams_like_csv(tmp_path):
+    pytest.importorskip('pyarrow')
+    df = write_rows(tmp_path / 'rows.csv')
+    df.to_parquet(tmp_path / 'rows.parquet', index=False)
+    from_csv = stream_csv(str(tmp_path / 'rows.csv'), 'variant', 'revenue', chunksize=700, seed=0)
+    from_parquet = stream_csv(str(tmp_path / 'rows.parquet'), 'variant', 'revenue', chunksize=700, seed=0)
+    assert list(from_parquet.stats.labels) == list(from_csv.stats.labels)
+    np.testing.assert_array_equal(from_parquet.stats.n, from_csv.stats.n)
+    np.testing.assert_allclose(from_parquet.stats.mean, from_csv.stats.mean, rtol=1e-12)
+    np.testing.assert_allclose(from_parquet.stats.m2, from_csv.stats.m2, rtol=1e-9)
+
+
+def test_appended_rows_resume_and_restart_after_truncation(tmp_path):
+    path = tmp_path / 'events.csv'
+    path.write_bytes(b'Variant,Revenue\na,1.0\nb,2.0\nb,3')
+    rows, offset = read_appended_rows(str(path))
+    # The last line is still being written
+    assert list(rows.columns) == ['variant', 'revenue'] and rows['revenue'].tolist() == [1.0, 2.0]
+
+    with open(path, 'ab') as f:
+        f.write(b'.5\na,4.0\n')
+    rows, offset = read_appended_rows(str(path), offset)
+    assert rows['revenue'].tolist() == [3.5, 4.0]
+    rows, same = read_appended_rows(str(path), offset)
+    assert len(rows) == 0 and list(rows.columns) == ['variant', 'revenue'] and same == offset
+
+    # Rotated: a new, shorter file under the same name is read from its first row
+    path.write_bytes(b'Variant,Revenue\nc,9.0\n')
+    rows, _ = read_appended_rows(str(path), offset)
+    assert rows['variant'].tolist() == ['c']
+
+
+def test_monitor_matches_columns_the_same_way_with_and_without_tail(tmp_path, capsys):
+    from cli import main
+
+    path = tmp_path / 'events.csv'
+    pd.DataFrame({' Variant': ['a', 'b'] * 50, 'Revenue ': np.arange(100.0)}).to_csv(path, index=False)
+    assert list(read_columns(str(path), ['revenue', 'variant']).columns) == ['variant', 'revenue']
+
+    looks = []
+    for extra in ([], ['--tail']):
+        state = tmp_path / f"state{len(extra)}.json"
+        main(['monitor', '--input', str(path), '--state', str(state), '--group-col', 'VARIANT',
+              '--value-col', 'revenue'] + extra)
+        looks.append(json.loads(capsys.readouterr().err.strip().splitlines()[-1]))
+    assert looks[0] == looks[1]
+    assert looks[0]['rows_added'] == 100
@@ -0,0 +1,108 @@
+# tests/test_tukey.py
+
+import time
+import warnings
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import studentized_range
+
+from methods.tukey_hsd import run_games_howell, run_tukey_hsd
+
+
+def sample_frame(sizes=(30, 45, 12, 60), shifts=(0.0, 0.4, -0.3, 0.8), scales=(1.0, 2.0, 0.5, 1.5), seed=0):
+    rng = np.random.default_rng(seed)
+    groups = [f"g{i}" for i in range(len(sizes))]
+    values = [rng.normal(shift, scale, size) for size, shift, scale in zip(sizes, shifts, scales)]
+    return pd.DataFrame({'group': np.repeat(groups, sizes), 'value': np.concatenate(values)})
+
+
+def by_pair(summary_df):
+    return summary_df.set_index(['group1', 'group2'])
+
+
+def test_tukey_matches_statsmodels():
+    multicomp = pytest.importorskip('statsmodels.stats.multicomp')
+    df = sample_frame()
+    ours = by_pair(run_tukey_hsd(df)[0])
+    reference = multicomp.pairwise_tukeyhsd(df['value'], df['group'], alpha=0.05)
+    table = pd.DataFrame(reference.summary().data[1:], columns=reference.summary().data[0])
+    for row in table.itertuples(index=False):
+        mine = ours.loc[(row.group1, row.group2)]
+        assert mine['meandiff'] == pytest.approx(row.meandiff, abs=1e-4)
+        assert mine['lower'] == pytest.approx(row.lower, abs=1e-4)
+        assert mine['upper'] == pytest.approx(row.upper, abs=1e-4)
+    assert np.allclose(ours['p-adj'].to_numpy(), reference.pvalues, atol=1e-6)
+
+
+def games_howell_reference(df, alpha=0.05, pairs=None):
+    # Textbook Games-Howell, one pair at a time
+    groups = sorted(df['group'].unique())
+    k = len(groups)
+    rows = {}
+    for a, b in pairs or combinations(groups, 2):
+        x, y = df.loc[df['group'] == a, 'value'], df.loc[df['group'] == b, 'value']
+        va, vb = x.var(ddof=1) / len(x), y.var(ddof=1) / len(y)
+        diff = y.mean() - x.mean()
+        se = np.sqrt((va + vb) / 2)
+        dof = (va + vb) ** 2 / (va ** 2 / (len(x) - 1) + vb ** 2 / (len(y) - 1))
+        crit = studentized_range.ppf(1 - alpha, k, dof)
+        rows[(a, b)] = (diff, studentized_range.sf(abs(diff) / se, k, dof), diff - crit * se, diff + crit * se)
+    return rows
+
+
+def test_games_howell_matches_reference():
+    df = sample_frame()
+    ours = by_pair(run_games_howell(df)[0])
+    for pair, (diff, p_value, lower, upper) in games_howell_reference(df).items():
+        mine = ours.loc[pair]
+        assert mine['meandiff'] == pytest.approx(diff)
+        assert mine['p-adj'] == pytest.approx(p_value, rel=1e-6, abs=1e-9)
+        assert mine['lower'] == pytest.approx(lower, rel=1e-6)
+        assert mine['upper'] == pytest.approx(upper, rel=1e-6)
+
+
+def test_small_error_df_uses_exact_distribution():
+    # Five observations in three groups: two error degrees of freedom
+    df = pd.DataFrame({'group': ['a', 'b', 'b', 'c', 'c'], 'value': [0.0, 1.0, 1.5, 3.0, 3.2]})
+    summary_df = run_tukey_hsd(df)[0]
+    n, mean = np.array([1, 2, 2]), np.array([0.0, 1.25, 3.1])
+    mse = (0.125 + 0.02) / 2
+    q = abs(mean[1] - mean[0]) / np.sqrt(mse / 2 * (1 / n[0] + 1 / n[1]))
+    assert summary_df['p-adj'].iloc[0] == pytest.approx(studentized_range.sf(q, 3, 2))
+
+
+def test_progress_is_reported_per_block_of_pairs():
+    k = 9
+    df = sample_frame(sizes=[20] * k, shifts=np.linspace(0, 1, k), scales=[1.0] * k)
+    calls = []
+    run_games_howell(df, progress=lambda **p: calls.append(p))
+    pairs = k * (k - 1) // 2
+    assert len(calls) > 1
+    assert [c['iterations'] for c in calls] == sorted(c['iterations'] for c in calls)
+    assert calls[-1] == {'iterations': pairs, 'total': pairs}
+
+
+
+def test_twenty_arms_stay_fast_and_match_scipy():
+    # 190 pairs with Welch df in the thousands, where scipy alone needs about 15 ms per
+    # p-value and 0.2 s per quantile
+    k = 20
+    df = sample_frame(sizes=[5000] * k, shifts=np.linspace(0, 0.1, k), scales=np.linspace(0.5, 2, k))
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        start = time.perf_counter()
+        ours = by_pair(run_games_howell(df)[0])
+        elapsed = time.perf_counter() - start
+    assert len(ours) == k * (k - 1) // 2
+    assert elapsed < 2.0
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        reference = games_howell_reference(df, pairs=[('g0', 'g1'), ('g0', 'g19'), ('g3', 'g12'), ('g17', 'g18')])
+    for pair, (diff, p_value, lower, upper) in reference.items():
+        mine = ours.loc[pair]
+        assert mine['p-adj'] == pytest.approx(p_value, abs=1e-8)
+        assert mine['lower'] == pytest.approx(lower, rel=1e-6)
+        assert mine['upper'] == pytest.approx(upper, rel=1e-6)
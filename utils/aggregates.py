@@ -0,0 +1,88 @@
+# utils/aggregates.py
+
+import numpy as np
+import pandas as pd
+
+from utils.group_stats import GroupStats
+
+# Column names recognised in summary tables, after the same lower-casing as validate_csv
+GROUP_NAMES = ('group', 'variant', 'arm', 'bucket', 'treatment')
+COUNT_NAMES = ('n', 'count', 'size', 'samples', 'users')
+MEAN_NAMES = ('mean', 'avg', 'average')
+STD_NAMES = ('std', 'sd', 'stddev', 'stdev', 'std_dev')
+CONVERSION_NAMES = ('conversions', 'successes', 'converted', 'conversion_count')
+TRIAL_NAMES = ('trials', 'visitors', 'exposures', 'users', 'n', 'count')
+
+SUMMARY_KINDS = ('moments', 'conversions')
+
+
+def _first(columns, names):
+    return next((name for name in names if name in columns), None)
+
+
+def detect_summary_columns(df):
+    # Guess the layout of a summary table: (group, n, mean, std) or (group, conversions, trials).
+    # Returns a dict of column roles, or None when neither layout is recognised.
+    columns = list(df.columns)
+    group = _first(columns, GROUP_NAMES) or next(
+        (col for col in columns if not pd.api.types.is_numeric_dtype(df[col])), None)
+    if group is None:
+        return None
+
+    conversions, trials = _first(columns, CONVERSION_NAMES), _first(columns, TRIAL_NAMES)
+    if conversions and trials:
+        return {'kind': 'conversions', 'group': group, 'conversions': conversions, 'trials': trials}
+
+    n, mean, std = _first(columns, COUNT_NAMES), _first(columns, MEAN_NAMES), _first(columns, STD_NAMES)
+    if n and mean and std:
+        return {'kind': 'moments', 'group': group, 'n': n, 'mean': mean, 'std': std}
+    return None
+
+
+def _numeric(df, col):
+    values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    if np.isnan(values).any():
+        raise ValueError(f"Column '{col}' must be numeric with no missing values.")
+    return values
+
+
+def pool_partials(labels, n, mean, m2):
+    # Several rows per group (e.g. one per day or partition) pooled into one summary per
+    # group with the same parallel-variance update as GroupStats.merge
+    codes, uniques = pd.factorize(pd.Series(labels), sort=False)
+    total = np.bincount(codes, weights=n)
+    pooled_mean = np.bincount(codes, weights=n * mean) / total
+    spread = np.bincount(codes, weights=m2 + n * (mean - pooled_mean[codes]) ** 2)
+    return GroupStats(np.asarray(uniques), total, pooled_mean, spread)
+
+
+def stats_from_moments(df, group_col, n_col, mean_col, std_col, ddof=1):
+    n, mean, std = _numeric(df, n_col), _numeric(df, mean_col), _numeric(df, std_col)
+    if (n < 1).any() or (std < 0).any():
+        raise ValueError("Counts must be at least 1 and standard deviations non-negative.")
+    # A single observation has no spread, whatever the export wrote for its std
+    m2 = np.where(n > ddof, std ** 2 * (n - ddof), 0.0)
+    return pool_partials(df[group_col].to_numpy(), n, mean, m2)
+
+
+def stats_from_conversions(df, group_col, conversions_col, trials_col):
+    # 0/1 outcomes: mean = c / t and M2 = c * (1 - c / t), so the Beta model is picked automatically
+    conversions, trials = _numeric(df, conversions_col), _numeric(df, trials_col)
+    if (trials < 1).any() or (conversions < 0).any() or (conversions > trials).any():
+        raise ValueError("Conversions must lie between 0 and the number of trials.")
+    rate = conversions / trials
+    return pool_partials(df[group_col].to_numpy(), trials, rate, conversions * (1 - rate))
+
+
+def load_summary_table(df, columns=None):
+    # GroupStats from a summary table; column roles are detected unless given
+    columns = columns or detect_summary_columns(df)
+    if columns is None:
+        raise ValueError("Expected columns (group, n, mean, std) or (group, conversions, trials).")
+    if columns['kind'] == 'conversions':
+        stats = stats_from_conversions(df, columns['group'], columns['conversions'], columns['trials'])
+    else:
+        stats = stats_from_moments(df, columns['group'], columns['n'], columns['mean'], columns['std'])
+    if stats.n_groups < 2:
+        raise ValueError("Need at least 2 unique groups for A/B testing.")
+    return stats
@@ -0,0 +1,242 @@
+# utils/batch_runner.py
+
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from methods.registry import get_method
+from methods.resampling import resolve_jobs
+from utils.columnar import file_format, read_arrow, to_frame
+from utils.experiment_data import ExperimentData
+
+# CLI name -> registry name
+BATCH_METHODS = {
+    't-test': 'T-Test',
+    'anova': 'ANOVA',
+    'tukey': 'Tukey’s HSD',
+    'games-howell': 'Games-Howell',
+    'bootstrap': 'Bootstrap',
+    'bayesian': 'Bayesian A/B',
+}
+# Methods that take a seed for their resampling
+SEEDED_METHODS = ('bootstrap',)
+
+RESULT_COLUMNS = ['experiment', 'metric', 'method', 'comparison', 'n_rows', 'n_groups',
+                  'statistic', 'p_value', 'observed_diff', 'prob_best', 'iterations', 'conclusion', 'error', 'seconds']
+_FLOAT_COLUMNS = ('statistic', 'p_value', 'observed_diff', 'seconds')
+
+
+class BatchTask:
+    __slots__ = ('index', 'experiment', 'metric', 'data')
+
+    def __init__(self, index, experiment, metric, data):
+        self.index = index
+        self.experiment = experiment
+        self.metric = metric
+        self.data = data
+
+
+def _result_rows(base, method, result):
+    if isinstance(result, str):
+        return [dict(base, method=method, error=result)]
+
+    if isinstance(result, tuple):
+        # Tukey's HSD / Games-Howell: one row per pairwise comparison
+        summary_df, fig = result
+        if fig is not None:
+            import matplotlib.pyplot as plt
+            plt.close(fig)
+        if isinstance(summary_df, str):
+            return [dict(base, method=method, error=summary_df)]
+        return [dict(base, method=method, comparison=f"{row['group1']} vs {row['group2']}",
+                     statistic=row['meandiff'], p_value=row['p-adj'],
+                     conclusion='reject' if row['reject'] else 'fail to reject')
+                for _, row in summary_df.iterrows()]
+
+    prob_best = result.get('prob_best')
+    return [dict(base, method=method,
+                 statistic=result.get('statistic'),
+                 p_value=result.get('p_value'),
+                 observed_diff=result.get('observed_diff'),
+                 iterations=result.get('iterations_used'),
+                 prob_best=json.dumps([round(float(p), 6) for p in prob_best]) if prob_best is not None else None,
+                 conclusion=result.get('conclusion'))]
+
+
+def run_task(task, methods, seed=None):
+    data = task.data
+    base = {'experiment': task.experiment, 'metric': task.metric,
+            'n_rows': len(data), 'n_groups': data.n_groups}
+    task_seed = None if seed is None else [seed, task.index]
+
+    rows = []
+    for key in methods:
+        spec = get_method(BATCH_METHODS[key])
+        name = spec.name
+        start = time.perf_counter()
+        if not spec.accepts(data.n_groups):
+            result = f"{name} is not applicable to {data.n_groups} groups."
+        else:
+            try:
+                kwargs = {'seed': task_seed} if key in SEEDED_METHODS else {}
+                result = spec.run(data, **kwargs)
+            except Exception as e:
+                result = f"{name} failed: {e}"
+        for row in _result_rows(base, name, result):
+            row['seconds'] = round(time.perf_counter() - start, 6)
+            rows.append(row)
+    return rows
+
+
+def _read_table(path, columns=None):
+    if file_format(path) != 'csv':
+        return to_frame(read_arrow(path, columns))
+    return pd.read_csv(path, usecols=columns)
+
+
+def iter_long_format(path, group_col, metrics=None, experiment_col=None, metric_col=None, value_col=None):
+    # Either wide metrics (one column per metric) or long metrics (metric name + value columns).
+    # Rows are grouped once per experiment; each (experiment, metric) pair becomes one task.
+    if metric_col is not None:
+        columns = [c for c in (experiment_col, group_col, metric_col, value_col) if c]
+    else:
+        columns = [c for c in (experiment_col, group_col) if c] + list(metrics or [])
+    df = _read_table(path, columns)
+
+    if metric_col is None and not metrics:
+        raise ValueError("Pass metric columns, or a metric/value column pair for long-format input.")
+
+    experiments = df.groupby(experiment_col, sort=False, observed=True) if experiment_col else [(os.path.basename(str(path)), df)]
+    for experiment, frame in experiments:
+        if metric_col is not None:
+            for metric, part in frame.groupby(metric_col, sort=False, observed=True):
+                yield experiment, metric, ExperimentData.from_frame(part, group_col, value_col)
+        else:
+            for metric in metrics:
+                yield experiment, metric, ExperimentData.from_frame(frame, group_col, metric)
+
+
+def iter_manifest(manifest_path):
+    # JSON list of {"path", "group_col", "metrics", optional "name" / "experiment_col"}
+    with open(manifest_path) as f:
+        entries = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    for entry in entries:
+        path = os.path.join(base_dir, entry['path'])
+        pairs = iter_long_format(path, entry['group_col'], entry.get('metrics'), entry.get('experiment_col'),
+                                 entry.get('metric_col'), entry.get('value_col'))
+        for experiment, metric, data in pairs:
+            # Single-experiment files are labelled by their manifest name when given
+            if not entry.get('experiment_col'):
+                experiment = entry.get('name', experiment)
+            yield experiment, metric, data
+
+
+class ResultWriter:
+    # Appends result rows to CSV or Parquet as they arrive
+    def __init__(self, path):
+        self.path = path
+        self.parquet = str(path).lower().endswith(('.parquet', '.pq'))
+        self._writer = None
+        self._file = None
+
+    def write(self, rows):
+        if not rows:
+            return
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            # Fixed schema so batches whose optional columns are all empty still line up
+            schema = pa.schema([(col, pa.float64() if col in _FLOAT_COLUMNS else
+                                 pa.int64() if col in ('n_rows', 'n_groups', 'iterations') else pa.string())
+                                for col in RESULT_COLUMNS])
+            frame = pd.DataFrame(rows, columns=RESULT_COLUMNS).astype({'experiment': str, 'metric': str})
+            table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, schema)
+            self._writer.write_table(table)
+        else:
+            if self._writer is None:
+                self._file = open(self.path, 'w', newline='', encoding='utf-8')
+                self._writer = csv.DictWriter(self._file, fieldnames=RESULT_COLUMNS)
+                self._writer.writeheader()
+            self._writer.writerows(rows)
+            self._file.flush()
+
+    def close(self):
+        if self.parquet and self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def _report(done, rows_in, started, stream):
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed if elapsed else 0.0
+    stream.write(f"\r{done} pairs done | {rate:,.1f} pairs/s | {rows_in / elapsed if elapsed else 0:,.0f} input rows/s")
+    stream.flush()
+
+
+def run_batch(tasks, output_path, methods=('t-test', 'anova', 'bayesian'), n_jobs=1, seed=None,
+              progress=sys.stderr, report_every=1.0):
+    # Runs every method on every (experiment, metric) pair and streams rows to output_path.
+    # Returns a throughput summary.
+    methods = list(methods)
+    unknown = [m for m in methods if m not in BATCH_METHODS]
+    if unknown:
+        raise ValueError(f"Unknown method(s): {', '.join(unknown)}")
+
+    writer = ResultWriter(output_path)
+    started = time.perf_counter()
+    last_report = started
+    done = rows_in = rows_out = 0
+    n_jobs = resolve_jobs(n_jobs)
+
+    def tick(rows, task_rows):
+        nonlocal done, rows_in, rows_out, last_report
+        writer.write(rows)
+        done += 1
+        rows_in += task_rows
+        rows_out += len(rows)
+        now = time.perf_counter()
+        if progress is not None and now - last_report >= report_every:
+            _report(done, rows_in, started, progress)
+            last_report = now
+
+    try:
+        tasks = (BatchTask(i, *t) for i, t in enumerate(tasks))
+        if n_jobs == 1:
+            for task in tasks:
+                tick(run_task(task, methods, seed), len(task.data))
+        else:
+            # Keep a bounded number of tasks in flight so input is not materialised all at once
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                pending = {}
+                for task in tasks:
+                    pending[pool.submit(run_task, task, methods, seed)] = len(task.data)
+                    if len(pending) >= 2 * n_jobs:
+                        finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for f in finished:
+                            tick(f.result(), pending.pop(f))
+                for f in list(pending):
+                    tick(f.result(), pending.pop(f))
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    if progress is not None:
+        _report(done, rows_in, started, progress)
+        progress.write("\n")
+    return {
+        'pairs': done,
+        'result_rows': rows_out,
+        'input_rows': rows_in,
+        'seconds': elapsed,
+        'pairs_per_second': done / elapsed if elapsed else float('inf'),
+    }
@@ -0,0 +1,120 @@
+# utils/cache.py
+
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 64
+_HASH_BLOCK = 1 << 20
+
+
+def value_size(value, _depth=0):
+    # Approximate bytes held by a value: frames by their column buffers (memory_usage with
+    # deep=False), arrays and bytes by their length, containers and slotted objects (e.g.
+    # ExperimentData) by their members
+    usage = getattr(value, 'memory_usage', None)
+    if callable(usage):
+        total = usage(deep=False)
+        return int(total.sum() if hasattr(total, 'sum') else total)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if _depth >= 4:
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sum(value_size(k, _depth + 1) + value_size(v, _depth + 1) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(value_size(v, _depth + 1) for v in value)
+    slots = getattr(type(value), '__slots__', None)
+    if slots and not isinstance(value, (str, int, float)):
+        return sum(value_size(getattr(value, name, None), _depth + 1) for name in slots)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    # Bounded mapping that evicts the least recently used entries when it holds more than
+    # maxsize entries or, with max_bytes, more than max_bytes of values (weighed by value_size).
+    # A value heavier than max_bytes on its own is not kept.
+    def __init__(self, maxsize=DEFAULT_MAX_ENTRIES, max_bytes=None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._weights = {}
+        self.total_bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def _pop(self, key):
+        del self._data[key]
+        self.total_bytes -= self._weights.pop(key)
+
+    def put(self, key, value):
+        weight = value_size(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            if self.max_bytes is not None and weight > self.max_bytes:
+                return
+            self._data[key] = value
+            self._weights[key] = weight
+            self.total_bytes += weight
+            while len(self._data) > self.maxsize or (self.max_bytes is not None and self.total_bytes > self.max_bytes):
+                self._pop(next(iter(self._data)))
+
+    def get_or_compute(self, key, compute):
+        _missing = object()
+        value = self.get(key, _missing)
+        if value is _missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._weights.clear()
+            self.total_bytes = 0
+
+
+def content_hash(data):
+    # Hash of raw bytes or of a seekable file-like object (read in blocks, then rewound)
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        digest.update(data)
+    else:
+        data.seek(0)
+        for block in iter(lambda: data.read(_HASH_BLOCK), b''):
+            digest.update(block)
+        data.seek(0)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path):
+    # Cheap identity for files on disk that may be too large to hash on every rerun
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def make_key(*parts, **params):
+    # Hashable cache key from positional parts plus keyword parameters in a stable order
+    return parts + tuple(sorted(params.items()))
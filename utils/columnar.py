@@ -0,0 +1,153 @@
+# utils/columnar.py
+
+import hashlib
+import os
+
+import pandas as pd
+
+from utils.instrumentation import instrumented
+
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+ARROW_EXTENSIONS = ('.feather', '.arrow', '.ipc')
+SUPPORTED_EXTENSIONS = ('.csv',) + PARQUET_EXTENSIONS + ARROW_EXTENSIONS
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'columnar')
+
+
+def file_format(source):
+    # 'parquet', 'arrow' (Feather v2 / Arrow IPC) or 'csv', from the file name
+    name = str(getattr(source, 'name', source)).lower()
+    if name.endswith(PARQUET_EXTENSIONS):
+        return 'parquet'
+    if name.endswith(ARROW_EXTENSIONS):
+        return 'arrow'
+    return 'csv'
+
+
+def _arrow_source(source):
+    # Paths are memory-mapped; uploaded files are wrapped without copying their bytes
+    import pyarrow as pa
+
+    if isinstance(source, (str, os.PathLike)):
+        return pa.memory_map(str(source), 'r')
+    if hasattr(source, 'getbuffer'):
+        return pa.BufferReader(pa.py_buffer(source.getbuffer()))
+    source.seek(0)
+    return pa.BufferReader(source.read())
+
+
+def read_schema(source):
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+
+    if file_format(source) == 'parquet':
+        return pq.read_schema(_arrow_source(source))
+    return ipc.open_file(_arrow_source(source)).schema
+
+
+def analysis_columns(schema):
+    # Columns a test can use as a group or a metric; nested, binary and temporal columns are skipped
+    import pyarrow.types as pat
+
+    usable = (pat.is_string, pat.is_large_string, pat.is_dictionary, pat.is_boolean, pat.is_integer,
+              pat.is_floating)
+    return [field.name for field in schema if any(check(field.type) for check in usable)]
+
+
+def encode_groups(table):
+    # Dictionary-encode string columns so they arrive in pandas as categoricals
+    import pyarrow.compute as pc
+    import pyarrow.types as pat
+
+    for i, field in enumerate(table.schema):
+        if pat.is_string(field.type) or pat.is_large_string(field.type):
+            table = table.set_column(i, field.name, pc.dictionary_encode(table.column(i)))
+    return table
+
+
+def read_arrow(source, columns=None):
+    # Parquet or Arrow IPC as a pyarrow Table, reading only the requested columns
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    if file_format(source) == 'parquet':
+        return pq.read_table(_arrow_source(source), columns=columns)
+    return feather.read_table(_arrow_source(source), columns=columns, memory_map=True)
+
+
+def iter_batches(source, columns, batch_size):
+    # Record batches of the projected columns, for chunked passes over large files
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+
+    if file_format(source) == 'parquet':
+        yield from pq.ParquetFile(_arrow_source(source)).iter_batches(batch_size=batch_size, columns=columns)
+        return
+    reader = ipc.open_file(_arrow_source(source))
+    for i in range(reader.num_record_batches):
+        yield reader.get_batch(i).select(columns)
+
+
+def to_frame(table):
+    # Numeric columns keep their stored width (float32 stays float32); groups become categoricals
+    return encode_groups(table).to_pandas(split_blocks=True)
+
+
+def categorize(df):
+    # Object columns with repeated values become categoricals (CSV has no dictionary encoding)
+    for col in df.columns[df.dtypes == object]:
+        encoded = df[col].astype('category')
+        if len(encoded.cat.categories) <= len(df) // 2:
+            df[col] = encoded
+    return df
+
+
+def _read_csv_arrow(source):
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    try:
+        return pa_csv.read_csv(_arrow_source(source))
+    except pa.ArrowInvalid:
+        # Columns whose type changes part-way through the file: let pandas infer them
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return pa.Table.from_pandas(pd.read_csv(source), preserve_index=False)
+
+
+def cached_columnar_path(cache_key, cache_dir=DEFAULT_CACHE_DIR):
+    name = hashlib.blake2b(str(cache_key).encode(), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, f"{name}.arrow")
+
+
+def cache_as_columnar(source, cache_key, cache_dir=DEFAULT_CACHE_DIR):
+    # Parses a CSV once into an uncompressed Arrow file that later sessions memory-map.
+    # Returns the cached path.
+    import pyarrow.feather as feather
+
+    path = cached_columnar_path(cache_key, cache_dir)
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        table = encode_groups(_read_csv_arrow(source))
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+    return path
+
+
+@instrumented('load')
+def load_table(source, columns=None, cache_key=None, cache_dir=DEFAULT_CACHE_DIR):
+    # DataFrame from a CSV, Parquet or Arrow/Feather path or uploaded file.
+    # Columnar files are projected to `columns` (default: every column a test could use).
+    # A CSV with a cache_key is converted once into a cached Arrow file and read from there.
+    fmt = file_format(source)
+    if fmt == 'csv' and cache_key is not None:
+        source = cache_as_columnar(source, cache_key, cache_dir)
+        fmt = 'arrow'
+    if fmt == 'csv':
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return categorize(pd.read_csv(source, usecols=columns))
+
+    if columns is None:
+        columns = analysis_columns(read_schema(source))
+    return to_frame(read_arrow(source, columns))
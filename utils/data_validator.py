@@ -1,11 +1,21 @@
+import numpy as np
 import pandas as pd
 
+from utils.instrumentation import instrumented
+
+@instrumented('validate')
 def validate_csv(df):
+    # Accepts a DataFrame, or a CSV / Parquet / Arrow path or file object
+    if not isinstance(df, pd.DataFrame):
+        from utils.columnar import load_table
+        df = load_table(df)
+
     # Clean column names
     df.columns = [col.lower().strip() for col in df.columns]
 
     # Try identifying group and metric columns
-    group_suggestions, metric_suggestions = suggest_group_and_metric_columns(df)
+    profile = profile_columns(df)
+    group_suggestions, metric_suggestions = profile['groups'], profile['metrics']
 
     if not group_suggestions:
         return False, "❌ No suitable group column found. Please include at least one categorical column with 2–10 unique values."
@@ -16,70 +26,132 @@ def validate_csv(df):
     group_col = group_suggestions[0]
     metric_col = metric_suggestions[0]
 
-    # Drop missing values
-    df = df.dropna(subset=[group_col, metric_col])
+    # Drop missing values (only copy the frame when something is actually missing)
+    present = df[group_col].notna() & df[metric_col].notna()
+    if not present.all():
+        df = df[present]
 
-    try:
-        df[metric_col] = pd.to_numeric(df[metric_col])
-    except ValueError:
-        return False, f"❌ Column '{metric_col}' must be numeric."
+    if not pd.api.types.is_numeric_dtype(df[metric_col]):
+        try:
+            df[metric_col] = pd.to_numeric(df[metric_col])
+        except ValueError:
+            return False, f"❌ Column '{metric_col}' must be numeric."
 
     if df[group_col].nunique() < 2:
         return False, "❌ Need at least 2 unique groups for A/B testing."
 
-    # Rename to standard columns for internal consistency
-    df = df.rename(columns={group_col: 'group', metric_col: 'value'})
+    # Rename to standard columns for internal consistency (relabels in place, no data copy)
+    rename = {group_col: 'group', metric_col: 'value'}
+    df.columns = [rename.get(col, col) for col in df.columns]
 
-    return True, df
+    # Keep the profile with the frame so the app does not profile it a second time
+    # (only when no rows were dropped, since that can change distinct counts)
+    if present.all():
+        df.attrs['column_profile'] = {
+            'columns': tuple(df.columns), 'n_rows': len(df),
+            'groups': [rename.get(col, col) for col in group_suggestions],
+            'metrics': [rename.get(col, col) for col in metric_suggestions],
+        }
 
-def suggest_group_and_metric_columns(df):
-    possible_groups = []
-    possible_metrics = []
+    return True, df
 
+# Thresholds for column suggestions: a group has 2-10 distinct values, a metric more than 5
+GROUP_MIN_UNIQUE = 2
+GROUP_MAX_UNIQUE = 10
+METRIC_MIN_UNIQUE = 5
+SEGMENT_MAX_UNIQUE = 50
+PROFILE_SAMPLE_ROWS = 20_000
+_SCAN_BLOCK = 65_536
+
+
+def _count_distinct(values, limit):
+    # Exact distinct count of non-missing values, scanned in blocks and stopped as soon
+    # as it passes limit (so the result is capped at limit + 1)
+    seen = set()
+    for start in range(0, len(values), _SCAN_BLOCK):
+        uniques = pd.unique(values[start:start + _SCAN_BLOCK])
+        seen.update(uniques[~pd.isna(uniques)].tolist())
+        if len(seen) > limit:
+            break
+    return min(len(seen), limit + 1)
+
+
+def _distinct_in_range(series, low, high, sample):
+    # Whether the number of distinct values lies in [low, high]. A random sample can only
+    # under-count, so it settles columns that already exceed high (or reach low when there
+    # is no upper bound); every other column gets the exact, early-stopping scan.
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Dictionary-encoded: the category list bounds the count, codes give it exactly
+        if len(series.cat.categories) < low:
+            return False
+        codes = series.cat.codes.to_numpy()
+        present = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+        count = int(np.count_nonzero(present))
+        return low <= count and (high is None or count <= high)
+
+    values = series.to_numpy()
+    limit = high if high is not None else low
+    if sample is not None:
+        seen = _count_distinct(values[sample], limit)
+        if high is not None and seen > high:
+            return False
+        if high is None and seen >= low:
+            return True
+    count = _count_distinct(values, limit)
+    return low <= count and (high is None or count <= high)
+
+
+def _is_group_dtype(dtype):
+    return (pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)
+            or isinstance(dtype, pd.CategoricalDtype))
+
+
+def profile_columns(df, sample_rows=PROFILE_SAMPLE_ROWS, seed=0):
+    # Group and metric candidates for every column of df
+    n = len(df)
+    sample = None
+    if n > sample_rows:
+        sample = np.random.default_rng(seed).integers(0, n, sample_rows)
+
+    groups, metrics = [], []
     for col in df.columns:
-        if df[col].dtype == 'object' or pd.api.types.is_categorical_dtype(df[col]):
-            unique_vals = df[col].nunique()
-            if 2 <= unique_vals <= 10:
-                possible_groups.append(col)
-
-        elif pd.api.types.is_numeric_dtype(df[col]):
-            if df[col].nunique() > 5:
-                possible_metrics.append(col)
+        series = df[col]
+        if _is_group_dtype(series.dtype):
+            if _distinct_in_range(series, GROUP_MIN_UNIQUE, GROUP_MAX_UNIQUE, sample):
+                groups.append(col)
+        elif pd.api.types.is_numeric_dtype(series.dtype):
+            # "more than 5 distinct values" is a lower bound only
+            if _distinct_in_range(series, METRIC_MIN_UNIQUE + 1, None, sample):
+                metrics.append(col)
 
-    return possible_groups, possible_metrics
+    return {'columns': tuple(df.columns), 'n_rows': n, 'groups': groups, 'metrics': metrics}
 
 
+def segment_columns(df, max_unique=SEGMENT_MAX_UNIQUE, sample_rows=PROFILE_SAMPLE_ROWS, seed=0, exclude=()):
+    # Columns with at most max_unique distinct values, usable as segment breakdowns, other than
+    # those in exclude (the group and metric columns). Same sampling and early-stopping scans
+    # as profile_columns, so wide-cardinality columns are ruled out from the sample alone.
+    n = len(df)
+    sample = np.random.default_rng(seed).integers(0, n, sample_rows) if n > sample_rows else None
+    return [col for col in df.columns
+            if col not in exclude and _distinct_in_range(df[col], 1, max_unique, sample)]
 
-# 💡 New Feature: LLM-Powered Column Suggestion
 
-def suggest_columns_with_llm(df, openai_client):
-    try:
-        from openai import OpenAI
-        client = openai_client
-
-        prompt = f"""
-        You are a data analyst helping with A/B testing.
-
-        Here is the dataset summary:
-        {df.describe(include='all').to_string()}
+@instrumented('profile')
+def suggest_group_and_metric_columns(df):
+    # Reuses the profile attached by validate_csv while the frame still has the same shape
+    profile = df.attrs.get('column_profile')
+    if profile is None or profile['columns'] != tuple(df.columns) or profile['n_rows'] != len(df):
+        profile = profile_columns(df)
+    return list(profile['groups']), list(profile['metrics'])
 
-        Head of the dataset:
-        {df.head(3).to_string()}
 
-        Based on this, suggest one GROUP column and one METRIC (value) column for A/B testing. Explain briefly why you chose them.
-        """
 
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful A/B testing assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3
-        )
+# 💡 New Feature: LLM-Powered Column Suggestion
 
-        suggestion = response.choices[0].message.content.strip()
-        return suggestion
+def suggest_columns_with_llm(df, openai_client):
+    # Compact sampled profile, cached per schema, with a timeout and a local fallback
+    # (see utils/llm_suggest.suggest_columns)
+    from utils.llm_suggest import suggest_columns
 
-    except Exception as e:
-        return f"LLM suggestion failed: {e}"
+    return suggest_columns(df, openai_client)['text']
@@ -0,0 +1,88 @@
+# utils/experiment_data.py
+
+import numpy as np
+import pandas as pd
+
+from utils.group_stats import GroupStats
+from utils.instrumentation import instrumented
+
+
+class ExperimentData:
+    # Compact, group-sorted view of a (group, value) dataset.
+    # Rows of group i live in values[offsets[i]:offsets[i + 1]], so per-group
+    # access is a zero-copy slice instead of a boolean mask over the frame.
+    __slots__ = ('labels', 'values', 'offsets', '_stats')
+
+    def __init__(self, labels, values, offsets):
+        self.labels = np.asarray(labels, dtype=object)
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self._stats = None
+
+    @classmethod
+    @instrumented('prepare')
+    def from_frame(cls, df, group_col='group', value_col='value'):
+        # Groups keep their order of first appearance, matching df[group_col].unique()
+        codes, labels = pd.factorize(df[group_col], sort=False)
+        values = pd.to_numeric(df[value_col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+        keep = (codes >= 0) & ~np.isnan(values)
+        if not keep.all():
+            codes, values = codes[keep], values[keep]
+
+        # Drop labels that lost all their rows to missing values
+        counts = np.bincount(codes, minlength=len(labels))
+        if (counts == 0).any():
+            present = np.flatnonzero(counts)
+            remap = np.full(len(labels), -1, dtype=np.int64)
+            remap[present] = np.arange(len(present))
+            codes, labels, counts = remap[codes], labels[present], counts[present]
+
+        order = np.argsort(codes, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        return cls(np.asarray(labels), values[order], offsets)
+
+    @classmethod
+    def from_groups(cls, groups):
+        # Build from a {label: array-like} mapping
+        labels = list(groups)
+        arrays = [np.asarray(groups[g], dtype=np.float64) for g in labels]
+        offsets = np.concatenate([[0], np.cumsum([len(a) for a in arrays])])
+        values = np.concatenate(arrays) if arrays else np.empty(0)
+        return cls(labels, values, offsets)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def n_groups(self):
+        return len(self.labels)
+
+    @property
+    def counts(self):
+        return np.diff(self.offsets)
+
+    @property
+    def codes(self):
+        return np.repeat(np.arange(self.n_groups, dtype=np.int32), self.counts)
+
+    def group(self, i):
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+    def groups(self):
+        return [self.group(i) for i in range(self.n_groups)]
+
+    def stats(self):
+        # Per-group moments, computed on first use and reused by every parametric method
+        if self._stats is None:
+            self._stats = GroupStats.from_sorted(self.labels, self.values, self.offsets)
+        return self._stats
+
+    def to_frame(self):
+        return pd.DataFrame({'group': np.repeat(self.labels, self.counts), 'value': self.values})
+
+
+def as_experiment_data(data, group_col='group', value_col='value'):
+    if isinstance(data, ExperimentData):
+        return data
+    return ExperimentData.from_frame(data, group_col, value_col)
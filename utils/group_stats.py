@@ -0,0 +1,92 @@
+# utils/group_stats.py
+
+import numpy as np
+
+
+class GroupStats:
+    # Per-group sufficient statistics: count, mean and M2 (sum of squared
+    # deviations from the mean). Everything the parametric methods need.
+    __slots__ = ('labels', 'n', 'mean', 'm2')
+
+    def __init__(self, labels, n, mean, m2):
+        self.labels = np.asarray(labels, dtype=object)
+        self.n = np.asarray(n, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.m2 = np.asarray(m2, dtype=np.float64)
+
+    @classmethod
+    def from_sorted(cls, labels, values, offsets):
+        # Values are contiguous per group, so each moment is a single reduceat.
+        # Deviations are taken from the group mean (centered), which keeps the
+        # variance accurate for large offsets where sum-of-squares cancels.
+        counts = np.diff(offsets)
+        if len(values) == 0:
+            return cls(labels, counts, np.full(len(counts), np.nan), np.zeros(len(counts)))
+        starts = offsets[:-1]
+        mean = np.add.reduceat(values, starts) / counts
+        centered = values - np.repeat(mean, counts)
+        m2 = np.add.reduceat(centered * centered, starts)
+        return cls(labels, counts, mean, m2)
+
+    @classmethod
+    def from_moments(cls, labels, n, mean, std, ddof=1):
+        n = np.asarray(n, dtype=np.float64)
+        std = np.asarray(std, dtype=np.float64)
+        return cls(labels, n, mean, std ** 2 * (n - ddof))
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def n_groups(self):
+        return len(self.labels)
+
+    @property
+    def total(self):
+        return self.n * self.mean
+
+    @property
+    def var(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.m2 / (self.n - 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    def merge(self, other):
+        # Combine two partial summaries group by group (Chan et al. parallel update)
+        labels = list(self.labels)
+        index = {label: i for i, label in enumerate(labels)}
+        for label in other.labels:
+            if label not in index:
+                index[label] = len(labels)
+                labels.append(label)
+
+        k = len(labels)
+        n, mean, m2 = np.zeros(k), np.zeros(k), np.zeros(k)
+        pos = np.array([index[label] for label in self.labels], dtype=np.int64)
+        n[pos], mean[pos], m2[pos] = self.n, self.mean, self.m2
+
+        pos = np.array([index[label] for label in other.labels], dtype=np.int64)
+        n_b, mean_b, m2_b = other.n, other.mean, other.m2
+        n_a, mean_a, m2_a = n[pos], mean[pos], m2[pos]
+        n_ab = n_a + n_b
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delta = mean_b - mean_a
+            mean[pos] = np.where(n_ab > 0, mean_a + delta * n_b / n_ab, 0.0)
+            m2[pos] = np.where(n_ab > 0, m2_a + m2_b + delta * delta * n_a * n_b / n_ab, 0.0)
+        n[pos] = n_ab
+        return GroupStats(labels, n, mean, m2)
+
+    def take(self, indices):
+        indices = np.asarray(indices, dtype=np.int64)
+        return GroupStats(self.labels[indices], self.n[indices], self.mean[indices], self.m2[indices])
+
+
+def as_group_stats(data, group_col='group', value_col='value'):
+    if isinstance(data, GroupStats):
+        return data
+
+    from utils.experiment_data import as_experiment_data
+    return as_experiment_data(data, group_col, value_col).stats()
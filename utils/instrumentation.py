@@ -0,0 +1,192 @@
+# utils/instrumentation.py
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import deque
+
+DEFAULT_MAX_RECORDS = 500
+DEFAULT_PROFILE_DIR = os.path.join('.cache', 'profiles')
+
+# Recorder that stage() reports to in the current context; None (the default) makes stage() a no-op
+_active = contextvars.ContextVar('ab_testing_recorder', default=None)
+
+# tracemalloc is process-wide: recorders hold it with a token each, and it stops when the last
+# holder lets go (only if a holder started it, not e.g. python -X tracemalloc)
+_tracing_lock = threading.Lock()
+_tracing_holders = set()
+_tracing_owned = False
+
+
+def _hold_tracing(token):
+    global _tracing_owned
+    with _tracing_lock:
+        if not _tracing_holders and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_holders.add(token)
+
+
+def _release_tracing(token):
+    global _tracing_owned
+    with _tracing_lock:
+        _tracing_holders.discard(token)
+        if not _tracing_holders and _tracing_owned:
+            _tracing_owned = False
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+
+class Recorder:
+    # Wall time, CPU time and peak traced allocation per pipeline stage. Stages nest (a load inside
+    # validation); each record carries its depth. CPU time is that of the calling thread, so work
+    # farmed out to worker processes shows up as wall time only. Peaks come from tracemalloc, which
+    # is process-wide: concurrent stages in other threads add to each other's peaks.
+    def __init__(self, trace_memory=False, stream=None, max_records=DEFAULT_MAX_RECORDS):
+        self.trace_memory = trace_memory
+        # Each record is also written there as one JSON line (structured logs for headless runs)
+        self.stream = stream
+        self.records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._tracing = None
+
+    @contextlib.contextmanager
+    def stage(self, name, **fields):
+        stack = self._local.__dict__.setdefault('stack', [])
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        frame = {'base': 0, 'max': 0}
+        if tracing:
+            # The enclosing stage keeps the peak reached so far before it is reset for this one
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]['max'] = max(stack[-1]['max'], peak)
+            tracemalloc.reset_peak()
+            frame['base'] = current
+        stack.append(frame)
+        start, start_cpu = time.perf_counter(), time.thread_time()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            wall, cpu = time.perf_counter() - start, time.thread_time() - start_cpu
+            stack.pop()
+            record = {'stage': name, 'wall_s': round(wall, 6), 'cpu_s': round(cpu, 6), 'peak_mb': None,
+                      'depth': len(stack), 'thread': threading.current_thread().name, 'time': time.time(), **fields}
+            if tracing and tracemalloc.is_tracing():
+                peak = max(tracemalloc.get_traced_memory()[1], frame['max'])
+                record['peak_mb'] = round((peak - frame['base']) / 2 ** 20, 3)
+                if stack:
+                    stack[-1]['max'] = max(stack[-1]['max'], peak)
+            if error:
+                record['error'] = error
+            self._emit(record)
+
+    def call(self, name, fn, *args, **kwargs):
+        with self.stage(name):
+            return fn(*args, **kwargs)
+
+    def _emit(self, record):
+        with self._lock:
+            self.records.append(record)
+            if self.stream is not None:
+                self.stream.write(json.dumps(record, default=str) + '\n')
+                self.stream.flush()
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+    def start_tracing(self):
+        # Holds memory tracing for this recorder (no-op without trace_memory or when already held).
+        # The hold is released by stop_tracing() or when the recorder is garbage collected.
+        if self.trace_memory and self._tracing is None:
+            token = object()
+            _hold_tracing(token)
+            self._tracing = weakref.finalize(self, _release_tracing, token)
+
+    def stop_tracing(self):
+        if self._tracing is not None:
+            self._tracing()
+            self._tracing = None
+
+    @contextlib.contextmanager
+    def activate(self):
+        # Route stage() calls in this context (and jobs submitted from it) to this recorder
+        held = self._tracing is not None
+        self.start_tracing()
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+            if not held:
+                self.stop_tracing()
+
+
+def active_recorder():
+    return _active.get()
+
+
+def set_active_recorder(recorder):
+    # For callers that cannot wrap their work in activate(), e.g. a Streamlit script run.
+    # Memory tracing is held here until recorder.stop_tracing().
+    if recorder is not None:
+        recorder.start_tracing()
+    _active.set(recorder)
+
+
+def stage(name, **fields):
+    # Instrumentation point for library code: records into the active recorder, if any
+    recorder = _active.get()
+    return recorder.stage(name, **fields) if recorder is not None else contextlib.nullcontext()
+
+
+def instrumented(name):
+    # Decorator form of stage() for whole functions
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            recorder = _active.get()
+            if recorder is None:
+                return fn(*args, **kwargs)
+            with recorder.stage(name, function=fn.__name__):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextlib.contextmanager
+def profiled(directory=DEFAULT_PROFILE_DIR, name='run', paths=None):
+    # Profiling hook for a single run: cProfile statistics (.prof, readable with pstats or snakeviz)
+    # and a tracemalloc snapshot (.tracemalloc, tracemalloc.Snapshot.load) of what is still
+    # allocated at the end. The written paths are appended to `paths` when given.
+    import cProfile
+
+    os.makedirs(directory, exist_ok=True)
+    prefix = os.path.join(directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(25)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        if started:
+            tracemalloc.stop()
+        profiler.dump_stats(f"{prefix}.prof")
+        snapshot.dump(f"{prefix}.tracemalloc")
+        if paths is not None:
+            paths.extend([f"{prefix}.prof", f"{prefix}.tracemalloc"])
@@ -0,0 +1,98 @@
+# utils/jobs.py
+
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.result_store import store_key
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_FINISHED = 64
+
+
+class Job:
+    # One background computation. compute(report) receives `report`, a callback that
+    # publishes partial progress (e.g. the running p-value) for the UI to poll.
+    __slots__ = ('id', 'label', 'future', 'submitted', '_progress', '_lock')
+
+    def __init__(self, job_id, label=''):
+        self.id = job_id
+        self.label = label
+        self.future = None
+        self.submitted = time.time()
+        self._progress = {}
+        self._lock = threading.Lock()
+
+    def report(self, **progress):
+        with self._lock:
+            self._progress.update(progress)
+
+    @property
+    def progress(self):
+        with self._lock:
+            return dict(self._progress)
+
+    @property
+    def state(self):
+        if self.future.cancelled():
+            return 'cancelled'
+        if not self.future.done():
+            return 'running' if self.future.running() else 'queued'
+        return 'failed' if self.future.exception() is not None else 'done'
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+
+class JobExecutor:
+    # Thread pool for computations that should outlive a single Streamlit script run: a rerun
+    # triggered by a widget only re-reads the job, it does not restart it. Job ids are derived
+    # from the job key, so submitting an identical job returns the one already queued, running
+    # or finished. Failed jobs are retried on the next submission.
+    def __init__(self, max_workers=DEFAULT_WORKERS, max_finished=DEFAULT_MAX_FINISHED):
+        self.max_finished = max_finished
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ab-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, key, compute, label=''):
+        job_id = store_key(key)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.state not in ('failed', 'cancelled'):
+                return job
+            job = Job(job_id, label)
+            # The job runs in the submitter's context, so it reports to the same recorder
+            job.future = self._pool.submit(contextvars.copy_context().run, compute, job.report)
+            self._jobs[job_id] = job
+            self._prune()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def discard(self, job_id):
+        # Forget a finished job, so that the next submission of its key runs again
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.done():
+                del self._jobs[job_id]
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _prune(self):
+        # Forget the oldest finished jobs; running ones are always kept
+        finished = [job_id for job_id, job in self._jobs.items() if job.done()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
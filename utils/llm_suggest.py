@@ -0,0 +1,186 @@
+# utils/llm_suggest.py
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import LRUCache
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+DEFAULT_TIMEOUT = 20.0
+# Bounds on the profile sent to the model, whatever the size of the data
+PROFILE_SAMPLE_ROWS = 2_000
+MAX_PROFILE_COLUMNS = 40
+MAX_LEVELS = 8
+MAX_NAME_CHARS = 60
+MAX_LABEL_CHARS = 30
+
+SYSTEM_PROMPT = "You are a helpful A/B testing assistant."
+PROMPT = """You are a data analyst helping with A/B testing.
+
+Columns of the dataset ({n_rows:,} rows; statistics from a sample of {sample_rows:,} rows):
+{columns}
+
+Based on this, suggest one GROUP column and one METRIC (value) column for A/B testing. Explain briefly why you chose them."""
+
+_answers = LRUCache(maxsize=256)
+_pool = None
+
+
+def schema_fingerprint(df):
+    # Column names and dtypes only: datasets with the same layout share one suggestion
+    schema = [[str(col), str(dtype)] for col, dtype in df.dtypes.items()]
+    return hashlib.blake2b(json.dumps(schema).encode(), digest_size=16).hexdigest()
+
+
+def _number(value):
+    return float(f"{value:.4g}")
+
+
+def schema_profile(df, sample_rows=PROFILE_SAMPLE_ROWS, max_columns=MAX_PROFILE_COLUMNS, seed=0):
+    # Compact description of each column from a row sample: dtype, missing share, distinct
+    # count and either a numeric range or the most frequent values
+    n = len(df)
+    sample = df
+    if n > sample_rows:
+        sample = df.iloc[np.sort(np.random.default_rng(seed).integers(0, n, sample_rows))]
+
+    columns = []
+    for col in list(df.columns)[:max_columns]:
+        series = sample[col]
+        entry = {'name': str(col)[:MAX_NAME_CHARS], 'dtype': str(series.dtype),
+                 'missing': round(float(series.isna().mean()), 3) if len(series) else 0.0,
+                 'distinct': int(series.nunique(dropna=True))}
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            values = series.dropna()
+            if len(values):
+                entry.update(min=_number(values.min()), mean=_number(values.mean()), max=_number(values.max()))
+        else:
+            top = series.value_counts(dropna=True).head(MAX_LEVELS)
+            entry['top'] = [str(value)[:MAX_LABEL_CHARS] for value in top.index]
+        columns.append(entry)
+    return {'n_rows': n, 'sample_rows': len(sample), 'columns': columns,
+            'omitted_columns': max(0, len(df.columns) - max_columns)}
+
+
+def profile_text(profile):
+    lines = []
+    for c in profile['columns']:
+        line = f"- {c['name']} ({c['dtype']}, {c['distinct']} distinct, {c['missing']:.0%} missing)"
+        if 'top' in c:
+            line += ": " + ", ".join(c['top'])
+        elif 'mean' in c:
+            line += f": min {c['min']:g}, mean {c['mean']:g}, max {c['max']:g}"
+        lines.append(line)
+    if profile['omitted_columns']:
+        lines.append(f"- ... and {profile['omitted_columns']} more columns")
+    return "\n".join(lines)
+
+
+def heuristic_suggester(df, profile):
+    # Offline stand-in: the rules validate_csv uses to pick its default columns
+    from utils.data_validator import suggest_group_and_metric_columns
+
+    groups, metrics = suggest_group_and_metric_columns(df)
+    if not groups or not metrics:
+        return ("No column looks like both a group (2-10 categories) and a metric "
+                "(numeric, more than 5 distinct values).")
+    text = (f"Group column: **{groups[0]}** (categorical with 2-10 levels). "
+            f"Metric column: **{metrics[0]}** (numeric with many distinct values).")
+    others = [col for col in groups[1:] + metrics[1:]]
+    if others:
+        text += f" Other candidates: {', '.join(map(str, others[:6]))}."
+    return text
+
+
+# Local or offline suggesters by name; each takes (df, profile) and returns the suggestion text
+LOCAL_SUGGESTERS = {'heuristic': heuristic_suggester}
+
+
+def register_suggester(name, suggester):
+    LOCAL_SUGGESTERS[name] = suggester
+    return suggester
+
+
+def local_suggestion(df, reason, fallback='heuristic', profile=None):
+    # Answer from a local suggester (a LOCAL_SUGGESTERS name or a callable), noting why it was used
+    name = fallback if isinstance(fallback, str) else getattr(fallback, '__name__', 'local')
+    local = LOCAL_SUGGESTERS[fallback] if isinstance(fallback, str) else fallback
+    text = local(df, schema_profile(df) if profile is None else profile)
+    return {'text': f"{text}\n\n_Local suggestion ({name}): {reason}._", 'source': name,
+            'fingerprint': schema_fingerprint(df)}
+
+
+def openai_client(api_key=None, timeout=DEFAULT_TIMEOUT):
+    # None when no key is configured or the openai package is not installed
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    try:
+        from openai import OpenAI
+    except ImportError:
+        return None
+    return OpenAI(api_key=api_key, timeout=timeout)
+
+
+def _ask_model(client, profile, model, timeout):
+    prompt = PROMPT.format(n_rows=profile['n_rows'], sample_rows=profile['sample_rows'],
+                           columns=profile_text(profile))
+    response = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        timeout=timeout,
+    )
+    return response.choices[0].message.content.strip()
+
+
+def _executor():
+    # Requests run here so that a hung call never blocks the caller past its timeout
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='ab-llm')
+    return _pool
+
+
+def suggest_columns(df, client=None, model=DEFAULT_MODEL, timeout=DEFAULT_TIMEOUT, fallback='heuristic', store=None):
+    # Group/metric suggestion for df. Returns {'text', 'source', 'fingerprint'}, where source is
+    # 'llm', 'cache' or the name of the local suggester that answered.
+    # Model answers are cached by schema fingerprint (in memory, and in `store`, a ResultStore,
+    # when given), so a schema seen before never reaches the model again. Without a client, or
+    # when the request fails or takes longer than `timeout` seconds, the local suggester answers.
+    fingerprint = schema_fingerprint(df)
+    key = ('llm_suggestion', model, fingerprint)
+
+    text = _answers.get(key)
+    if text is None and store is not None:
+        text = store.get(key)
+        if text is not None:
+            _answers.put(key, text)
+    if text is not None:
+        return {'text': text, 'source': 'cache', 'fingerprint': fingerprint}
+
+    profile = schema_profile(df)
+    reason = "no OpenAI API key configured"
+    if client is not None:
+        future = _executor().submit(_ask_model, client, profile, model, timeout)
+        try:
+            text = future.result(timeout=timeout)
+        except FutureTimeout:
+            reason = f"the model did not answer within {timeout:g}s"
+        except Exception as e:
+            reason = f"the request failed: {e}"
+        else:
+            _answers.put(key, text)
+            if store is not None:
+                store.put(key, text, label='llm_suggestion')
+            return {'text': text, 'source': 'llm', 'fingerprint': fingerprint}
+
+    return local_suggestion(df, reason, fallback, profile)
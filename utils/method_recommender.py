@@ -1,11 +1,16 @@
 # utils/method_recommender.py
 
-def suggest_methods(df):
-    group_count = df['group'].nunique()
+from methods.registry import available_methods
+from utils.experiment_data import ExperimentData
+from utils.group_stats import GroupStats
+
+def suggest_methods(df, input=None):
+    # A GroupStats on its own (e.g. from a pre-aggregated table) only supports methods that run on
+    # per-group moments; pass input='rows' when the row-level values are available too
+    if input is None:
+        input = 'summary' if isinstance(df, GroupStats) else 'rows'
+    group_count = df.n_groups if isinstance(df, (ExperimentData, GroupStats)) else df['group'].nunique()
     
-    if group_count == 2:
-        return ['T-Test', 'Bootstrap', 'Bayesian A/B']
-    elif group_count > 2:
-        return ['ANOVA', 'Tukey’s HSD', 'Bootstrap']
-    else:
+    if group_count < 2:
         return []
+    return available_methods(group_count, input)
@@ -1,19 +1,170 @@
 # utils/pdf_export.py
 
 from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.pdfgen import canvas
 import io
+import zlib
 
+from utils.instrumentation import instrumented
+
+MARGIN = 40
+LINE_HEIGHT = 20
+FONT_SIZE = 12
+
+@instrumented('pdf')
 def generate_pdf(summary, filename="combined_ab_summary.pdf"):
+    # Long lines wrap to the page width and a new page starts when the current one is full
     buffer = io.BytesIO()
     c = canvas.Canvas(buffer, pagesize=letter)
     width, height = letter
-    y = height - 40
+    c.setFont('Helvetica', FONT_SIZE)
+    y = height - MARGIN
 
     for line in summary.split('\n'):
-        c.drawString(40, y, line)
-        y -= 20
+        for part in simpleSplit(line, 'Helvetica', FONT_SIZE, width - 2 * MARGIN) or ['']:
+            if y < MARGIN:
+                c.showPage()
+                c.setFont('Helvetica', FONT_SIZE)
+                y = height - MARGIN
+            c.drawString(MARGIN, y, part)
+            y -= LINE_HEIGHT
 
     c.save()
     buffer.seek(0)
     return buffer
+
+
+# ========================
+# Streamed PDF output
+# ========================
+# reportlab keeps a whole document in memory until save(). For reports over hundreds of
+# experiments, PdfStreamWriter writes each object to disk as soon as it is complete (image
+# XObjects on arrival, a page's content stream when the page is finished), keeping only the
+# byte offsets needed for the cross-reference table.
+FONTS = {'regular': ('F1', 'Helvetica'), 'bold': ('F2', 'Helvetica-Bold')}
+
+
+def _pdf_text(text):
+    # Standard fonts use WinAnsi: characters outside it (e.g. emojis) are dropped
+    raw = str(text).encode('cp1252', errors='ignore')
+    return raw.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)').replace(b'\r', b'').replace(b'\n', b' ')
+
+
+def text_width(text, size, style='regular'):
+    return stringWidth(str(text).encode('cp1252', errors='ignore').decode('cp1252'), FONTS[style][1], size)
+
+
+def fit_text(text, width, size, style='regular'):
+    # Truncates text with an ellipsis so that it fits in width points
+    text = str(text)
+    if text_width(text, size, style) <= width:
+        return text
+    while text and text_width(text + '...', size, style) > width:
+        text = text[:-1]
+    return text + '...'
+
+
+class PdfStreamWriter:
+    def __init__(self, path, pagesize=letter):
+        self.path = path
+        self.width, self.height = pagesize
+        self._file = open(path, 'wb')
+        self._offsets = {}
+        self._next_id = 3
+        self._page_ids = []
+        self._content = None
+        self._images = {}
+        self._file.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self._font_ids = {}
+        for style, (_, base_font) in FONTS.items():
+            self._font_ids[style] = self._write_object(
+                f'<< /Type /Font /Subtype /Type1 /BaseFont /{base_font} /Encoding /WinAnsiEncoding >>'.encode())
+
+    @property
+    def page_count(self):
+        return len(self._page_ids) + (self._content is not None)
+
+    def _write_object(self, body, stream=None, obj_id=None):
+        if obj_id is None:
+            obj_id = self._next_id
+            self._next_id += 1
+        self._offsets[obj_id] = self._file.tell()
+        self._file.write(f'{obj_id} 0 obj\n'.encode())
+        self._file.write(body)
+        if stream is not None:
+            self._file.write(b'\nstream\n' + stream + b'\nendstream')
+        self._file.write(b'\nendobj\n')
+        return obj_id
+
+    def new_page(self):
+        self._finish_page()
+        self._content = []
+        self._images = {}
+
+    def _require_page(self):
+        if self._content is None:
+            self.new_page()
+
+    def text(self, x, y, text, size=10, style='regular', color=(0, 0, 0)):
+        self._require_page()
+        self._content.append(b'BT /%s %g Tf %g %g %g rg %g %g Td (%s) Tj ET' % (
+            FONTS[style][0].encode(), size, *color, x, y, _pdf_text(text)))
+
+    def line(self, x1, y1, x2, y2, width=0.5, gray=0.6):
+        self._require_page()
+        self._content.append(b'%g G %g w %g %g m %g %g l S' % (gray, width, x1, y1, x2, y2))
+
+    def rect(self, x, y, w, h, gray=0.93):
+        # Filled background, e.g. for table headers
+        self._require_page()
+        self._content.append(b'%g g %g %g %g %g re f 0 g' % (gray, x, y, w, h))
+
+    def image(self, png, x, y, w, h):
+        # PNG bytes, decoded to RGB and written straight to the file as a Flate-compressed XObject
+        from PIL import Image
+
+        self._require_page()
+        picture = Image.open(io.BytesIO(png)).convert('RGB')
+        data = zlib.compress(picture.tobytes())
+        obj_id = self._write_object(
+            (f'<< /Type /XObject /Subtype /Image /Width {picture.width} /Height {picture.height} '
+             f'/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode /Length {len(data)} >>').encode(), data)
+        name = f'Im{obj_id}'
+        self._images[name] = obj_id
+        self._content.append(b'q %g 0 0 %g %g %g cm /%s Do Q' % (w, h, x, y, name.encode()))
+
+    def _finish_page(self):
+        if self._content is None:
+            return
+        stream = zlib.compress(b'\n'.join(self._content))
+        content_id = self._write_object(b'<< /Length %d /Filter /FlateDecode >>' % len(stream), stream)
+        fonts = ' '.join(f'/{name} {self._font_ids[style]} 0 R' for style, (name, _) in FONTS.items())
+        images = ' '.join(f'/{name} {obj_id} 0 R' for name, obj_id in self._images.items())
+        page_id = self._write_object(
+            (f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.width:g} {self.height:g}] '
+             f'/Resources << /Font << {fonts} >> /XObject << {images} >> >> /Contents {content_id} 0 R >>').encode())
+        self._page_ids.append(page_id)
+        self._content = None
+
+    def close(self):
+        self._require_page()
+        self._finish_page()
+        kids = ' '.join(f'{page_id} 0 R' for page_id in self._page_ids)
+        self._write_object(f'<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>'.encode(), obj_id=2)
+        self._write_object(b'<< /Type /Catalog /Pages 2 0 R >>', obj_id=1)
+        xref = self._file.tell()
+        size = self._next_id
+        self._file.write(b'xref\n0 %d\n0000000000 65535 f \n' % size)
+        for obj_id in range(1, size):
+            self._file.write(b'%010d 00000 n \n' % self._offsets[obj_id])
+        self._file.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (size, xref))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if not self._file.closed:
+            self.close()
@@ -0,0 +1,149 @@
+# utils/plots.py
+
+import io
+
+import numpy as np
+
+from utils.instrumentation import instrumented
+
+HIST_BINS = 60
+KDE_POINTS = 256
+# Outliers drawn per group and side of the box; beyond this only the most extreme are kept
+MAX_FLIERS = 25
+FIGSIZE = (6.4, 4.8)
+DPI = 100
+
+
+def _extremes(values, k, largest):
+    if len(values) <= k:
+        return values
+    if largest:
+        return np.partition(values, len(values) - k)[-k:]
+    return np.partition(values, k - 1)[:k]
+
+
+def box_stats(data, whis=1.5):
+    # Per-group inputs for Axes.bxp from an ExperimentData: quartiles, whiskers and a bounded
+    # set of outliers, so the plot costs one O(rows) pass and a fixed number of artists
+    stats = []
+    for label, values in zip(data.labels, data.groups()):
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            continue
+        q1, med, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+        low, high = q1 - whis * (q3 - q1), q3 + whis * (q3 - q1)
+        below, above = values[values < low], values[values > high]
+        inside = values[(values >= low) & (values <= high)]
+        stats.append({'label': str(label), 'q1': q1, 'med': med, 'q3': q3,
+                      'whislo': inside.min(), 'whishi': inside.max(),
+                      'fliers': np.concatenate([_extremes(below, MAX_FLIERS, False),
+                                                _extremes(above, MAX_FLIERS, True)])})
+    return stats
+
+
+def histogram(values, bins=HIST_BINS):
+    values = values[np.isfinite(values)]
+    return np.histogram(values, bins=bins)
+
+
+def grid_kde(values, points=KDE_POINTS):
+    # Gaussian KDE on a regular grid: values are binned onto the grid and the counts convolved
+    # with the kernel, O(rows + points * kernel) instead of O(rows * points).
+    # Returns (grid, density), or None when the values have no spread.
+    values = values[np.isfinite(values)]
+    n = len(values)
+    if n < 2:
+        return None
+    # Scott's rule, as in scipy.stats.gaussian_kde and seaborn
+    bandwidth = values.std(ddof=1) * n ** -0.2
+    if not bandwidth > 0:
+        return None
+    lo, hi = values.min() - 3 * bandwidth, values.max() + 3 * bandwidth
+    counts, edges = np.histogram(values, bins=points, range=(lo, hi))
+    step = edges[1] - edges[0]
+    half = int(np.ceil(4 * bandwidth / step))
+    kernel = np.exp(-0.5 * (np.arange(-half, half + 1) * step / bandwidth) ** 2)
+    density = np.convolve(counts, kernel)[half:half + points] / (n * bandwidth * np.sqrt(2 * np.pi))
+    return (edges[:-1] + edges[1:]) / 2, density
+
+
+def _png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=DPI)
+    return buffer.getvalue()
+
+
+@instrumented('plot')
+def render_png(draw, figsize=FIGSIZE):
+    # Draws on a standalone figure and returns PNG bytes for caching and st.image. The figure is
+    # never registered with pyplot, so nothing accumulates across reruns.
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize, dpi=DPI)
+    draw(fig.add_subplot())
+    fig.tight_layout()
+    png = _png(fig)
+    fig.clear()
+    return png
+
+
+@instrumented('plot')
+def figure_png(fig):
+    # PNG bytes of a pyplot figure, which is closed straight away
+    import matplotlib.pyplot as plt
+
+    try:
+        return _png(fig)
+    finally:
+        plt.close(fig)
+
+
+def boxplot_png(data, title="Group-wise Value Comparison"):
+    stats = box_stats(data)
+
+    def draw(ax):
+        from matplotlib import colormaps
+
+        boxes = ax.bxp(stats, patch_artist=True)['boxes']
+        palette = colormaps['Set2'].colors
+        for i, box in enumerate(boxes):
+            box.set_facecolor(palette[i % len(palette)])
+        ax.set_xlabel('group')
+        ax.set_ylabel('value')
+        ax.set_title(title)
+
+    return render_png(draw)
+
+
+def distribution_png(values, marker=None, marker_label=None, title=None, color='skyblue'):
+    # Fixed-bin histogram with its KDE (scaled to counts) and an optional vertical marker
+    counts, edges = histogram(values)
+    kde = grid_kde(values)
+
+    def draw(ax):
+        ax.stairs(counts, edges, fill=True, color=color, alpha=0.6)
+        if kde is not None:
+            grid, density = kde
+            ax.plot(grid, density * counts.sum() * (edges[1] - edges[0]), color=color)
+        if marker is not None:
+            ax.axvline(x=marker, color='red', linestyle='--', label=marker_label)
+            ax.legend()
+        ax.set_ylabel('Count')
+        if title:
+            ax.set_title(title)
+
+    return render_png(draw)
+
+
+def densities_png(curves, title=None):
+    # Filled density curves from (label, grid, density) triples
+    def draw(ax):
+        for label, grid, density in curves:
+            line, = ax.plot(grid, density, label=str(label))
+            ax.fill_between(grid, density, alpha=0.25, color=line.get_color())
+        ax.set_ylabel('Density')
+        if title:
+            ax.set_title(title)
+        ax.legend()
+
+    return render_png(draw)
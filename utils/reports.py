@@ -0,0 +1,289 @@
+# utils/reports.py
+
+import base64
+import hashlib
+import html
+import io
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from methods.resampling import resolve_jobs
+from utils.batch_runner import BATCH_METHODS, BatchTask, run_task
+from utils.result_store import DEFAULT_STORE_PATH, ResultStore
+
+REPORT_FORMATS = {'.pdf': 'pdf', '.html': 'html', '.htm': 'html'}
+RESULT_TABLE_COLUMNS = ['method', 'comparison', 'statistic', 'p_value', 'outcome']
+# Widest figure in a PDF report, in points
+PDF_FIGURE_WIDTH = 432
+
+_stores = {}
+
+
+def report_format(path):
+    fmt = REPORT_FORMATS.get(os.path.splitext(str(path))[1].lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported report file '{path}'. Use one of: {', '.join(REPORT_FORMATS)}")
+    return fmt
+
+
+def data_fingerprint(data):
+    # Content hash of an ExperimentData, so figures are reused whenever the same data comes back
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr([str(label) for label in data.labels]).encode())
+    digest.update(data.offsets.tobytes())
+    digest.update(data.values.tobytes())
+    return digest.hexdigest()
+
+
+def _store(path):
+    # One store per worker process; the SQLite file itself is shared between them
+    if path not in _stores:
+        _stores[path] = ResultStore(path)
+    return _stores[path]
+
+
+def build_section(task, methods, seed=None, figures=True, store_path=DEFAULT_STORE_PATH):
+    # Everything a report shows for one (experiment, metric) pair: group summary, result rows
+    # and pre-rendered figures. Runs in a worker process and returns only these small pieces.
+    data = task.data
+    stats = data.stats()
+    groups = pd.DataFrame({'group': [str(label) for label in stats.labels], 'n': stats.n.astype(np.int64),
+                           'mean': stats.mean, 'std': stats.std})
+    results = pd.DataFrame(run_task(task, methods, seed)).reindex(
+        columns=RESULT_TABLE_COLUMNS[:-1] + ['conclusion', 'error'])
+    # Conclusions are written for the app's Markdown; reports show them as plain text
+    results['outcome'] = results['conclusion'].fillna(results['error']).str.replace(r'[*`]', '', regex=True)
+    results = results[RESULT_TABLE_COLUMNS]
+
+    images = []
+    if figures:
+        from utils.plots import boxplot_png
+
+        render = lambda: boxplot_png(data, f"{task.experiment}: {task.metric}")
+        if store_path:
+            key = ('report_plot', 'box', data_fingerprint(data), str(task.experiment), str(task.metric))
+            images.append(_store(store_path).get_or_compute(key, render, label='report_plot box'))
+        else:
+            images.append(render())
+    return {'experiment': task.experiment, 'metric': task.metric, 'n_rows': len(data),
+            'groups': groups, 'results': results, 'images': images}
+
+
+def _overview_row(section, alpha):
+    results = section['results']
+    p_values = pd.to_numeric(results['p_value'], errors='coerce')
+    significant = results.loc[p_values < alpha, 'method'].unique()
+    return {'experiment': section['experiment'], 'metric': section['metric'], 'n_rows': section['n_rows'],
+            'groups': len(section['groups']), 'min_p_value': p_values.min(),
+            'significant': ', '.join(significant) if len(significant) else '-'}
+
+
+def _cell(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ''
+    if isinstance(value, (float, np.floating)):
+        return f'{value:.4g}'
+    return str(value)
+
+
+class HtmlReportWriter:
+    # Single self-contained HTML file (figures inlined as base64), appended section by section
+    _HEAD = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; color: #222; }}
+table {{ border-collapse: collapse; margin: 0.5em 0 1em; font-size: 0.9em; }}
+th, td {{ border: 1px solid #ccc; padding: 3px 8px; text-align: right; }}
+th {{ background: #eee; }}
+td:first-child, th:first-child {{ text-align: left; }}
+section {{ border-top: 2px solid #ddd; padding-top: 0.5em; }}
+img {{ max-width: 640px; }}
+</style></head><body>
+<h1>{title}</h1>
+<p>Generated {generated}</p>
+"""
+
+    def __init__(self, path, title):
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write(self._HEAD.format(title=html.escape(title), generated=time.strftime('%Y-%m-%d %H:%M')))
+
+    def _table(self, frame):
+        return frame.to_html(index=False, na_rep='', float_format=lambda v: f'{v:.4g}', border=0)
+
+    def write_section(self, section):
+        parts = [f"<section><h2>{html.escape(str(section['experiment']))}: {html.escape(str(section['metric']))}</h2>",
+                 self._table(section['groups']), self._table(section['results'])]
+        for png in section['images']:
+            parts.append(f'<img alt="figure" src="data:image/png;base64,{base64.b64encode(png).decode()}">')
+        parts.append('</section>\n')
+        self._file.write('\n'.join(parts))
+        self._file.flush()
+
+    def close(self, overview):
+        # The overview comes last: the report is written before all results are known
+        self._file.write(f'<section><h2>Overview</h2>{self._table(overview)}</section>\n</body></html>\n')
+        self._file.close()
+
+
+class PdfReportWriter:
+    # Lays sections out on pages of a PdfStreamWriter: one experiment per page (or more when its
+    # tables and figures need it), table headers repeated after a page break
+    FONT_SIZE = 9
+
+    def __init__(self, path, title):
+        from utils.pdf_export import MARGIN, PdfStreamWriter
+
+        self.pdf = PdfStreamWriter(path)
+        self.title = title
+        self.margin = MARGIN
+        self.left, self.right = MARGIN, self.pdf.width - MARGIN
+        self.y = None
+        self._new_page()
+        self._heading(title, 18)
+        self._text(f"Generated {time.strftime('%Y-%m-%d %H:%M')}")
+
+    def _new_page(self):
+        self.pdf.new_page()
+        self.y = self.pdf.height - self.margin
+        self.pdf.text(self.left, self.margin / 2, f"{self.title} - page {self.pdf.page_count}", size=7,
+                      color=(0.4, 0.4, 0.4))
+
+    def _space(self, needed):
+        if self.y - needed < self.margin:
+            self._new_page()
+
+    def _heading(self, text, size=13):
+        from utils.pdf_export import fit_text
+
+        self._space(size + 12)
+        self.y -= size
+        self.pdf.text(self.left, self.y, fit_text(text, self.right - self.left, size, 'bold'), size, 'bold')
+        self.y -= 10
+
+    def _text(self, text):
+        self._space(self.FONT_SIZE + 8)
+        self.y -= self.FONT_SIZE
+        self.pdf.text(self.left, self.y, text, self.FONT_SIZE)
+        self.y -= 8
+
+    def _table(self, frame):
+        from utils.pdf_export import fit_text
+
+        columns = list(frame.columns)
+        cells = [[_cell(v) for v in row] for row in frame.itertuples(index=False)]
+        # Column widths follow the longest entry (capped), shared out over the page width
+        weights = [min(max([len(str(c))] + [len(row[i]) for row in cells[:50]]), 40) + 2 for i, c in enumerate(columns)]
+        total = self.right - self.left
+        widths = [total * w / sum(weights) for w in weights]
+        row_height = self.FONT_SIZE + 5
+
+        def draw_row(values, style):
+            x = self.left
+            for value, width in zip(values, widths):
+                self.pdf.text(x + 2, self.y + 3, fit_text(value, width - 4, self.FONT_SIZE, style), self.FONT_SIZE, style)
+                x += width
+
+        def header():
+            self.y -= row_height
+            self.pdf.rect(self.left, self.y, total, row_height)
+            draw_row(columns, 'bold')
+
+        self._space(2 * row_height)
+        header()
+        for values in cells:
+            if self.y - row_height < self.margin:
+                self._new_page()
+                header()
+            self.y -= row_height
+            draw_row(values, 'regular')
+            self.pdf.line(self.left, self.y, self.right, self.y, gray=0.85)
+        self.y -= 10
+
+    def _image(self, png):
+        from PIL import Image
+
+        width, height = Image.open(io.BytesIO(png)).size
+        draw_width = min(self.right - self.left, PDF_FIGURE_WIDTH)
+        draw_height = draw_width * height / width
+        self._space(draw_height + 10)
+        self.y -= draw_height
+        self.pdf.image(png, self.left, self.y, draw_width, draw_height)
+        self.y -= 10
+
+    def write_section(self, section):
+        self._new_page()
+        self._heading(f"{section['experiment']}: {section['metric']}")
+        self._text(f"{section['n_rows']:,} rows in {len(section['groups'])} groups")
+        self._table(section['groups'])
+        self._table(section['results'])
+        for png in section['images']:
+            self._image(png)
+
+    def close(self, overview):
+        self._new_page()
+        self._heading("Overview")
+        self._table(overview)
+        self.pdf.close()
+
+
+_WRITERS = {'pdf': PdfReportWriter, 'html': HtmlReportWriter}
+
+
+def _ordered_sections(tasks, n_jobs, *args):
+    # Sections in input order. With workers, at most 2 * n_jobs tasks are in flight (and their
+    # sections held) at any time, so memory stays bounded however many experiments there are.
+    if n_jobs == 1:
+        for task in tasks:
+            yield build_section(task, *args)
+        return
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(build_section, task, *args))
+            if len(pending) >= 2 * n_jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run_report(tasks, output_paths, methods=('t-test', 'anova', 'bayesian'), n_jobs=1, seed=None, figures=True,
+               title="A/B Testing Report", alpha=0.05, store_path=DEFAULT_STORE_PATH, progress=sys.stderr):
+    # Runs the methods on every (experiment, metric) pair and streams one section per pair to
+    # each output (.pdf and/or .html) as results arrive. Returns a summary of the run.
+    methods = list(methods)
+    unknown = [m for m in methods if m not in BATCH_METHODS]
+    if unknown:
+        raise ValueError(f"Unknown method(s): {', '.join(unknown)}")
+    output_paths = [output_paths] if isinstance(output_paths, (str, os.PathLike)) else list(output_paths)
+    formats = [report_format(path) for path in output_paths]
+
+    started = time.perf_counter()
+    writers = [_WRITERS[fmt](path, title) for fmt, path in zip(formats, output_paths)]
+    overview = []
+    try:
+        tasks = (BatchTask(i, *t) for i, t in enumerate(tasks))
+        for section in _ordered_sections(tasks, resolve_jobs(n_jobs), methods, seed, figures, store_path):
+            for writer in writers:
+                writer.write_section(section)
+            overview.append(_overview_row(section, alpha))
+            if progress is not None:
+                elapsed = time.perf_counter() - started
+                progress.write(f"\r{len(overview)} sections written | {len(overview) / elapsed:,.1f} sections/s")
+                progress.flush()
+    finally:
+        overview_table = pd.DataFrame(overview, columns=['experiment', 'metric', 'n_rows', 'groups',
+                                                         'min_p_value', 'significant'])
+        for writer in writers:
+            writer.close(overview_table)
+    if progress is not None:
+        progress.write("\n")
+
+    pdf_pages = [writer.pdf.page_count for writer in writers if isinstance(writer, PdfReportWriter)]
+    return {'sections': len(overview), 'outputs': output_paths, 'pdf_pages': pdf_pages[0] if pdf_pages else None,
+            'seconds': time.perf_counter() - started}
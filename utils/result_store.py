@@ -0,0 +1,175 @@
+# utils/result_store.py
+
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_STORE_PATH = os.path.join('.cache', 'results.sqlite')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    label TEXT,
+    meta TEXT NOT NULL,
+    arrays BLOB,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+
+def store_key(key):
+    # Stable text key from a make_key tuple (dataset fingerprint, method, parameters)
+    return hashlib.blake2b(repr(key).encode(), digest_size=20).hexdigest()
+
+
+def _encode(obj, arrays):
+    # JSON-able structure; numeric arrays are set aside for one .npz blob. No pickle, so
+    # loading a store never runs code.
+    if isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            return {'__objects__': [_encode(x, arrays) for x in obj.tolist()]}
+        arrays.append(obj)
+        return {'__array__': len(arrays) - 1}
+    if isinstance(obj, bytes):
+        # Rendered images and other binary payloads travel in the .npz blob as well
+        arrays.append(np.frombuffer(obj, dtype=np.uint8))
+        return {'__bytes__': len(arrays) - 1}
+    if isinstance(obj, pd.DataFrame):
+        return {'__frame__': [[_encode(col, arrays), _encode(obj[col].to_numpy(), arrays)] for col in obj.columns]}
+    if isinstance(obj, dict):
+        return {'__dict__': [[_encode(k, arrays), _encode(v, arrays)] for k, v in obj.items()]}
+    if isinstance(obj, tuple):
+        return {'__tuple__': [_encode(x, arrays) for x in obj]}
+    if isinstance(obj, list):
+        return [_encode(x, arrays) for x in obj]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if obj is None or isinstance(obj, (str, bool, int, float)):
+        return obj
+    raise TypeError(f"Cannot store values of type {type(obj).__name__}")
+
+
+def _decode(obj, arrays):
+    if isinstance(obj, list):
+        return [_decode(x, arrays) for x in obj]
+    if not isinstance(obj, dict):
+        return obj
+    if '__array__' in obj:
+        return arrays[f"arr_{obj['__array__']}"]
+    if '__bytes__' in obj:
+        return arrays[f"arr_{obj['__bytes__']}"].tobytes()
+    if '__objects__' in obj:
+        values = [_decode(x, arrays) for x in obj['__objects__']]
+        out = np.empty(len(values), dtype=object)
+        out[:] = values
+        return out
+    if '__frame__' in obj:
+        return pd.DataFrame({_decode(col, arrays): _decode(values, arrays) for col, values in obj['__frame__']})
+    if '__dict__' in obj:
+        return {_decode(k, arrays): _decode(v, arrays) for k, v in obj['__dict__']}
+    if '__tuple__' in obj:
+        return tuple(_decode(x, arrays) for x in obj['__tuple__'])
+    raise ValueError("Corrupt result entry")
+
+
+class ResultStore:
+    # Results of the methods/ functions on disk (SQLite rows, NumPy arrays as .npz blobs),
+    # shared by every session and process on the machine. Entries are content-addressed by
+    # dataset fingerprint, method and parameters; the least recently used ones are evicted
+    # once the stored bytes exceed max_bytes.
+    def __init__(self, path=DEFAULT_STORE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+
+    def _connect(self):
+        # One short-lived connection per operation, so the store is safe across threads and processes
+        return sqlite3.connect(self.path, timeout=30)
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @property
+    def total_bytes(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def get(self, key, default=None):
+        text_key = store_key(key)
+        with self._connect() as conn:
+            row = conn.execute("SELECT meta, arrays FROM results WHERE key = ?", (text_key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), text_key))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if row is None:
+            return default
+        meta, blob = row
+        arrays = np.load(io.BytesIO(blob), allow_pickle=False) if blob else {}
+        return _decode(json.loads(meta), arrays)
+
+    def put(self, key, value, label=''):
+        # Returns False (and stores nothing) for values the store cannot encode, e.g. figures
+        arrays = []
+        try:
+            meta = json.dumps(_encode(value, arrays))
+        except TypeError:
+            return False
+        blob = None
+        if arrays:
+            buffer = io.BytesIO()
+            np.savez(buffer, *arrays)
+            blob = buffer.getvalue()
+        size = len(meta) + (len(blob) if blob else 0)
+        if size > self.max_bytes:
+            return False
+
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO results (key, label, meta, arrays, size, accessed) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", (store_key(key), label, meta, blob, size, time.time()))
+            self._evict(conn)
+        return True
+
+    def _evict(self, conn):
+        excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed"):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+
+    def get_or_compute(self, key, compute, label=''):
+        _missing = object()
+        value = self.get(key, _missing)
+        if value is _missing:
+            value = compute()
+            self.put(key, value, label)
+        return value
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM results")
@@ -0,0 +1,161 @@
+# utils/simulator.py
+
+import numpy as np
+import pandas as pd
+
+from methods.resampling import run_sharded, shard_count
+
+DISTRIBUTIONS = ('normal', 'lognormal', 'heavy_tailed', 'binary')
+SIM_METHODS = ('t-test', 'welch', 'anova', 'bootstrap')
+DEFAULT_MAX_MEMORY_MB = 256
+BOOTSTRAP_ITERATIONS = 200
+
+
+def generate_experiments(rng, n_sims, n_per_group, n_groups=2, effect_size=0.0, std=1.0,
+                         distribution='normal', baseline=0.1):
+    # Synthetic experiments as one (n_sims, n_groups, n_per_group) array. Group 0 is control;
+    # every other group is shifted by effect_size standard deviations (an absolute lift in
+    # the conversion rate for 'binary').
+    shape = (n_sims, n_groups, n_per_group)
+    if distribution == 'binary':
+        rates = np.full(n_groups, baseline, dtype=np.float64)
+        rates[1:] = np.clip(baseline + effect_size, 0.0, 1.0)
+        return (rng.random(shape) < rates[None, :, None]).astype(np.float64)
+
+    if distribution == 'normal':
+        x = rng.standard_normal(shape)
+    elif distribution == 'lognormal':
+        # Right-skewed, rescaled to mean 0 and unit variance
+        x = (rng.lognormal(0.0, 1.0, shape) - np.exp(0.5)) / np.sqrt((np.e - 1) * np.e)
+    elif distribution == 'heavy_tailed':
+        # Student t with 3 degrees of freedom, unit variance
+        x = rng.standard_t(3, shape) / np.sqrt(3.0)
+    else:
+        raise ValueError(f"Unknown distribution '{distribution}'. Choose from: {', '.join(DISTRIBUTIONS)}")
+
+    x *= std
+    x[:, 1:, :] += effect_size * std
+    return x
+
+
+def _moments(x):
+    n = np.full(x.shape[:-1], x.shape[-1], dtype=np.float64)
+    mean = x.mean(axis=-1)
+    m2 = ((x - mean[..., None]) ** 2).sum(axis=-1)
+    return n, mean, m2
+
+
+def _batch_permutation(x, num_iterations, rng):
+    # Two-group permutation test for every simulated experiment at once, with the statistic
+    # and tie handling of methods/bootstrap_test.py
+    from methods.bootstrap_test import TIE_TOLERANCE, _mean_diff
+
+    n_sims, _, n = x.shape
+    combined = x.reshape(n_sims, 2 * n)
+    total = combined.sum(axis=1)
+    obs = _mean_diff(x[:, 0].sum(axis=1), total, n, n)
+
+    block = np.broadcast_to(combined[:, None, :], (n_sims, num_iterations, 2 * n)).copy()
+    rng.permuted(block, axis=2, out=block)
+    diffs = _mean_diff(block[:, :, :n].sum(axis=2), total[:, None], n, n)
+    return (diffs >= obs[:, None] * (1 - TIE_TOLERANCE)).mean(axis=1)
+
+
+def batch_p_values(x, method='t-test', rng=None, num_iterations=BOOTSTRAP_ITERATIONS):
+    # p-values for a stack of simulated experiments, using the same closed forms as methods/
+    # (imported here so that loading the simulator's options does not pull in scipy)
+    from methods.anova import anova_arrays
+    from methods.t_test import t_test_arrays
+
+    if method in ('t-test', 'welch'):
+        n, mean, m2 = _moments(x[:, :2])
+        _, p, _ = t_test_arrays(n[:, 0], mean[:, 0], m2[:, 0], n[:, 1], mean[:, 1], m2[:, 1],
+                                equal_var=(method == 't-test'))
+        return p
+    if method == 'anova':
+        _, p = anova_arrays(*_moments(x))
+        return p
+    if method == 'bootstrap':
+        return _batch_permutation(x[:, :2], num_iterations, rng)
+    raise ValueError(f"Unknown method '{method}'. Choose from: {', '.join(SIM_METHODS)}")
+
+
+def _sims_per_chunk(n_groups, n_per_group, method, max_memory_mb):
+    # Memory per simulated experiment, with headroom for the moment temporaries
+    values = n_groups * n_per_group
+    if method == 'bootstrap':
+        values *= BOOTSTRAP_ITERATIONS + 1
+    return max(1, int(max_memory_mb * 1024 * 1024 // (values * 8 * 3)))
+
+
+def _count_rejections(params, n_sims, rng):
+    rejections = 0
+    chunk = _sims_per_chunk(params['n_groups'], params['n_per_group'], params['method'], params['max_memory_mb'])
+    for start in range(0, n_sims, chunk):
+        size = min(chunk, n_sims - start)
+        x = generate_experiments(rng, size, params['n_per_group'], params['n_groups'], params['effect_size'],
+                                 params['std'], params['distribution'], params['baseline'])
+        p = batch_p_values(x, params['method'], rng)
+        rejections += int(np.count_nonzero(p < params['alpha']))
+    return rejections
+
+
+def simulate_rejection_rate(method='t-test', n_sims=10000, n_per_group=1000, n_groups=2, effect_size=0.0,
+                            std=1.0, distribution='normal', baseline=0.1, alpha=0.05,
+                            n_jobs=1, seed=None, max_memory_mb=DEFAULT_MAX_MEMORY_MB):
+    # Share of simulated experiments where the method rejects at alpha: power when
+    # effect_size != 0, type-I error when effect_size == 0.
+    if method in ('t-test', 'welch', 'bootstrap') and n_groups != 2:
+        raise ValueError(f"{method} simulations need exactly 2 groups.")
+    params = dict(method=method, n_per_group=n_per_group, n_groups=n_groups, effect_size=effect_size, std=std,
+                  distribution=distribution, baseline=baseline, alpha=alpha,
+                  # The memory ceiling is shared between the shards actually run (n_jobs=-1: one per core)
+                  max_memory_mb=max_memory_mb / shard_count(n_sims, n_jobs))
+    rejections = sum(run_sharded(_count_rejections, (params,), n_sims, n_jobs=n_jobs, seed=seed))
+
+    rate = rejections / n_sims
+    margin = 1.96 * float(np.sqrt(rate * (1 - rate) / n_sims))
+    return {
+        'method': method,
+        'n_per_group': n_per_group,
+        'effect_size': effect_size,
+        'n_sims': n_sims,
+        'rejection_rate': rate,
+        'ci_low': max(0.0, rate - margin),
+        'ci_high': min(1.0, rate + margin),
+    }
+
+
+def power_curve(sample_sizes, effect_size, method='t-test', n_sims=2000, seed=None, **kwargs):
+    # Power and type-I error for each sample size, as a tidy table
+    seeds = np.random.SeedSequence(seed).spawn(2 * len(sample_sizes))
+    rows = []
+    for i, n in enumerate(sample_sizes):
+        power = simulate_rejection_rate(method, n_sims, int(n), effect_size=effect_size, seed=seeds[2 * i], **kwargs)
+        null = simulate_rejection_rate(method, n_sims, int(n), effect_size=0.0, seed=seeds[2 * i + 1], **kwargs)
+        rows.append({'n_per_group': int(n), 'power': power['rejection_rate'],
+                     'type_i_error': null['rejection_rate']})
+    return pd.DataFrame(rows)
+
+
+def required_sample_size(effect_size, target_power=0.8, method='t-test', n_sims=2000, n_min=10, n_max=1_000_000,
+                         seed=None, **kwargs):
+    # Smallest per-group N reaching target_power: doubling search, then bisection
+    seeds = iter(np.random.SeedSequence(seed).spawn(64))
+
+    def power_at(n):
+        return simulate_rejection_rate(method, n_sims, n, effect_size=effect_size, seed=next(seeds),
+                                       **kwargs)['rejection_rate']
+
+    lo, hi = n_min, n_min
+    while power_at(hi) < target_power:
+        lo, hi = hi, hi * 2
+        if hi > n_max:
+            return None
+    while hi - lo > max(1, lo // 50):
+        mid = (lo + hi) // 2
+        if power_at(mid) >= target_power:
+            hi = mid
+        else:
+            lo = mid
+    return hi
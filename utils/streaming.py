@@ -0,0 +1,174 @@
+# utils/streaming.py
+
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.columnar import analysis_columns, file_format, iter_batches, load_table, read_schema, to_frame
+from utils.experiment_data import ExperimentData
+from utils.group_stats import GroupStats
+from utils.instrumentation import instrumented
+
+DEFAULT_CHUNKSIZE = 250_000
+DEFAULT_PROFILE_ROWS = 50_000
+DEFAULT_RESERVOIR_SIZE = 100_000
+
+
+class StreamingResult:
+    # Outcome of a chunked pass over a file: exact per-group moments for the
+    # parametric methods plus a bounded uniform row sample for plots/resampling.
+    __slots__ = ('stats', 'sample', 'n_rows', 'group_col', 'value_col')
+
+    def __init__(self, stats, sample, n_rows, group_col, value_col):
+        self.stats = stats
+        self.sample = sample
+        self.n_rows = n_rows
+        self.group_col = group_col
+        self.value_col = value_col
+
+
+class _Reservoir:
+    # Vectorised Algorithm R: row t (0-based) replaces slot randint(0, t] when that slot is < size
+    def __init__(self, size, rng):
+        self.size = size
+        self.rng = rng
+        self.labels = np.empty(size, dtype=object)
+        self.values = np.empty(size, dtype=np.float64)
+        self.filled = 0
+        self.seen = 0
+
+    def add(self, labels, values):
+        n = len(values)
+        take = min(self.size - self.filled, n)
+        if take > 0:
+            self.labels[self.filled:self.filled + take] = labels[:take]
+            self.values[self.filled:self.filled + take] = values[:take]
+            self.filled += take
+
+        if take < n:
+            positions = np.arange(self.seen + take, self.seen + n)
+            slots = self.rng.integers(0, positions + 1)
+            hit = np.flatnonzero(slots < self.size)
+            if len(hit):
+                # Later rows win when several land on the same slot, as in the sequential algorithm
+                slots_hit = slots[hit][::-1]
+                _, first = np.unique(slots_hit, return_index=True)
+                rows = take + hit[::-1][first]
+                self.labels[slots_hit[first]] = labels[rows]
+                self.values[slots_hit[first]] = values[rows]
+
+        self.seen += n
+
+    def to_experiment_data(self):
+        frame = pd.DataFrame({'group': self.labels[:self.filled], 'value': self.values[:self.filled]})
+        return ExperimentData.from_frame(frame)
+
+
+def normalize_column(col):
+    # Same column-name cleaning as validate_csv
+    return col.lower().strip()
+
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def _batches_to_frame(batches):
+    import pyarrow as pa
+
+    return to_frame(pa.Table.from_batches(batches))
+
+
+def _header_names(source, columns):
+    # Names as written in the file header for normalised column names
+    _rewind(source)
+    header = read_schema(source).names if file_format(source) != 'csv' else pd.read_csv(source, nrows=0).columns
+    _rewind(source)
+    raw_names = {normalize_column(col): col for col in header}
+    missing = [col for col in columns if col not in raw_names]
+    if missing:
+        raise ValueError(f"Column(s) not found in file: {', '.join(missing)}")
+    return [raw_names[col] for col in columns]
+
+
+@instrumented('load')
+def read_profile(source, nrows=DEFAULT_PROFILE_ROWS):
+    # First rows only, for column profiling and selection before the full pass
+    _rewind(source)
+    if file_format(source) != 'csv':
+        columns = analysis_columns(read_schema(source))
+        profile = _batches_to_frame([next(iter_batches(source, columns, nrows))]).head(nrows)
+    else:
+        profile = pd.read_csv(source, nrows=nrows)
+    profile.columns = [normalize_column(col) for col in profile.columns]
+    _rewind(source)
+    return profile
+
+
+@instrumented('stream')
+def stream_csv(source, group_col=None, value_col=None, chunksize=DEFAULT_CHUNKSIZE,
+               reservoir_size=DEFAULT_RESERVOIR_SIZE, seed=None):
+    # Column names are matched after the same normalisation as validate_csv;
+    # when they are not given they are picked from a profile of the first rows.
+    # Parquet and Arrow files are read batch by batch with only the two columns projected.
+    if group_col is None or value_col is None:
+        from utils.data_validator import suggest_group_and_metric_columns
+
+        group_suggestions, metric_suggestions = suggest_group_and_metric_columns(read_profile(source))
+        if not group_suggestions or not metric_suggestions:
+            raise ValueError("No suitable group/metric columns found in the first rows of the file.")
+        group_col = group_col or group_suggestions[0]
+        value_col = value_col or metric_suggestions[0]
+
+    raw_group, raw_value = _header_names(source, [group_col, value_col])
+    if file_format(source) != 'csv':
+        reader = (_batches_to_frame([batch]) for batch in iter_batches(source, [raw_group, raw_value], chunksize))
+    else:
+        reader = pd.read_csv(source, usecols=[raw_group, raw_value], chunksize=chunksize)
+
+    stats = None
+    reservoir = _Reservoir(reservoir_size, np.random.default_rng(seed)) if reservoir_size else None
+    n_rows = 0
+
+    for chunk in reader:
+        data = ExperimentData.from_frame(chunk, raw_group, raw_value)
+        n_rows += len(data)
+        stats = data.stats() if stats is None else stats.merge(data.stats())
+        if reservoir is not None:
+            reservoir.add(np.repeat(data.labels, data.counts), data.values)
+
+    if stats is None:
+        stats = GroupStats([], [], [], [])
+    sample = reservoir.to_experiment_data() if reservoir is not None else None
+    return StreamingResult(stats, sample, n_rows, group_col, value_col)
+
+
+def read_columns(source, columns):
+    # Just the given (normalised) columns of a whole file, with normalised names, as
+    # read_appended_rows returns them
+    frame = load_table(source, columns=_header_names(source, columns))
+    frame.columns = [normalize_column(col) for col in frame.columns]
+    return frame
+
+
+def read_appended_rows(path, offset=0):
+    # Rows appended to a CSV after byte `offset` (0 = the whole file), plus the offset to resume
+    # from next time. Only complete lines are consumed, so a row still being written is picked
+    # up by the following read. A file now shorter than `offset` was truncated or replaced
+    # (log rotation), so it is read again from the top.
+    if offset > os.path.getsize(path):
+        offset = 0
+    with open(path, 'rb') as f:
+        header = f.readline()
+        start = max(offset, f.tell())
+        f.seek(start)
+        tail = f.read()
+    end = tail.rfind(b'\n') + 1
+    if end == 0:
+        return pd.DataFrame(columns=[normalize_column(col) for col in header.decode().strip().split(',')]), start
+    frame = pd.read_csv(io.BytesIO(header + tail[:end]))
+    frame.columns = [normalize_column(col) for col in frame.columns]
+    return frame, start + end